@@ -10,6 +10,9 @@ from api.api_users import bp as api_users_bp
 from api.api_comments import bp as api_comments_bp
 from api.api_admin import bp as api_admin_bp
 from api.api_dashboard import bp as api_dashboard_bp
+from api.api_jobs import bp as api_jobs_bp
+from api.api_leaderboard import bp as api_leaderboard_bp
+from api.api_metrics import bp as api_metrics_bp
 
 
 def register_blueprints(app: Flask) -> None:
@@ -23,6 +26,9 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(api_comments_bp)
     app.register_blueprint(api_admin_bp)
     app.register_blueprint(api_dashboard_bp)
+    app.register_blueprint(api_jobs_bp)
+    app.register_blueprint(api_leaderboard_bp)
+    app.register_blueprint(api_metrics_bp)
 
 
 
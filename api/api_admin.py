@@ -1,11 +1,153 @@
-"""Admin API routes (logs, dev helpers)."""
+"""Admin API routes (logs, review queues, dev helpers)."""
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
+from datetime import datetime
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import joinedload
 
-from models import User
+from models import db, User, Project, VolunteerRecord, ProjectStatus, VolunteerRecordStatus
+from utils import encode_cursor, decode_cursor, serializers
+from utils.log_reader import get_log_reader, LEVELS as LOG_LEVELS
 
 bp = Blueprint('api_admin', __name__)
 
+# Review queue page sizes
+DEFAULT_QUEUE_PAGE_SIZE = 50
+MAX_QUEUE_PAGE_SIZE = 200
+
+
+def pending_review_totals():
+    """Return {'projects': n, 'records': m} pending-review counts from a single aggregate query."""
+    project_total = (
+        db.select(func.count(Project.id))
+        .where(Project.status == ProjectStatus.PENDING.value)
+        .scalar_subquery()
+    )
+    record_total = (
+        db.select(func.count(VolunteerRecord.id))
+        .where(VolunteerRecord.status == VolunteerRecordStatus.PENDING.value)
+        .scalar_subquery()
+    )
+    projects, records = db.session.execute(db.select(project_total, record_total)).one()
+    return {'projects': projects, 'records': records}
+
+
+def _newest_first_page(query, timestamp_column, id_column, limit, cursor):
+    """Apply a (timestamp desc, id desc) keyset page to query.
+
+    Returns (rows, next_cursor). Raises ValueError on a malformed cursor.
+    """
+    if cursor:
+        values = decode_cursor(cursor, 2)
+        try:
+            cursor_ts = datetime.fromisoformat(values[0])
+            cursor_id = int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        query = query.filter(
+            or_(
+                timestamp_column < cursor_ts,
+                and_(timestamp_column == cursor_ts, id_column < cursor_id),
+            )
+        )
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_column.key), last.id)
+    return rows, next_cursor
+
+
+def pending_projects_page(limit=DEFAULT_QUEUE_PAGE_SIZE, cursor=None):
+    """One page of projects awaiting review, newest submission first, organizations joined.
+
+    Returns (projects, next_cursor).
+    """
+    query = (
+        Project.query.options(joinedload(Project.organization))
+        .filter(Project.status == ProjectStatus.PENDING.value)
+    )
+    return _newest_first_page(query, Project.created_at, Project.id, limit, cursor)
+
+
+def pending_records_page(limit=DEFAULT_QUEUE_PAGE_SIZE, cursor=None):
+    """One page of volunteer records awaiting review, newest first.
+
+    Participant, project and project organization are joined in the same query.
+    Returns (records, next_cursor).
+    """
+    query = (
+        VolunteerRecord.query.options(
+            joinedload(VolunteerRecord.user),
+            joinedload(VolunteerRecord.project).joinedload(Project.organization),
+        )
+        .filter(VolunteerRecord.status == VolunteerRecordStatus.PENDING.value)
+    )
+    return _newest_first_page(query, VolunteerRecord.completed_at, VolunteerRecord.id, limit, cursor)
+
+
+def _queue_page_args():
+    """Parse limit/cursor query params for review queue endpoints."""
+    limit = request.args.get('limit', DEFAULT_QUEUE_PAGE_SIZE, type=int)
+    if limit <= 0:
+        limit = DEFAULT_QUEUE_PAGE_SIZE
+    return min(limit, MAX_QUEUE_PAGE_SIZE), request.args.get('cursor')
+
+
+@bp.route('/api/v1/admin/review/projects', methods=['GET'])
+@login_required
+def api_review_projects_queue():
+    """
+    Paginated queue of projects awaiting review (admin only).
+    Query params:
+      - limit: page size, default 50 (max 200)
+      - cursor: next_cursor from the previous page
+    """
+    if current_user.user_type != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    limit, cursor = _queue_page_args()
+    try:
+        projects, next_cursor = pending_projects_page(limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'projects': [serializers.pending_project(project) for project in projects],
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'totals': pending_review_totals()
+    })
+
+
+@bp.route('/api/v1/admin/review/records', methods=['GET'])
+@login_required
+def api_review_records_queue():
+    """
+    Paginated queue of volunteer records awaiting review (admin only).
+    Query params:
+      - limit: page size, default 50 (max 200)
+      - cursor: next_cursor from the previous page
+    """
+    if current_user.user_type != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    limit, cursor = _queue_page_args()
+    try:
+        records, next_cursor = pending_records_page(limit, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Same record shape as GET /api/v1/records
+    return jsonify({
+        'records': [serializers.record(record) for record in records],
+        'limit': limit,
+        'next_cursor': next_cursor,
+        'totals': pending_review_totals()
+    })
+
+
 @bp.route('/api/v1/admin/logs', methods=['GET'])
 @login_required
 def api_get_logs():
@@ -15,7 +157,8 @@ def api_get_logs():
     Query params:
       - page: page number (1-based), default 1
       - page_size: items per page, default 100
-      - level: optional level filter (INFO/WARNING/ERROR)
+      - level: optional level filter (DEBUG/INFO/WARNING/ERROR/CRITICAL)
+    Lines from the rotated backups (app.log.1 ...) follow the active file.
     """
     if current_user.user_type != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
@@ -28,7 +171,7 @@ def api_get_logs():
     page_size = int(request.args.get('page_size', 100) or 100)
     if page_size <= 0:
         page_size = 100
-    level_filter = request.args.get('level', '').upper()  # Optional: INFO, WARNING, ERROR
+    level_filter = request.args.get('level', '').upper()  # Optional: DEBUG, INFO, WARNING, ERROR, CRITICAL
     
     # Ensure log file exists each startup (create empty if missing)
     if not os.path.exists(log_file):
@@ -38,33 +181,12 @@ def api_get_logs():
         except Exception as e:
             return jsonify({'error': f'Failed to create log file: {str(e)}'}), 500
     
+    if level_filter and level_filter not in LOG_LEVELS:
+        return jsonify({'error': 'Invalid level'}), 400
+
     try:
-        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            all_lines = f.readlines()
-        
-        log_lines = all_lines
-        # Filter by level if specified (simple substring match)
-        if level_filter:
-            log_lines = [line for line in log_lines if level_filter in line]
-
-        # Newest first ordering
-        log_lines = list(reversed(log_lines))
-
-        total = len(log_lines)
-        total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-        if page > total_pages:
-            page = total_pages
-        start = (page - 1) * page_size
-        end = start + page_size
-        page_lines = log_lines[start:end]
-
-        return jsonify({
-            'logs': page_lines,
-            'page': page,
-            'page_size': page_size,
-            'total': total,
-            'total_pages': total_pages,
-            'original_total_lines': len(all_lines)
-        })
+        # Indexed reader: pages across app.log and its rotated backups, newest first
+        reader = get_log_reader(log_file, Config.LOG_BACKUP_COUNT)
+        return jsonify(reader.page(page, page_size, level_filter or None))
     except Exception as e:
         return jsonify({'error': f'Failed to read logs: {str(e)}'}), 500
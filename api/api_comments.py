@@ -1,51 +1,171 @@
 """Comments API routes."""
+from datetime import datetime
+
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import joinedload
 
 from models import db, Project, Registration, Comment, RegistrationStatus
+from utils import encode_cursor, decode_cursor
 
 bp = Blueprint('api_comments', __name__)
 
+# Root threads per page and replies shown inline under each thread
+DEFAULT_THREAD_PAGE_SIZE = 20
+MAX_THREAD_PAGE_SIZE = 100
+REPLY_PREVIEW_SIZE = 3
+# Replies per page when expanding a thread
+DEFAULT_REPLY_PAGE_SIZE = 20
+MAX_REPLY_PAGE_SIZE = 100
+
+
+def serialize_comment(comment):
+    """JSON shape of a comment or reply (user must be loaded or loadable)."""
+    return {
+        'id': comment.id,
+        'user_id': comment.user_id,
+        'user_name': comment.user.display_name or comment.user.username if comment.user else 'Unknown',
+        'user_type': comment.user.user_type.title() if comment.user else 'Unknown',
+        'comment': comment.content,
+        'parent_id': comment.parent_id,
+        'thread_id': comment.thread_id,
+        'depth': comment.depth,
+        'reply_count': comment.reply_count,
+        'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M') if comment.created_at else None,
+    }
+
+
+def comment_threads_page(project_id, limit=DEFAULT_THREAD_PAGE_SIZE, cursor=None, preview=REPLY_PREVIEW_SIZE):
+    """One page of a project's root threads, newest first, each with its first replies.
+
+    Roots and their first `preview` replies (in thread order) come back from a
+    single query with users joined. Returns (threads, next_cursor) where
+    threads is a list of (root, replies). Raises ValueError on a malformed cursor.
+    """
+    roots = db.select(Comment.id).where(Comment.project_id == project_id, Comment.parent_id.is_(None))
+    if cursor:
+        values = decode_cursor(cursor, 2)
+        try:
+            cursor_ts = datetime.fromisoformat(values[0])
+            cursor_id = int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        roots = roots.where(
+            or_(
+                Comment.created_at < cursor_ts,
+                and_(Comment.created_at == cursor_ts, Comment.id < cursor_id),
+            )
+        )
+    # One extra root tells us whether another page exists
+    roots = roots.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1)
+
+    # Position within the thread: the root sorts first (rank 1), then replies in path order
+    ranked = (
+        db.select(
+            Comment.id,
+            func.row_number().over(partition_by=Comment.thread_id, order_by=Comment.path).label('rank'),
+        )
+        .where(Comment.thread_id.in_(roots))
+        .subquery()
+    )
+    rows = db.session.execute(
+        db.select(Comment)
+        .join(ranked, ranked.c.id == Comment.id)
+        .where(ranked.c.rank <= preview + 1)
+        .options(joinedload(Comment.user))
+        .order_by(Comment.thread_id, Comment.path)
+    ).scalars().all()
+
+    threads = {}
+    for comment in rows:
+        if comment.parent_id is None:
+            threads[comment.id] = (comment, [])
+        else:
+            threads[comment.thread_id][1].append(comment)
+    ordered = sorted(threads.values(), key=lambda thread: (thread[0].created_at, thread[0].id), reverse=True)
+
+    next_cursor = None
+    if len(ordered) > limit:
+        ordered = ordered[:limit]
+        last = ordered[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return ordered, next_cursor
+
+
+def serialize_thread(root, replies):
+    """Root comment with its inline replies (flat, in thread order; see 'depth')."""
+    data = serialize_comment(root)
+    data['replies'] = [serialize_comment(reply) for reply in replies]
+    # Cursor for the rest of the thread, continuing after the last inline reply
+    data['replies_next_cursor'] = (
+        encode_cursor(replies[-1].path) if replies and root.reply_count > len(replies) else None
+    )
+    return data
+
+
+def _page_size_arg(default, maximum):
+    """Parse ?limit= clamped to [1, maximum]."""
+    limit = request.args.get('limit', default, type=int)
+    return min(max(limit or default, 1), maximum)
+
 
 @bp.route('/api/v1/projects/<int:project_id>/comments', methods=['GET'])
 def api_project_comments_list(project_id):
-    """Get comments for a project."""
-    project = Project.query.get_or_404(project_id)
-    
-    # Get all comments (including replies)
-    comments = Comment.query.filter_by(project_id=project_id).order_by(Comment.created_at.desc()).all()
-    
-    # Build a dictionary of comments by ID for easy lookup
-    comments_dict = {}
-    root_comments = []
-    
-    for comment in comments:
-        comment_data = {
-            'id': comment.id,
-            'user_id': comment.user_id,
-            'user_name': comment.user.display_name or comment.user.username if comment.user else 'Unknown',
-            'user_type': comment.user.user_type.title() if comment.user else 'Unknown',
-            'comment': comment.content,
-            'parent_id': comment.parent_id,
-            'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M') if comment.created_at else None,
-            'replies': []
-        }
-        comments_dict[comment.id] = comment_data
-        
-        if comment.parent_id is None:
-            root_comments.append(comment_data)
-    
-    # Attach replies to their parent comments
-    for comment in comments:
-        if comment.parent_id is not None and comment.parent_id in comments_dict:
-            parent_data = comments_dict[comment.parent_id]
-            parent_data['replies'].append(comments_dict[comment.id])
-    
-    # Sort replies by created_at (oldest first)
-    for comment_data in comments_dict.values():
-        comment_data['replies'].sort(key=lambda x: x['created_at'] or '')
-    
-    return jsonify(root_comments)
+    """Get a page of a project's comment threads, newest first.
+
+    Query params:
+      - limit: threads per page (default 20, max 100)
+      - cursor: next_cursor from the previous page
+    Each thread carries its first replies; fetch the rest from
+    /api/v1/comments/<id>/replies with the thread's replies_next_cursor.
+    """
+    Project.query.get_or_404(project_id)
+    limit = _page_size_arg(DEFAULT_THREAD_PAGE_SIZE, MAX_THREAD_PAGE_SIZE)
+    try:
+        threads, next_cursor = comment_threads_page(project_id, limit, request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'comments': [serialize_thread(root, replies) for root, replies in threads],
+        'limit': limit,
+        'next_cursor': next_cursor,
+    })
+
+
+@bp.route('/api/v1/comments/<int:comment_id>/replies', methods=['GET'])
+def api_comment_replies_list(comment_id):
+    """Get a page of every reply below a comment, in thread order.
+
+    Query params:
+      - limit: replies per page (default 20, max 100)
+      - cursor: next_cursor from the previous page (or a thread's replies_next_cursor)
+    """
+    comment = Comment.query.get_or_404(comment_id)
+    limit = _page_size_arg(DEFAULT_REPLY_PAGE_SIZE, MAX_REPLY_PAGE_SIZE)
+
+    stmt = db.select(Comment).where(Comment.descendants_clause(comment.thread_id, comment.path))
+    cursor = request.args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, 1)
+        if not values or not isinstance(values[0], str):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        stmt = stmt.where(Comment.path > values[0])
+    replies = db.session.execute(
+        stmt.options(joinedload(Comment.user)).order_by(Comment.path).limit(limit + 1)
+    ).scalars().all()
+
+    next_cursor = None
+    if len(replies) > limit:
+        replies = replies[:limit]
+        next_cursor = encode_cursor(replies[-1].path)
+
+    return jsonify({
+        'replies': [serialize_comment(reply) for reply in replies],
+        'limit': limit,
+        'next_cursor': next_cursor,
+    })
 
 
 @bp.route('/api/v1/projects/<int:project_id>/comments', methods=['POST'])
@@ -65,6 +185,7 @@ def api_project_comments_create(project_id):
         return jsonify({'error': 'Comment cannot be empty'}), 400
     
     # If replying to a comment, verify the parent comment exists and belongs to the same project
+    parent_comment = None
     if parent_id is not None:
         parent_comment = Comment.query.get(parent_id)
         if not parent_comment:
@@ -106,16 +227,12 @@ def api_project_comments_create(project_id):
         parent_id=parent_id
     )
     db.session.add(comment)
+    db.session.flush()
+    comment.place_in_thread(parent_comment)
     db.session.commit()
     
-    return jsonify({
-        'id': comment.id,
-        'project_id': project_id,
-        'user_name': current_user.display_name or current_user.username,
-        'user_type': current_user.user_type.title(),
-        'comment': comment.content,
-        'parent_id': comment.parent_id,
-        'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M') if comment.created_at else None,
-        'message': 'Comment posted successfully'
-    }), 201
+    data = serialize_comment(comment)
+    data['project_id'] = project_id
+    data['message'] = 'Comment posted successfully'
+    return jsonify(data), 201
 
@@ -2,19 +2,32 @@
 from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
+from collections import defaultdict
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 from models import (
+    db,
     Project,
     Registration,
-    VolunteerRecord,
     User,
+    UserStats,
     ProjectStatus,
     RegistrationStatus,
-    VolunteerRecordStatus,
 )
+from api.api_admin import pending_projects_page, pending_records_page, pending_review_totals
+from utils import serializers
 
 bp = Blueprint('api_dashboard', __name__)
 
+# Progress bar value shown for a registration status on the participant dashboard
+REGISTRATION_PROGRESS = {
+    RegistrationStatus.COMPLETED.value: 100,
+    ProjectStatus.IN_PROGRESS.value: 75,
+    RegistrationStatus.APPROVED.value: 50,
+    RegistrationStatus.REGISTERED.value: 25,
+}
+
 
 @bp.route('/api/v1/users/me/dashboard', methods=['GET'])
 @login_required
@@ -23,62 +36,56 @@ def api_users_me_dashboard():
     user_type = current_user.user_type
     
     if user_type == 'participant':
-        # Get registrations for the user
-        user_registrations = Registration.query.filter_by(user_id=current_user.id).order_by(Registration.created_at.desc()).all()
-        registration_payload = []
-        for registration in user_registrations:
-            project = registration.project
-            status_label = registration.status.replace('_', ' ').title()
-            progress = 0
-            if registration.status == RegistrationStatus.COMPLETED.value:
-                progress = 100
-            elif registration.status == ProjectStatus.IN_PROGRESS.value:
-                progress = 75
-            elif registration.status == RegistrationStatus.APPROVED.value:
-                progress = 50
-            elif registration.status == RegistrationStatus.REGISTERED.value:
-                progress = 25
-
-            registration_payload.append({
-                'id': project.id,
-                'registration_id': registration.id,
-                'title': project.title,
-                'organization_name': project.organization.display_name or project.organization.username if project.organization else None,
-                'date': project.date.strftime('%Y-%m-%d'),
-                'status': status_label,
-                'progress': progress
-            })
+        # Totals are maintained in user_stats; normally one primary-key read.
+        # Read first: building a missing row commits and expires loaded objects
+        stats = UserStats.current(current_user.id)
 
-        # Calculate statistics
-        approved_records = VolunteerRecord.query.filter_by(
-            user_id=current_user.id,
-            status=VolunteerRecordStatus.APPROVED.value,
-        ).all()
-        total_hours = sum(r.hours for r in approved_records)
-        total_points = sum(r.points for r in approved_records)
-        completed_count = len(approved_records)
-        upcoming_count = Registration.query.join(Project).filter(
-            Registration.user_id == current_user.id,
-            Registration.status.in_(('registered', 'approved')),
-            Project.date >= datetime.utcnow().date()
-        ).count()
+        # Get registrations for the user
+        user_registrations = (
+            Registration.query.filter_by(user_id=current_user.id)
+            .options(joinedload(Registration.project).joinedload(Project.organization))
+            .order_by(Registration.created_at.desc())
+            .all()
+        )
+        registration_payload = [
+            serializers.participant_registration(
+                registration,
+                status=registration.status.replace('_', ' ').title(),
+                progress=REGISTRATION_PROGRESS.get(registration.status, 0),
+            )
+            for registration in user_registrations
+        ]
 
         return jsonify({
             'user': {
                 'display_name': current_user.display_name or current_user.username
             },
             'statistics': {
-                'total_hours': total_hours,
-                'total_points': total_points,
-                'completed': completed_count,
-                'upcoming': upcoming_count
+                'total_hours': stats.total_hours,
+                'total_points': stats.total_points,
+                'completed': stats.completed_count,
+                'upcoming': stats.upcoming_count
             },
             'registrations': registration_payload
         })
     
     elif user_type == 'organization':
-        # Get organization's projects
-        projects = Project.query.filter_by(organization_id=current_user.id).all()
+        # One query for the organization's projects (newest first) ...
+        projects = (
+            Project.query.filter_by(organization_id=current_user.id)
+            .order_by(Project.created_at.desc())
+            .all()
+        )
+        # ... and one grouped aggregation for registration counts by project and status.
+        # The query count stays constant however many projects the organization owns.
+        registration_counts = defaultdict(dict)
+        for project_id, status, count in (
+            db.session.query(Registration.project_id, Registration.status, func.count(Registration.id))
+            .join(Project, Project.id == Registration.project_id)
+            .filter(Project.organization_id == current_user.id)
+            .group_by(Registration.project_id, Registration.status)
+        ):
+            registration_counts[project_id][status] = count
         
         active_projects = sum(
             1
@@ -86,17 +93,7 @@ def api_users_me_dashboard():
             if p.status
             in (ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)
         )
-        active_registration_statuses = (
-            RegistrationStatus.REGISTERED.value,
-            RegistrationStatus.APPROVED.value,
-        )
-        total_participants = sum(
-            Registration.query.filter(
-                Registration.project_id == p.id,
-                Registration.status.in_(active_registration_statuses)
-            ).count()
-            for p in projects
-        )
+        total_participants = sum(p.active_registrations for p in projects)
         completed_projects = sum(
             1 for p in projects if p.status == ProjectStatus.COMPLETED.value
         )
@@ -106,46 +103,24 @@ def api_users_me_dashboard():
         
         projects_payload = []
         for project in projects:
-            registrations = Registration.query.filter_by(project_id=project.id).all()
-            projects_payload.append({
-                'id': project.id,
-                'title': project.title,
-                'status': project.status,
-                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-                'location': project.location,
-                'max_participants': project.max_participants,
-                'current_participants': sum(1 for r in registrations if r.status in active_registration_statuses),
-                'rating': project.rating
-            })
+            counts = registration_counts.get(project.id, {})
+            projects_payload.append(serializers.organization_project(
+                project, registration_counts=counts, total_registrations=sum(counts.values())
+            ))
         
-        # Get recent projects from the last week
+        # Recent approved projects from the last week, taken from the list already loaded
         week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_projects = (
-            Project.query.filter(
-                Project.organization_id == current_user.id,
-                Project.created_at >= week_ago,
-                Project.status == ProjectStatus.APPROVED.value,
-            )
-            .order_by(Project.created_at.desc())
-            .limit(8)
-            .all()
-        )
+        recent_projects = [
+            p for p in projects
+            if p.created_at and p.created_at >= week_ago
+            and p.status == ProjectStatus.APPROVED.value
+        ][:8]
+        organization_name = current_user.display_name or current_user.username
         
-        recent_projects_payload = []
-        for project in recent_projects:
-            registrations = Registration.query.filter_by(project_id=project.id).all()
-            recent_projects_payload.append({
-                'id': project.id,
-                'title': project.title,
-                'status': project.status,
-                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-                'location': project.location,
-                'created_at': project.created_at.strftime('%Y-%m-%d') if project.created_at else None,
-                'current_participants': sum(1 for r in registrations if r.status in active_registration_statuses),
-                'max_participants': project.max_participants,
-                'rating': project.rating,
-                'organization_name': project.organization.display_name or project.organization.username if project.organization else None
-            })
+        recent_projects_payload = [
+            serializers.organization_recent_project(project, organization_name=organization_name)
+            for project in recent_projects
+        ]
         
         return jsonify({
             'statistics': {
@@ -159,66 +134,26 @@ def api_users_me_dashboard():
         })
     
     elif user_type == 'admin':
-        # Pending projects for review
-        pending_projects = Project.query.filter_by(
-            status=ProjectStatus.PENDING.value
-        ).order_by(Project.created_at.desc()).all()
-        projects_payload = []
-        for project in pending_projects:
-            org = project.organization
-            projects_payload.append({
-                'id': project.id,
-                'title': project.title,
-                'organization_name': org.display_name or org.username if org else 'Unknown',
-                'organization_email': org.email if org else None,
-                'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-                'location': project.location,
-                'max_participants': project.max_participants,
-                'rating': project.rating,
-                'description': project.description,
-                'submitted_date': project.created_at.strftime('%Y-%m-%d') if project.created_at else None
-            })
+        # First page of each review queue (eager-loaded); the rest is paged
+        # through /api/v1/admin/review/projects and /api/v1/admin/review/records
+        pending_projects, projects_cursor = pending_projects_page()
+        projects_payload = [serializers.pending_project(project) for project in pending_projects]
         
-        # Pending volunteer records for review
-        pending_records = (
-            VolunteerRecord.query.filter_by(status=VolunteerRecordStatus.PENDING.value)
-            .order_by(VolunteerRecord.completed_at.desc())
-            .all()
-        )
-        records_payload = []
-        for record in pending_records:
-            participant = record.user
-            project = record.project
-            org = project.organization if project else None
-            records_payload.append({
-                'id': record.id,
-                'participant_name': participant.display_name or participant.username,
-                'project_name': project.title if project else 'Unknown',
-                'organization_name': org.display_name or org.username if org else 'Unknown',
-                'hours': record.hours,
-                'points': record.points,
-                'completion_date': record.completed_at.strftime('%Y-%m-%d') if record.completed_at else None
-            })
+        pending_records, records_cursor = pending_records_page()
+        records_payload = [serializers.pending_record(record) for record in pending_records]
         
         # All users (exclude admin users)
-        users = User.query.filter(User.user_type != 'admin').order_by(User.created_at.desc()).limit(100).all()
-        users_payload = []
-        for u in users:
-            users_payload.append({
-                'id': u.id,
-                'username': u.username,
-                'display_name': u.display_name,
-                'email': u.email,
-                'user_type': u.user_type,
-                'is_active': u.is_active if hasattr(u, 'is_active') else True,
-                'ban_reason': getattr(u, 'ban_reason', None),
-                'ban_until': u.ban_until.isoformat() if getattr(u, 'ban_until', None) else None,
-                'created_at': u.created_at.strftime('%Y-%m-%d') if u.created_at else None
-            })
+        users = User.query.filter(
+            User.user_type.in_(('participant', 'organization'))
+        ).order_by(User.created_at.desc()).limit(100).all()
+        users_payload = [serializers.user(u) for u in users]
         
         return jsonify({
             'pending_projects': projects_payload,
+            'pending_projects_next_cursor': projects_cursor,
             'pending_records': records_payload,
+            'pending_records_next_cursor': records_cursor,
+            'pending_totals': pending_review_totals(),
             'users': users_payload
         })
     
@@ -0,0 +1,92 @@
+"""Background job API routes (submit, poll status, download result)."""
+import os
+
+from flask import Blueprint, request, jsonify, send_file, url_for
+from flask_login import login_required, current_user
+
+from models import db, Job, JobStatus
+from jobs import TASKS, submit_job, job_result
+
+bp = Blueprint('api_jobs', __name__)
+
+
+def serialize_job(job):
+    result = job_result(job)
+    data = {
+        'id': job.id,
+        'name': job.name,
+        'status': job.status,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'error': job.error,
+        'status_url': url_for('api_jobs.api_job_status', job_id=job.id),
+    }
+    if job.status == JobStatus.SUCCEEDED.value and job.result_path:
+        data['download_url'] = url_for('api_jobs.api_job_download', job_id=job.id)
+        data['filename'] = result.get('filename')
+    return data
+
+
+def job_accepted(job, message, **extra):
+    """202 response for a queued job, pointing the client at its status URL."""
+    data = serialize_job(job)
+    response = jsonify({'job_id': job.id, 'message': message, **extra, **data})
+    response.headers['Location'] = data['status_url']
+    return response, 202
+
+
+def _get_visible_job(job_id):
+    job = db.get_or_404(Job, job_id)
+    if current_user.user_type != 'admin' and job.owner_id != current_user.id:
+        # Do not reveal other users' job ids
+        return None
+    return job
+
+
+@bp.route('/api/v1/jobs', methods=['POST'])
+@login_required
+def api_jobs_submit():
+    """Queue a job. Only tasks with a `prepare` hook can be submitted here."""
+    data = request.get_json() or {}
+    job_task = TASKS.get(data.get('name'))
+    if job_task is None or job_task.prepare is None:
+        return jsonify({'error': 'Unknown job'}), 400
+    try:
+        params = job_task.prepare(data.get('params') or {}, current_user)
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 403
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    job = submit_job(job_task.name, params, owner_id=current_user.id)
+    return job_accepted(job, 'Job queued')
+
+
+@bp.route('/api/v1/jobs/<job_id>', methods=['GET'])
+@login_required
+def api_job_status(job_id):
+    """Poll a job's status."""
+    job = _get_visible_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(serialize_job(job))
+
+
+@bp.route('/api/v1/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def api_job_download(job_id):
+    """Download the file produced by a finished job."""
+    job = _get_visible_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != JobStatus.SUCCEEDED.value:
+        return jsonify({'error': 'Job has not finished', 'status': job.status}), 409
+    if not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': 'Job result has expired'}), 410
+    result = job_result(job)
+    return send_file(
+        job.result_path,
+        mimetype=result.get('mimetype') or 'application/octet-stream',
+        as_attachment=True,
+        download_name=result.get('filename') or job.id,
+    )
@@ -0,0 +1,78 @@
+"""Leaderboard API routes (public participant rankings)."""
+import re
+
+from flask import Blueprint, request, jsonify
+from flask_login import current_user
+
+from utils import encode_cursor, decode_cursor
+from utils.leaderboard import ALL, top, entry_of, board_size
+
+bp = Blueprint('api_leaderboard', __name__)
+
+DEFAULT_LEADERBOARD_PAGE_SIZE = 10
+MAX_LEADERBOARD_PAGE_SIZE = 100
+_MONTH_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+def serialize_entry(entry, name=None):
+    return {
+        'rank': entry.position,
+        'user_id': entry.user_id,
+        'name': name,
+        'points': entry.points,
+        'hours': entry.hours,
+        'records': entry.records,
+    }
+
+
+@bp.route('/api/v1/leaderboard', methods=['GET'])
+def api_leaderboard():
+    """Participants ranked by approved points (then hours), overall or per category/month.
+
+    Served from the precomputed leaderboard_entry table: the first page
+    and `me` (the signed-in participant's own entry) are index reads
+    however large the board is. Later pages follow `next_cursor`.
+    """
+    category = request.args.get('category', '').strip()
+    month = request.args.get('month', '').strip()
+    limit = request.args.get('limit', DEFAULT_LEADERBOARD_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+    if month and not _MONTH_RE.match(month):
+        return jsonify({'error': 'month must be formatted YYYY-MM'}), 400
+    if len(category) > 50:
+        return jsonify({'error': 'Invalid category'}), 400
+    if limit <= 0:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_LEADERBOARD_PAGE_SIZE)
+
+    after = None
+    if cursor:
+        values = decode_cursor(cursor, 3)
+        try:
+            after = (int(values[0]), float(values[1]), int(values[2]))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    board = (category or ALL, month or ALL)
+    rows = top(*board, limit + 1, after=after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.points, last.hours, last.user_id)
+
+    me = None
+    if current_user.is_authenticated and current_user.user_type == 'participant':
+        entry = entry_of(*board, current_user.id)
+        if entry is not None:
+            me = serialize_entry(entry, current_user.display_name or current_user.username)
+
+    return jsonify({
+        'category': category or None,
+        'month': month or None,
+        'participants': board_size(*board),
+        'entries': [serialize_entry(entry, name) for entry, name in rows],
+        'me': me,
+        'limit': limit,
+        'next_cursor': next_cursor,
+    })
@@ -0,0 +1,25 @@
+"""Prometheus metrics endpoint (GET /metrics)."""
+from flask import Blueprint, current_app, jsonify, request
+from flask_login import current_user
+
+from utils.metrics import metrics
+
+bp = Blueprint('api_metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@bp.route('/metrics', methods=['GET'])
+def api_metrics():
+    """Request counters, latency histograms, in-flight requests and DB pool waits of all workers.
+
+    Served to signed-in admins and to clients in METRICS_ALLOWED_IPS (the
+    scraper; empty by default, since behind a reverse proxy every request
+    comes from the proxy's address).
+    """
+    allowed_ips = current_app.config.get('METRICS_ALLOWED_IPS', ())
+    if request.remote_addr not in allowed_ips and not (
+        current_user.is_authenticated and current_user.user_type == 'admin'
+    ):
+        return jsonify({'error': 'Unauthorized'}), 403
+    return current_app.response_class(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
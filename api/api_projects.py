@@ -11,42 +11,47 @@ defined in `schemas.py` before being persisted.
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, current_app
 from flask_login import login_required, current_user
 from datetime import datetime
+import hashlib
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
 import logging
 
 from models import (
     db,
     Project,
     Registration,
-    Comment,
-    VolunteerRecord,
     User,
+    UserStats,
+    VolunteerRecord,
     ProjectStatus,
-    RegistrationStatus
+    RegistrationStatus,
+    VolunteerRecordStatus,
+    ACTIVE_REGISTRATION_STATUSES,
 )
 from marshmallow import ValidationError
 from schemas import ProjectCreateSchema, ProjectUpdateSchema
+from api.api_comments import comment_threads_page, serialize_thread
+from utils.catalog_cache import catalog_cache, catalog_version
+from utils import encode_cursor, decode_cursor, leaderboard, serializers
+from utils.search import fts_match_expression, ranking_window, search_projects
+from jobs import submit_job
+from api.api_jobs import job_accepted
 
 bp = Blueprint('api_projects', __name__)
 logger = logging.getLogger(__name__)
 
-@bp.route('/api/v1/projects', methods=['GET'])
-def api_projects_list():
-    """Get projects for the homepage / dashboards with optional filters."""
-    # Support query parameters
-    status = request.args.get('status')  # None means all registrable statuses
-    available = request.args.get('available', 'false').lower() == 'true'
-    all_projects = request.args.get('all', 'false').lower() == 'true'
-    today = datetime.utcnow().date()
-    
+# Upper bound for `limit` on paginated project listings
+MAX_PAGE_SIZE = 100
+
+
+def _catalog_query(status, available, all_projects, today):
+    """Projects matching the user-independent list filters."""
     query = Project.query
     
     # Filter logic
     if all_projects:
         # If 'all' is requested, only admin can see everything, organizations see their own?
         # For now, let's assume this parameter is for admin use cases where they need to see pending
-        if not current_user.is_authenticated or current_user.user_type != 'admin':
-           pass # Could restrict here, but keeping flexible for now as per requirements
-        
         if status:
             query = query.filter_by(status=status)
             
@@ -62,86 +67,228 @@ def api_projects_list():
     
     if available:
         query = query.filter(Project.date >= today)
-        
+    return query
+
+
+def _catalog_page(query, limit, cursor_key):
+    """Serialize one keyset page of `query` on (date, id); returns (projects, next_cursor).
+
+    Without a limit the whole list is returned (and next_cursor is None).
+    """
+    if cursor_key:
+        cursor_date, cursor_id = cursor_key
+        query = query.filter(
+            or_(
+                Project.date > cursor_date,
+                and_(Project.date == cursor_date, Project.id > cursor_id),
+            )
+        )
+    order = (Project.date.asc(), Project.id.asc())
+    if limit is None:
+        return [serializers.project_card(p) for p in query.options(joinedload(Project.organization)).order_by(*order)], None
+
+    # Sort ids only, then load the page's rows: sorting whole rows would carry
+    # every matching description through the sort. One extra id tells whether
+    # another page exists.
+    page_ids = query.with_entities(Project.id).order_by(*order).limit(limit + 1).subquery()
+    rows = (
+        Project.query.options(joinedload(Project.organization))
+        .join(page_ids, page_ids.c.id == Project.id)
+        .order_by(*order)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return [serializers.project_card(p) for p in rows], next_cursor
+
+
+@bp.route('/api/v1/projects', methods=['GET'])
+def api_projects_list():
+    """Get projects for the homepage / dashboards with optional filters.
+
+    Without `limit` the full list is returned as a JSON array. With `limit`
+    (and optionally `cursor`) results are keyset-paginated on (date, id) and
+    wrapped as {'projects': [...], 'next_cursor': ...}.
+
+    Each page is one keyset query. User-independent pages are served from
+    catalog_cache, keyed by filters, limit and cursor, and rebuilt only
+    after a project or registration write. Participants browsing available
+    projects get their own page (their registered projects are excluded
+    in SQL); elsewhere their registration status is overlaid on the cached
+    page. Responses carry a strong ETag and answer If-None-Match with 304.
+    """
+    # Support query parameters
+    status = request.args.get('status')  # None means all registrable statuses
+    available = request.args.get('available', 'false').lower() == 'true'
+    all_projects = request.args.get('all', 'false').lower() == 'true'
+    limit = request.args.get('limit', type=int)
+    cursor = request.args.get('cursor')
+    today = datetime.utcnow().date()
+
+    if limit is not None and limit <= 0:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    if limit is not None:
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor_key = None
+    if cursor:
+        values = decode_cursor(cursor, 2)
+        try:
+            cursor_key = (datetime.strptime(values[0], '%Y-%m-%d').date(), int(values[1]))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    # Per-user overlay: the participant's own registrations (any status)
+    is_participant = current_user.is_authenticated and current_user.user_type == 'participant'
+    user_registrations = {}
+    if is_participant:
+        registrations = db.session.query(Registration.project_id, Registration.status).filter(
+            Registration.user_id == current_user.id
+        ).all()
+        user_registrations = {project_id: reg_status for project_id, reg_status in registrations}
+
+    page_key = (status, available, all_projects, today, limit, cursor_key)
+    version = catalog_version.current()
+    etag = hashlib.sha1(repr((version, page_key, sorted(user_registrations.items()))).encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    query = _catalog_query(status, available, all_projects, today)
+    if available and user_registrations:
         # Exclude projects that the user has already registered for (any status)
         # This ensures users don't see projects they've already interacted with
-        if current_user.is_authenticated and current_user.user_type == 'participant':
-            registered_project_ids = [
-                r.project_id for r in Registration.query.filter_by(user_id=current_user.id).all()
+        registered_project_ids = db.select(Registration.project_id).where(Registration.user_id == current_user.id)
+        projects, next_cursor = _catalog_page(
+            query.filter(~Project.id.in_(registered_project_ids)), limit, cursor_key
+        )
+    else:
+        _, (projects, next_cursor) = catalog_cache.get_or_build(
+            page_key, lambda: _catalog_page(query, limit, cursor_key)
+        )
+        if user_registrations and not available:
+            # Include user's registration status if exists (only for non-available queries);
+            # cached dicts are shared, so overlay onto copies
+            projects = [
+                dict(p, user_registration_status=user_registrations[p['id']]) if p['id'] in user_registrations else p
+                for p in projects
             ]
-            if registered_project_ids:
-                query = query.filter(~Project.id.in_(registered_project_ids))
-    
-    projects = query.order_by(Project.date.asc()).all()
-    
-    # Get user's registrations if authenticated participant (for non-available queries)
-    user_registrations = {}
-    if current_user.is_authenticated and current_user.user_type == 'participant' and not available:
-        registrations = Registration.query.filter_by(user_id=current_user.id).all()
-        user_registrations = {r.project_id: r.status for r in registrations}
-    
-    result = []
-    for p in projects:
-        current_participants = sum(
-            1 for r in p.registrations if r.status != RegistrationStatus.CANCELLED.value
+
+    if limit is None:
+        response = jsonify(projects)
+    else:
+        response = jsonify({
+            'projects': projects,
+            'limit': limit,
+            'next_cursor': next_cursor
+        })
+    response.set_etag(etag)
+    # Participant responses differ per session; always revalidate
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
+
+
+# Statuses anyone can search; admins may also search pending/rejected projects
+PUBLIC_SEARCH_STATUSES = (
+    ProjectStatus.APPROVED.value,
+    ProjectStatus.IN_PROGRESS.value,
+    ProjectStatus.COMPLETED.value,
+)
+DEFAULT_SEARCH_PAGE_SIZE = 20
+
+
+@bp.route('/api/v1/projects/search', methods=['GET'])
+def api_projects_search():
+    """Full-text search over project title, description, location, category and requirements.
+
+    Results are ranked by weighted BM25 (best first) and keyset-paginated on
+    (rank, id). Broad queries rank only their newest SEARCH_MAX_RANKED_MATCHES
+    matches that pass the filters. Each result carries HTML-safe `highlight.title` and
+    `highlight.snippet` with matches wrapped in <mark>. Supports the same
+    `status` and `available` filters as the project list; participants
+    searching available projects do not see ones they registered for.
+    """
+    match = fts_match_expression(request.args.get('q', ''))
+    if match is None:
+        return jsonify({'error': 'q must contain at least one word'}), 400
+    status = request.args.get('status')
+    available = request.args.get('available', 'false').lower() == 'true'
+    limit = request.args.get('limit', DEFAULT_SEARCH_PAGE_SIZE, type=int)
+    cursor = request.args.get('cursor')
+    if limit <= 0:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    is_admin = current_user.is_authenticated and current_user.user_type == 'admin'
+    if status:
+        if status not in PUBLIC_SEARCH_STATUSES and not (is_admin and status in {s.value for s in ProjectStatus}):
+            return jsonify({'error': 'Invalid status'}), 400
+        statuses = (status,)
+    elif available:
+        statuses = (ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)
+    else:
+        statuses = PUBLIC_SEARCH_STATUSES
+
+    exclude_user_id = None
+    if available and current_user.is_authenticated and current_user.user_type == 'participant':
+        exclude_user_id = current_user.id
+    from_date = datetime.utcnow().date() if available else None
+
+    # The cursor also pins the ranking window, so later pages rank the same rows
+    after = None
+    if cursor:
+        values = decode_cursor(cursor, 3)
+        try:
+            after = (float(values[0]), int(values[1]))
+            min_rowid = int(values[2]) if values[2] is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        min_rowid = ranking_window(
+            match,
+            current_app.config['SEARCH_MAX_RANKED_MATCHES'],
+            statuses,
+            from_date=from_date,
+            exclude_user_id=exclude_user_id,
         )
-        project_data = {
-            'id': p.id,
-            'title': p.title,
-            'category': p.category,
-            'date': p.date.strftime('%Y-%m-%d') if p.date else None,
-            'location': p.location,
-            'rating': p.rating,
-            'max_participants': p.max_participants,
-            'current_participants': current_participants,
-            'status': p.status,
-            'organization_name': p.organization.display_name or p.organization.username if p.organization else None,
-            'description': p.description, 
-            'created_at': p.created_at.strftime('%Y-%m-%d') if hasattr(p, 'created_at') and p.created_at else None,
-            'organization': {
-                'id': p.organization_id,
-                'name': p.organization.display_name or p.organization.username if p.organization else None
-            }
-        }
-        # Include user's registration status if exists (only for non-available queries)
-        if p.id in user_registrations:
-            project_data['user_registration_status'] = user_registrations[p.id]
-        
-        # Only include if not expired when available=true
-        if not available or (p.date and p.date >= today):
-            result.append(project_data)
-    
-    return jsonify(result)
+
+    results = search_projects(
+        match,
+        statuses,
+        limit,
+        after=after,
+        min_rowid=min_rowid,
+        from_date=from_date,
+        exclude_user_id=exclude_user_id,
+    )
+
+    projects = [
+        serializers.project_search_hit(
+            project,
+            organization_name=organization_name,
+            score=round(-rank, 4),
+            title_html=title_html,
+            snippet_html=snippet_html,
+        )
+        for project, organization_name, rank, title_html, snippet_html in results
+    ]
+
+    next_cursor = None
+    if len(results) == limit:
+        last_project, _, last_rank, _, _ = results[-1]
+        next_cursor = encode_cursor(last_rank, last_project.id, min_rowid)
+    return jsonify({'projects': projects, 'limit': limit, 'next_cursor': next_cursor})
 
 
 @bp.route('/api/v1/projects/<int:project_id>', methods=['GET'])
 def api_project_detail(project_id):
     """Get a single project by ID."""
     project = Project.query.get_or_404(project_id)
-    organization = project.organization
-    
-    return jsonify({
-        'id': project.id,
-        'title': project.title,
-        'description': project.description,
-        'category': project.category,
-        'date': project.date.strftime('%Y-%m-%d') if project.date else None,
-        'location': project.location,
-        'rating': project.rating,
-        'max_participants': project.max_participants,
-        'current_participants': sum(
-            1 for r in project.registrations if r.status != RegistrationStatus.CANCELLED.value
-        ),
-        'duration': project.duration,
-        'points': project.points,
-        'status': project.status,
-        'requirements': project.requirements,
-        'organization': {
-            'id': organization.id if organization else None,
-            'name': organization.display_name or organization.username if organization else None,
-            'email': organization.email if organization else None
-        } if organization else None
-    })
+    return jsonify(serializers.project_detail(project))
 
 
 @bp.route('/api/v1/projects', methods=['POST'])
@@ -191,6 +338,7 @@ def api_projects_create():
     )
     db.session.add(project)
     db.session.commit()
+    catalog_version.bump()
     logger.info(f'Project created id={project.id} status={initial_status} org={current_user.id}')
     
     message = 'Project created successfully'
@@ -221,6 +369,7 @@ def api_projects_review(project_id):
         
     project.status = status
     db.session.commit()
+    catalog_version.bump()
     logger.info(f'Project review id={project.id} status={status} admin={current_user.id}')
     
     return jsonify({
@@ -252,6 +401,7 @@ def api_projects_set_rating(project_id):
 
     project.rating = rating
     db.session.commit()
+    catalog_version.bump()
     logger.info(f'Project rating updated id={project.id} rating={project.rating} admin={current_user.id}')
 
     return jsonify({
@@ -298,13 +448,35 @@ def api_projects_update(project_id):
             return jsonify({'error': error_msg, 'details': err.messages}), 400
 
         # Apply updates
+        old_date = project.date
+        # Category boards count approved records under their project's category
+        moved_records = None
+        if validated_data.get('category', project.category) != project.category:
+            moved_records = and_(
+                VolunteerRecord.project_id == project.id,
+                VolunteerRecord.status == VolunteerRecordStatus.APPROVED.value,
+            )
+            leaderboard.add_approved_records(moved_records, -1)
         for key, value in validated_data.items():
             setattr(project, key, value)
+        if moved_records is not None:
+            db.session.flush()
+            leaderboard.add_approved_records(moved_records, 1)
+        if project.date != old_date:
+            # Registrants' upcoming counts depend on the project date
+            db.session.flush()
+            UserStats.recount_upcoming(
+                db.select(Registration.user_id).where(
+                    Registration.project_id == project.id,
+                    Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+                )
+            )
             
     else:
         return jsonify({'error': 'Unauthorized'}), 403
     
     db.session.commit()
+    catalog_version.bump()
     logger.info(f'Project updated id={project.id} by user={current_user.id} status={project.status}')
     return jsonify({
         'id': project.id,
@@ -323,39 +495,9 @@ def api_projects_delete(project_id):
     if current_user.user_type != 'organization' or project.organization_id != current_user.id:
         return jsonify({'error': 'Unauthorized. You can only delete your own projects.'}), 403
     
-    try:
-        pid = project.id
-        
-        # Delete all comments on this project (including replies)
-        # First, get all comment IDs from this project
-        project_comments = Comment.query.filter_by(project_id=pid).all()
-        project_comment_ids = [c.id for c in project_comments]
-        
-        # Delete all replies to comments on this project (must delete replies first due to foreign key)
-        if project_comment_ids:
-            Comment.query.filter(Comment.parent_id.in_(project_comment_ids)).delete(synchronize_session=False)
-        
-        # Delete all comments on this project
-        Comment.query.filter_by(project_id=pid).delete(synchronize_session=False)
-        
-        # Delete all registrations for this project
-        Registration.query.filter_by(project_id=pid).delete(synchronize_session=False)
-        
-        # Delete all volunteer records for this project
-        VolunteerRecord.query.filter_by(project_id=pid).delete(synchronize_session=False)
-        
-        # Delete the project itself
-        db.session.delete(project)
-        db.session.commit()
-        current_app.logger.info(f'Project deleted id={pid} by org={current_user.id}')
-        
-        return jsonify({
-            'message': 'Project deleted successfully'
-        })
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f'Error deleting project {project_id}: {str(e)}', exc_info=True)
-        return jsonify({'error': f'Failed to delete project: {str(e)}'}), 500
+    job = submit_job('delete_project', {'project_id': project.id}, owner_id=current_user.id)
+    current_app.logger.info(f'Project delete queued id={project.id} job={job.id} by org={current_user.id}')
+    return job_accepted(job, 'Project deletion started')
 
 
 @bp.route('/project/<int:project_id>')
@@ -364,22 +506,11 @@ def project_detail(project_id):
     # Get organization info
     organization = User.query.get(project.organization_id)
     # Get registration count (only active registrations)
-    active_statuses = ('registered', 'approved')
-    registration_count = Registration.query.filter(
-        Registration.project_id == project.id,
-        Registration.status.in_(active_statuses)
-    ).count()
-    # Get comments for display
-    comments = Comment.query.filter_by(project_id=project.id).order_by(Comment.created_at.desc()).limit(20).all()
-    comments_data = []
-    for comment in comments:
-        comments_data.append({
-            'id': comment.id,
-            'user_name': comment.user.display_name or comment.user.username if comment.user else 'Unknown',
-            'user_type': comment.user.user_type.title() if comment.user else 'Unknown',
-            'comment': comment.content,
-            'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M') if comment.created_at else None
-        })
+    active_statuses = ACTIVE_REGISTRATION_STATUSES
+    registration_count = project.active_registrations
+    # First page of comment threads (roots + first replies, users joined) in one query
+    threads, comments_next_cursor = comment_threads_page(project.id)
+    comments_data = [serialize_thread(root, replies) for root, replies in threads]
     
     # Check if current user is registered or is the organization owner
     is_registered = False
@@ -409,6 +540,7 @@ def project_detail(project_id):
                          organization=organization,
                          registration_count=registration_count,
                          comments=comments_data,
+                         comments_next_cursor=comments_next_cursor,
                          is_registered=is_registered,
                          can_comment=can_comment,
                          user_type=user_type,
@@ -1,14 +1,176 @@
 """Volunteer Records API routes."""
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, send_file, current_app
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, current_app
 from flask_login import login_required, current_user
+from datetime import datetime
 import logging
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import aliased, joinedload
 
-from models import db, Project, VolunteerRecord, VolunteerRecordStatus
-from utils import generate_excel_from_records
+from models import db, Project, User, UserStats, VolunteerRecord, VolunteerRecordStatus
+from utils import encode_cursor, decode_cursor, leaderboard, parse_year, serializers
+from jobs import submit_job
+from jobs.tasks import export_params
+from api.api_jobs import job_accepted
 
 bp = Blueprint('api_records', __name__)
 logger = logging.getLogger(__name__)
 
+# Record history page sizes
+DEFAULT_HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+
+_record_year = func.strftime('%Y', VolunteerRecord.completed_at)
+
+
+def _history_filters(user_id, year=None, category=None, status=None):
+    """WHERE clauses for a participant's record history."""
+    clauses = [VolunteerRecord.user_id == user_id]
+    if year:
+        # Half-open range keeps ix_volunteer_record_user_completed_at usable
+        clauses += [
+            VolunteerRecord.completed_at >= datetime(year, 1, 1),
+            VolunteerRecord.completed_at < datetime(year + 1, 1, 1),
+        ]
+    if category:
+        clauses.append(Project.category == category)
+    if status:
+        clauses.append(VolunteerRecord.status == status)
+    return clauses
+
+
+def record_history_page(user_id, limit, cursor=None, year=None, category=None, status=None):
+    """One page of a participant's records, newest first, with project and organization joined in.
+
+    Keyset-paginated on (completed_at desc, id desc); records without a
+    completion time come last. Returns (items, next_cursor) with items shaped
+    like the volunteer record page rows. Raises ValueError on a malformed cursor.
+    """
+    organization = aliased(User)
+    stmt = (
+        db.select(
+            VolunteerRecord.id,
+            VolunteerRecord.hours,
+            VolunteerRecord.points,
+            VolunteerRecord.status,
+            VolunteerRecord.completed_at,
+            Project.id,
+            Project.title,
+            Project.category,
+            organization.display_name,
+            organization.username,
+        )
+        .select_from(VolunteerRecord)
+        .outerjoin(Project, Project.id == VolunteerRecord.project_id)
+        .outerjoin(organization, organization.id == Project.organization_id)
+        .where(*_history_filters(user_id, year, category, status))
+    )
+    if cursor:
+        values = decode_cursor(cursor, 2)
+        try:
+            cursor_ts = datetime.fromisoformat(values[0]) if values[0] is not None else None
+            cursor_id = int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid cursor')
+        if cursor_ts is None:
+            stmt = stmt.where(VolunteerRecord.completed_at.is_(None), VolunteerRecord.id < cursor_id)
+        else:
+            stmt = stmt.where(or_(
+                VolunteerRecord.completed_at < cursor_ts,
+                and_(VolunteerRecord.completed_at == cursor_ts, VolunteerRecord.id < cursor_id),
+                VolunteerRecord.completed_at.is_(None),
+            ))
+    rows = db.session.execute(
+        stmt.order_by(VolunteerRecord.completed_at.desc(), VolunteerRecord.id.desc()).limit(limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][4], rows[-1][0])
+    items = []
+    for record_id, hours, points, status, completed_at, project_id, title, category, org_display_name, org_username in rows:
+        items.append({
+            'record': {
+                'id': record_id,
+                'hours': hours,
+                'points': points,
+                'status': status,
+                'completed_at': completed_at.strftime('%Y-%m-%d') if completed_at else None
+            },
+            'project': {
+                'id': project_id,
+                'title': title,
+                'category': category
+            } if project_id is not None else None,
+            'organization': {
+                'display_name': org_display_name,
+                'username': org_username
+            } if org_username is not None else None
+        })
+    return items, next_cursor
+
+
+def record_history_facets(user_id, year=None, category=None, status=None):
+    """Facet counts and totals for a participant's records from a single GROUP BY.
+
+    The records are grouped by (year, category, status); each facet then
+    counts the records matching the filters on the other two dimensions, so
+    choosing a year still shows every category available in it. `summary`
+    covers the records matching all filters.
+    """
+    rows = db.session.execute(
+        db.select(
+            _record_year,
+            Project.category,
+            VolunteerRecord.status,
+            func.count(VolunteerRecord.id),
+            func.sum(VolunteerRecord.hours),
+            func.sum(VolunteerRecord.points),
+        )
+        .select_from(VolunteerRecord)
+        .outerjoin(Project, Project.id == VolunteerRecord.project_id)
+        .where(VolunteerRecord.user_id == user_id)
+        .group_by(_record_year, Project.category, VolunteerRecord.status)
+    ).all()
+
+    years, categories, statuses = {}, {}, {}
+    summary = {'records': 0, 'approved_records': 0, 'approved_hours': 0.0, 'approved_points': 0}
+    for row_year, row_category, row_status, count, hours, points in rows:
+        row_year = int(row_year) if row_year else None
+        year_ok = not year or row_year == year
+        category_ok = not category or row_category == category
+        status_ok = not status or row_status == status
+        if row_year is not None and category_ok and status_ok:
+            years[row_year] = years.get(row_year, 0) + count
+        if row_category is not None and year_ok and status_ok:
+            categories[row_category] = categories.get(row_category, 0) + count
+        if year_ok and category_ok:
+            statuses[row_status] = statuses.get(row_status, 0) + count
+        if year_ok and category_ok and status_ok:
+            summary['records'] += count
+            if row_status == VolunteerRecordStatus.APPROVED.value:
+                summary['approved_records'] += count
+                summary['approved_hours'] += hours or 0.0
+                summary['approved_points'] += points or 0
+    return {
+        'years': [{'value': value, 'count': years[value]} for value in sorted(years, reverse=True)],
+        'categories': [{'value': value, 'count': categories[value]} for value in sorted(categories)],
+        'statuses': [{'value': value, 'count': statuses[value]} for value in sorted(statuses)],
+        'summary': summary,
+    }
+
+
+def _history_params(args):
+    """Parse year/category/status filters; returns (filters dict, error message)."""
+    try:
+        year = parse_year(args.get('year'))
+    except ValueError:
+        return None, 'Invalid year'
+    status = args.get('status') or None
+    if status and status not in {s.value for s in VolunteerRecordStatus}:
+        return None, 'Invalid status'
+    return {'year': year, 'category': args.get('category') or None, 'status': status}, None
+
 
 @bp.route('/api/v1/records', methods=['GET'])
 @login_required
@@ -35,38 +197,11 @@ def api_records_list():
     if user_id and current_user.user_type == 'admin':
         query = query.filter_by(user_id=user_id)
     
-    records = query.order_by(VolunteerRecord.completed_at.desc()).all()
-    
-    result = []
-    for record in records:
-        project = record.project
-        participant = record.user
-        organization = project.organization if project else None
-        
-        result.append({
-            'id': record.id,
-            'user_id': record.user_id,
-            'project_id': record.project_id,
-            'hours': record.hours,
-            'points': record.points,
-            'status': record.status,
-            'completed_at': record.completed_at.strftime('%Y-%m-%d') if record.completed_at else None,
-            'project': {
-                'id': project.id,
-                'title': project.title,
-                'category': project.category
-            } if project else None,
-            'participant': {
-                'id': participant.id,
-                'name': participant.display_name or participant.username
-            } if participant else None,
-            'organization': {
-                'id': organization.id,
-                'name': organization.display_name or organization.username
-            } if organization else None
-        })
-    
-    return jsonify(result)
+    records = query.options(
+        joinedload(VolunteerRecord.user),
+        joinedload(VolunteerRecord.project).joinedload(Project.organization),
+    ).order_by(VolunteerRecord.completed_at.desc()).all()
+    return jsonify([serializers.record(record) for record in records])
 
 
 @bp.route('/api/v1/records/<int:record_id>', methods=['GET'])
@@ -83,33 +218,7 @@ def api_record_detail(record_id):
         if not project or project.organization_id != current_user.id:
             return jsonify({'error': 'Unauthorized'}), 403
     
-    project = record.project
-    participant = record.user
-    organization = project.organization if project else None
-    
-    return jsonify({
-        'id': record.id,
-        'user_id': record.user_id,
-        'project_id': record.project_id,
-        'hours': record.hours,
-        'points': record.points,
-        'status': record.status,
-        'completed_at': record.completed_at.strftime('%Y-%m-%d') if record.completed_at else None,
-        'project': {
-            'id': project.id,
-            'title': project.title,
-            'category': project.category
-        } if project else None,
-        'participant': {
-            'id': participant.id,
-            'name': participant.display_name or participant.username,
-            'email': participant.email
-        } if participant else None,
-        'organization': {
-            'id': organization.id,
-            'name': organization.display_name or organization.username
-        } if organization else None
-    })
+    return jsonify(serializers.record_detail(record))
 
 
 @bp.route('/api/v1/records/<int:record_id>', methods=['PATCH'])
@@ -132,6 +241,12 @@ def api_record_update(record_id):
         }
         if data['status'] not in allowed_statuses:
             return jsonify({'error': 'Invalid status'}), 400
+        # Keep the participant's approved totals in step, in the same transaction
+        approved = VolunteerRecordStatus.APPROVED.value
+        if (data['status'] == approved) != (old_status == approved):
+            sign = 1 if data['status'] == approved else -1
+            UserStats.add_approved_records(VolunteerRecord.id == record.id, sign)
+            leaderboard.add_approved_records(VolunteerRecord.id == record.id, sign)
         record.status = data['status']
     
     db.session.commit()
@@ -181,6 +296,16 @@ def api_records_batch_update():
     if not records:
         return jsonify({'error': 'No records found'}), 404
     
+    # Move the participants' approved totals and standings before the statuses change
+    changing = and_(VolunteerRecord.id.in_([record.id for record in records]), VolunteerRecord.status != new_status)
+    if new_status == VolunteerRecordStatus.APPROVED.value:
+        UserStats.add_approved_records(changing, 1)
+        leaderboard.add_approved_records(changing, 1)
+    else:
+        leaving = and_(changing, VolunteerRecord.status == VolunteerRecordStatus.APPROVED.value)
+        UserStats.add_approved_records(leaving, -1)
+        leaderboard.add_approved_records(leaving, -1)
+    
     # Update all records
     updated_count = 0
     for record in records:
@@ -198,130 +323,97 @@ def api_records_batch_update():
     })
 
 
+@bp.route('/api/v1/users/me/records', methods=['GET'])
+@login_required
+def api_my_record_history():
+    """Get the current participant's record history, filtered and paginated in SQL.
+
+    Supports `year`, `category` and `status` filters plus `limit`/`cursor`
+    keyset pagination. Facet counts and the filtered summary are included
+    with the first page only (when no cursor is given).
+    """
+    if current_user.user_type != 'participant':
+        return jsonify({'error': 'Only participants have volunteer records'}), 403
+
+    filters, error = _history_params(request.args)
+    if error:
+        return jsonify({'error': error}), 400
+    limit = request.args.get('limit', DEFAULT_HISTORY_PAGE_SIZE, type=int)
+    if limit <= 0:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, MAX_HISTORY_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+
+    try:
+        items, next_cursor = record_history_page(current_user.id, limit, cursor, **filters)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    payload = {'records': items, 'limit': limit, 'next_cursor': next_cursor}
+    if not cursor:
+        payload['facets'] = record_history_facets(current_user.id, **filters)
+    return jsonify(payload)
+
+
 @bp.route('/volunteer-record')
 @login_required
 def volunteer_record():
     if current_user.user_type != 'participant':
         return redirect(url_for('auth.login'))
     
-    records = VolunteerRecord.query.filter_by(user_id=current_user.id).order_by(VolunteerRecord.completed_at.desc()).all()
-    
-    # Calculate statistics (only approved records count towards totals)
-    total_hours = sum(
-        r.hours for r in records if r.status == VolunteerRecordStatus.APPROVED.value
-    )
-    total_points = sum(
-        r.points for r in records if r.status == VolunteerRecordStatus.APPROVED.value
-    )
-    completed_count = len(
-        [r for r in records if r.status == VolunteerRecordStatus.APPROVED.value]
-    )
-    
-    # Prepare records data with project and organization info
-    records_data = []
-    years_set = set()
-    categories_set = set()
+    # Totals (approved records only) are maintained in user_stats; read them
+    # first, as building a missing row commits
+    stats = UserStats.current(current_user.id)
     
-    for record in records:
-        project = record.project
-        organization = project.organization if project else None
-        
-        # Collect years and categories for filters
-        if record.completed_at:
-            years_set.add(record.completed_at.year)
-        if project and project.category:
-            categories_set.add(project.category)
-        
-        records_data.append({
-            'record': {
-                'id': record.id,
-                'hours': record.hours,
-                'points': record.points,
-                'status': record.status,
-                'completed_at': record.completed_at.strftime('%Y-%m-%d') if record.completed_at else None
-            },
-            'project': {
-                'id': project.id if project else None,
-                'title': project.title if project else 'Unknown Project',
-                'category': project.category if project else None
-            } if project else None,
-            'organization': {
-                'display_name': organization.display_name if organization else None,
-                'username': organization.username if organization else None
-            } if organization else None
-        })
+    # Only the first page is rendered; volunteer_record.js fetches further
+    # pages and filtered views from /api/v1/users/me/records
+    records_data, next_cursor = record_history_page(current_user.id, DEFAULT_HISTORY_PAGE_SIZE)
+    facets = record_history_facets(current_user.id)
     
     return render_template('volunteer_record.html', 
                          user=current_user, 
                          records_data=records_data,
-                         total_hours=total_hours,
-                         total_points=total_points,
-                         completed_count=completed_count,
-                         available_years=sorted(years_set, reverse=True),
-                         available_categories=sorted(categories_set))
+                         next_cursor=next_cursor,
+                         facets=facets,
+                         total_hours=stats.total_hours,
+                         total_points=stats.total_points,
+                         completed_count=stats.completed_count,
+                         available_years=[facet['value'] for facet in facets['years']],
+                         available_categories=[facet['value'] for facet in facets['categories']])
 
 
 @bp.route('/api/participant/export-all-records')
 @login_required
 def api_export_all_records():
-    """Export all volunteer records for the current participant."""
+    """Queue an export of all volunteer records for the current participant."""
     if current_user.user_type != 'participant':
         return jsonify({'error': 'Not authenticated'}), 401
     
-    # Get all records
-    records = VolunteerRecord.query.filter_by(user_id=current_user.id).order_by(VolunteerRecord.completed_at.desc()).all()
-    
-    # Get user display_name (fallback to username if not set)
-    user_display_name = current_user.display_name or current_user.username
-    
-    output, filename = generate_excel_from_records(records, "all_volunteer_records", user_display_name)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
-    )
+    # The workbook is built in the job process pool; poll the returned job
+    # and fetch the file from its download URL
+    job = submit_job('export_records', export_params(current_user), owner_id=current_user.id)
+    return job_accepted(job, 'Export started')
 
 
 @bp.route('/api/participant/export-filtered-records', methods=['POST'])
 @login_required
 def api_export_filtered_records():
-    """Export filtered volunteer records for the current participant."""
+    """Queue an export of filtered volunteer records for the current participant."""
     if current_user.user_type != 'participant':
         return jsonify({'error': 'Not authenticated'}), 401
     
-    data = request.get_json()
-    year_filter = data.get('year')
-    category_filter = data.get('category')
-    
-    # Get all records
-    records = VolunteerRecord.query.filter_by(user_id=current_user.id).order_by(VolunteerRecord.completed_at.desc()).all()
-    
-    # Apply filters
-    filtered_records = []
-    for record in records:
-        # Year filter
-        if year_filter:
-            if not record.completed_at or record.completed_at.year != int(year_filter):
-                continue
-        
-        # Category filter
-        if category_filter:
-            if not record.project or record.project.category != category_filter:
-                continue
-        
-        filtered_records.append(record)
-    
-    # Get user display_name (fallback to username if not set)
-    user_display_name = current_user.display_name or current_user.username
-    
-    output, filename = generate_excel_from_records(filtered_records, "filtered_volunteer_records", user_display_name)
-    
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=filename
+    data = request.get_json() or {}
+    category_filter = data.get('category') or None
+    try:
+        year_filter = parse_year(data.get('year'))
+    except ValueError:
+        return jsonify({'error': 'Invalid year'}), 400
+    
+    # Year and category filters are applied in SQL by the job
+    job = submit_job(
+        'export_records',
+        export_params(current_user, year=year_filter, category=category_filter,
+                      filename_prefix='filtered_volunteer_records'),
+        owner_id=current_user.id,
     )
-
+    return job_accepted(job, 'Export started')
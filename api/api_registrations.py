@@ -1,7 +1,11 @@
 """Registrations API routes."""
 from flask import Blueprint, request, jsonify, current_app
 from flask_login import login_required, current_user
-from datetime import datetime
+from datetime import date, datetime
+from collections import defaultdict
+from sqlalchemy import and_, case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 import logging
 
 from models import (
@@ -9,104 +13,177 @@ from models import (
     Project,
     Registration,
     VolunteerRecord,
+    UserStats,
     ProjectStatus,
     RegistrationStatus,
     VolunteerRecordStatus,
+    ACTIVE_REGISTRATION_STATUSES,
 )
+from utils.catalog_cache import catalog_version
+from utils import serializers
 
 bp = Blueprint('api_registrations', __name__)
 logger = logging.getLogger(__name__)
 
+# Statuses an organization/admin may set through the update endpoints
+UPDATABLE_REGISTRATION_STATUSES = frozenset(status.value for status in RegistrationStatus)
+# Upper bound on explicit registration_ids in one batch request
+MAX_BATCH_REGISTRATIONS = 500
 
-def _check_and_auto_complete_project(project):
+
+def _reserve_seat(project_id, today):
+    """Atomically claim a seat on an open project. Does not commit.
+
+    A single guarded UPDATE enforces capacity and moves an approved project to
+    in_progress once min_participants is reached, so concurrent sign-ups cannot
+    overbook. Returns True if a seat was claimed.
     """
-    Check if project should be auto-completed.
-    Conditions:
-    1. Project is not already completed
-    2. Project status is 'approved' or 'in_progress'
-    3. Project date has passed (or is today)
-    4. At least one participant has completed
-    5. All participants are finalized (completed, cancelled, or rejected)
+    new_count = Project.active_registrations + 1
+    stmt = (
+        db.update(Project)
+        .where(
+            Project.id == project_id,
+            Project.status.in_((ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)),
+            Project.date >= today,
+            Project.active_registrations < Project.max_participants,
+        )
+        .values(
+            active_registrations=new_count,
+            status=case(
+                (
+                    and_(
+                        Project.status == ProjectStatus.APPROVED.value,
+                        new_count >= func.coalesce(Project.min_participants, 1),
+                    ),
+                    ProjectStatus.IN_PROGRESS.value,
+                ),
+                else_=Project.status,
+            ),
+        )
+    )
+    result = db.session.execute(stmt, execution_options={'synchronize_session': False})
+    return result.rowcount == 1
+
+
+def _adjust_active_registrations(project_id, old_status, new_status):
+    """Move Project.active_registrations by the seat change of a status transition.
+
+    Issued as a SQL-side increment so it is applied in the caller's transaction
+    without reading the current value first.
     """
-    if project.status == ProjectStatus.COMPLETED.value:
-        return False  # Already completed
-    
-    # Only auto-complete approved or in_progress projects
-    if project.status not in (
-        ProjectStatus.APPROVED.value,
-        ProjectStatus.IN_PROGRESS.value,
-    ):
-        return False
-    
-    # Check if project date has passed
-    if project.date:
-        from datetime import date
-        if project.date > date.today():
-            return False  # Project date hasn't arrived yet
-    
-    # Get all registrations for this project
-    all_registrations = Registration.query.filter_by(project_id=project.id).all()
-    
-    if not all_registrations:
-        return False  # No registrations, can't complete
-    
-    # Count completed participants
-    completed_count = sum(
-        1 for reg in all_registrations if reg.status == RegistrationStatus.COMPLETED.value
+    delta = (
+        (new_status in ACTIVE_REGISTRATION_STATUSES)
+        - (old_status in ACTIVE_REGISTRATION_STATUSES)
     )
-    
-    # Must have at least one completed participant
-    if completed_count == 0:
-        return False  # No completed participants, can't auto-complete
-    
-    # Check if all registrations are finalized (completed, cancelled, or rejected)
-    # Note: 'registered' and 'approved' are not finalized states
-    all_finalized = all(
-        reg.status
-        in (
-            RegistrationStatus.COMPLETED.value,
-            RegistrationStatus.CANCELLED.value,
-            RegistrationStatus.REJECTED.value,
+    if delta:
+        Project.query.filter_by(id=project_id).update(
+            {Project.active_registrations: Project.active_registrations + delta}
+        )
+
+
+def _recount_upcoming_if_changed(registration, old_status):
+    """Recount the participant's upcoming_count if the registration gained or lost its seat."""
+    if (registration.status in ACTIVE_REGISTRATION_STATUSES) != (old_status in ACTIVE_REGISTRATION_STATUSES):
+        db.session.flush()
+        UserStats.recount_upcoming([registration.user_id])
+
+
+def insert_missing_volunteer_records(registration_filter):
+    """Create a pending VolunteerRecord for each selected registration that has none.
+
+    registration_filter selects the (completed) Registration rows. A single
+    INSERT OR IGNORE ... SELECT; the unique (user_id, project_id) constraint
+    skips participants who already have a record. Does not commit. Returns
+    the number of records created.
+    """
+    completed = (
+        db.select(
+            Registration.user_id,
+            Registration.project_id,
+            Project.duration,
+            Project.points,
+            db.literal(VolunteerRecordStatus.PENDING.value),
+            db.literal(datetime.utcnow()),
         )
-        for reg in all_registrations
+        .join(Project, Project.id == Registration.project_id)
+        .where(registration_filter)
     )
-    
-    if not all_finalized:
-        return False  # Not all participants are finalized
-    
-    # Auto-complete the project
-    project.status = ProjectStatus.COMPLETED.value
-    
-    # Ensure volunteer records exist for completed participants
-    records_created = 0
-    for registration in all_registrations:
-        if registration.status == RegistrationStatus.COMPLETED.value:
-            # Check if volunteer record already exists
-            existing_record = VolunteerRecord.query.filter_by(
-                user_id=registration.user_id,
-                project_id=project.id
-            ).first()
-            
-            if not existing_record:
-                # Auto-approve short records disabled
-                record_status = VolunteerRecordStatus.PENDING.value
-                if project.duration <= 4 and False:
-                    record_status = VolunteerRecordStatus.APPROVED.value
-                
-                # Create volunteer record for confirmed participants
-                volunteer_record = VolunteerRecord(
-                    user_id=registration.user_id,
-                    project_id=project.id,
-                    hours=project.duration,
-                    points=project.points,
-                    status=record_status,
-                    completed_at=datetime.utcnow()
-                )
-                db.session.add(volunteer_record)
-                records_created += 1
-    
+    stmt = (
+        db.insert(VolunteerRecord)
+        .from_select(['user_id', 'project_id', 'hours', 'points', 'status', 'completed_at'], completed)
+        .prefix_with('OR IGNORE')
+    )
+    return db.session.execute(stmt).rowcount
+
+
+def auto_complete_projects(project_ids=None, today=None, after_id=None, limit=None):
+    """Mark eligible projects completed and backfill their volunteer records.
+
+    A project is eligible when:
+    1. Its status is 'approved' or 'in_progress'
+    2. Its date has passed (or is today)
+    3. At least one participant has completed
+    4. All participants are finalized (completed, cancelled, or rejected)
+
+    Candidates can be restricted to project_ids, and paged with after_id/limit
+    in id order. Eligibility is checked inside the UPDATE, so it holds under
+    the write lock. Does not commit. Returns the ids of the projects completed.
+    """
+    today = today or date.today()
+    has_completed = (
+        db.select(Registration.id)
+        .where(
+            Registration.project_id == Project.id,
+            Registration.status == RegistrationStatus.COMPLETED.value,
+        )
+        .exists()
+    )
+    # 'registered' and 'approved' are the only non-finalized states
+    has_unfinalized = (
+        db.select(Registration.id)
+        .where(
+            Registration.project_id == Project.id,
+            Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+        )
+        .exists()
+    )
+    candidates = db.select(Project.id).where(
+        Project.status.in_((ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)),
+        Project.date <= today,
+        has_completed,
+        ~has_unfinalized,
+    )
+    if project_ids is not None:
+        candidates = candidates.where(Project.id.in_(project_ids))
+    if after_id is not None:
+        candidates = candidates.where(Project.id > after_id)
+    if limit is not None:
+        candidates = candidates.order_by(Project.id).limit(limit)
+
+    completed_ids = db.session.execute(
+        db.update(Project)
+        .where(Project.id.in_(candidates.scalar_subquery()))
+        .values(status=ProjectStatus.COMPLETED.value)
+        .returning(Project.id),
+        execution_options={'synchronize_session': False},
+    ).scalars().all()
+    if completed_ids:
+        # Ensure volunteer records exist for completed participants
+        insert_missing_volunteer_records(and_(
+            Registration.project_id.in_(completed_ids),
+            Registration.status == RegistrationStatus.COMPLETED.value,
+        ))
+    return completed_ids
+
+
+def _check_and_auto_complete_project(project):
+    """Auto-complete a single project if eligible (see auto_complete_projects); commits if so."""
+    if not auto_complete_projects([project.id]):
+        return False
     db.session.commit()
-    current_app.logger.info(f'Project auto-completed id={project.id} completed_participants={completed_count}')
+    catalog_version.bump()
+    db.session.refresh(project)
+    current_app.logger.info(f'Project auto-completed id={project.id}')
     return True  # Project was auto-completed
 
 
@@ -127,26 +204,9 @@ def api_project_registrations_list(project_id):
         ).all()
     else:
         # Admin or organization owner can see all
-        registrations = Registration.query.filter_by(project_id=project_id).all()
+        registrations = Registration.query.filter_by(project_id=project_id).options(joinedload(Registration.user)).all()
     
-    # Serialize registrations for JSON response
-    result = []
-    for reg in registrations:
-        participant = reg.user
-        result.append({
-            'id': reg.id,
-            'user_id': reg.user_id,
-            'project_id': reg.project_id,
-            'status': reg.status,
-            'created_at': reg.created_at.strftime('%Y-%m-%d %H:%M:%S') if reg.created_at else None,
-            'participant': {
-                'id': participant.id,
-                'name': participant.display_name or participant.username,
-                'email': participant.email
-            } if participant else None
-        })
-    
-    return jsonify(result)
+    return jsonify([serializers.registration(reg) for reg in registrations])
 
 
 @bp.route('/api/v1/projects/<int:project_id>/registrations', methods=['POST'])
@@ -190,38 +250,37 @@ def api_project_registrations_create(project_id):
             }), 400
         return jsonify({'error': 'Already registered for this project'}), 400
     
-    # Check if project is full
-    current_registrations = Registration.query.filter(
-        Registration.project_id == project_id,
-        Registration.status.in_(
-            (
-                RegistrationStatus.REGISTERED.value,
-                RegistrationStatus.APPROVED.value,
-            )
-        ),
-    ).count()
-    
-    if current_registrations >= project.max_participants:
+    # Cheap early exit; the authoritative capacity check is the guarded UPDATE below
+    if project.active_registrations >= project.max_participants:
         return jsonify({'error': 'Project is full'}), 400
     
+    user_id = current_user.id
+    old_project_status = project.status
     registration = Registration(
-        user_id=current_user.id,
+        user_id=user_id,
         project_id=project_id,
         status=RegistrationStatus.REGISTERED.value,
     )
-    db.session.add(registration)
-    db.session.commit()
-    current_app.logger.info(f'Registration created id={registration.id} project={project_id} user={current_user.id}')
-    
-    # Check if min_participants reached to trigger in_progress status
-    new_count = current_registrations + 1
-    if (
-        project.status == ProjectStatus.APPROVED.value
-        and new_count >= (project.min_participants or 1)
-    ):
-        project.status = ProjectStatus.IN_PROGRESS.value
+    # Reserve the seat and insert in one short write transaction
+    try:
+        if not _reserve_seat(project_id, today):
+            db.session.rollback()
+            return jsonify({'error': 'Project is full'}), 400
+        db.session.add(registration)
+        db.session.flush()
+        UserStats.recount_upcoming([user_id], today)
+        db.session.refresh(project)
         db.session.commit()
-        current_app.logger.info(f'Project moved to in_progress id={project.id} new_count={new_count}')
+        catalog_version.bump()
+    except IntegrityError:
+        # A concurrent request from the same user won the unique (user_id, project_id) race;
+        # rolling back also releases the seat reserved above.
+        db.session.rollback()
+        return jsonify({'error': 'Already registered for this project'}), 400
+    current_app.logger.info(f'Registration created id={registration.id} project={project_id} user={user_id}')
+    
+    if project.status != old_project_status:
+        current_app.logger.info(f'Project moved to {project.status} id={project.id} new_count={project.active_registrations}')
     
     return jsonify({
         'id': registration.id,
@@ -245,25 +304,153 @@ def api_registration_detail(registration_id):
         if not project or project.organization_id != current_user.id:
             return jsonify({'error': 'Unauthorized'}), 403
     
-    participant = registration.user
-    project = registration.project
-    
-    return jsonify({
-        'id': registration.id,
-        'user_id': registration.user_id,
-        'project_id': registration.project_id,
-        'status': registration.status,
-        'created_at': registration.created_at.strftime('%Y-%m-%d %H:%M:%S') if registration.created_at else None,
-        'participant': {
-            'id': participant.id,
-            'name': participant.display_name or participant.username,
-            'email': participant.email
-        } if participant else None,
-        'project': {
-            'id': project.id,
-            'title': project.title
-        } if project else None
-    })
+    return jsonify(serializers.registration_detail(registration))
+
+
+@bp.route('/api/v1/registrations/batch', methods=['PATCH'])
+@login_required
+def api_registrations_batch_update():
+    """Update the status of many registrations in one transaction.
+
+    Body (JSON), either explicit ids:
+      {"registration_ids": [1, 2, 3], "status": "completed"}
+    or a filter over one project (optionally only registrations in from_status):
+      {"project_id": 7, "from_status": "approved", "status": "completed"}
+
+    Seat counters, participants' upcoming counts, volunteer records for
+    completed participants and the status change itself are applied with
+    set-based statements.
+    Registrations already in the target status are left alone, and cancelled
+    registrations are never reactivated. Auto-completion is then evaluated
+    for all affected projects in one statement.
+    """
+    if current_user.user_type not in ('organization', 'admin'):
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json(silent=True) or {}
+    new_status = (data.get('status') or '').strip().lower()
+    if new_status not in UPDATABLE_REGISTRATION_STATUSES:
+        return jsonify({'error': 'Invalid status'}), 400
+
+    registration_ids = data.get('registration_ids')
+    project_id = data.get('project_id')
+    if registration_ids is not None:
+        if not isinstance(registration_ids, list) or not registration_ids:
+            return jsonify({'error': 'registration_ids must be a non-empty list'}), 400
+        try:
+            registration_ids = sorted({int(rid) for rid in registration_ids})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'registration_ids must be integers'}), 400
+        if len(registration_ids) > MAX_BATCH_REGISTRATIONS:
+            return jsonify({'error': f'At most {MAX_BATCH_REGISTRATIONS} registration_ids per request'}), 400
+
+        # Validate ownership and the cancelled rule up front, as the single-item endpoint does
+        rows = db.session.execute(
+            db.select(Registration.id, Registration.status, Project.organization_id)
+            .join(Project, Project.id == Registration.project_id)
+            .where(Registration.id.in_(registration_ids))
+        ).all()
+        missing = sorted(set(registration_ids) - {row.id for row in rows})
+        if missing:
+            return jsonify({'error': 'Registrations not found', 'registration_ids': missing}), 404
+        if current_user.user_type == 'organization' and any(
+            row.organization_id != current_user.id for row in rows
+        ):
+            return jsonify({'error': 'Unauthorized'}), 403
+        if new_status != RegistrationStatus.CANCELLED.value:
+            cancelled = [row.id for row in rows if row.status == RegistrationStatus.CANCELLED.value]
+            if cancelled:
+                return jsonify({
+                    'error': 'Cancelled registrations cannot be reactivated.',
+                    'registration_ids': cancelled,
+                }), 400
+        target = Registration.id.in_(registration_ids)
+    elif project_id is not None:
+        project = db.session.get(Project, project_id) if isinstance(project_id, int) else None
+        if project is None:
+            return jsonify({'error': 'Project not found'}), 404
+        if current_user.user_type == 'organization' and project.organization_id != current_user.id:
+            return jsonify({'error': 'Unauthorized'}), 403
+        target = Registration.project_id == project.id
+        from_status = (data.get('from_status') or '').strip().lower()
+        if from_status:
+            if from_status not in UPDATABLE_REGISTRATION_STATUSES:
+                return jsonify({'error': 'Invalid from_status'}), 400
+            target = and_(target, Registration.status == from_status)
+    else:
+        return jsonify({'error': 'Provide registration_ids or project_id'}), 400
+
+    # Rows that actually change; cancelled ones are never reactivated
+    target = and_(
+        target,
+        Registration.status != new_status,
+        Registration.status != RegistrationStatus.CANCELLED.value,
+    )
+
+    # Seat counters first: the first write takes SQLite's write lock, so the
+    # statuses counted here are the ones the UPDATE below will change
+    if new_status in ACTIVE_REGISTRATION_STATUSES:
+        seat_change = Registration.status.not_in(ACTIVE_REGISTRATION_STATUSES)
+        sign = 1
+    else:
+        seat_change = Registration.status.in_(ACTIVE_REGISTRATION_STATUSES)
+        sign = -1
+    seats = (
+        db.select(func.count(Registration.id))
+        .where(target, seat_change, Registration.project_id == Project.id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(Project)
+        .where(Project.id.in_(db.select(Registration.project_id).where(target)))
+        .values(active_registrations=Project.active_registrations + sign * seats),
+        execution_options={'synchronize_session': False},
+    )
+    affected_project_ids = db.session.execute(
+        db.select(Registration.project_id).where(target).distinct()
+    ).scalars().all()
+    # Participants whose upcoming_count changes; recounted after the UPDATE
+    seat_user_ids = db.session.execute(
+        db.select(Registration.user_id).where(target, seat_change).distinct()
+    ).scalars().all()
+
+    records_created = 0
+    if new_status == RegistrationStatus.COMPLETED.value:
+        # Pending volunteer record for every newly completed participant without one
+        records_created = insert_missing_volunteer_records(target)
+
+    updated_count = db.session.execute(
+        db.update(Registration).where(target).values(status=new_status),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+    if seat_user_ids:
+        UserStats.recount_upcoming(seat_user_ids)
+
+    db.session.commit()
+    catalog_version.bump()
+    current_app.logger.info(
+        f'Registrations batch updated count={updated_count} status={new_status} '
+        f'projects={affected_project_ids} records_created={records_created} by user={current_user.id}'
+    )
+
+    # Evaluate auto-completion once for all affected projects
+    auto_completed = auto_complete_projects(affected_project_ids) if affected_project_ids else []
+    if auto_completed:
+        db.session.commit()
+        catalog_version.bump()
+        current_app.logger.info(f'Projects auto-completed ids={auto_completed}')
+
+    response_data = {
+        'updated_count': updated_count,
+        'status': new_status,
+        'project_ids': affected_project_ids,
+        'records_created': records_created,
+        'message': f'Successfully updated {updated_count} registration(s)',
+    }
+    if auto_completed:
+        response_data['auto_completed_project_ids'] = auto_completed
+        response_data['message'] += f'; {len(auto_completed)} project(s) automatically marked as completed.'
+    return jsonify(response_data)
 
 
 @bp.route('/api/v1/registrations/<int:registration_id>', methods=['PATCH'])
@@ -283,15 +470,8 @@ def api_registration_update(registration_id):
     
     data = request.get_json(silent=True) or request.form or {}
     new_status = (data.get('status') or '').strip().lower()
-    allowed_statuses = {
-        RegistrationStatus.REGISTERED.value,
-        RegistrationStatus.APPROVED.value,
-        RegistrationStatus.REJECTED.value,
-        RegistrationStatus.CANCELLED.value,
-        RegistrationStatus.COMPLETED.value,
-    }
     
-    if new_status not in allowed_statuses:
+    if new_status not in UPDATABLE_REGISTRATION_STATUSES:
         return jsonify({'error': 'Invalid status'}), 400
     
     # Prevent reactivating cancelled registrations
@@ -305,32 +485,16 @@ def api_registration_update(registration_id):
         }), 400
     
     registration.status = new_status
+    _adjust_active_registrations(registration.project_id, old_status, new_status)
+    _recount_upcoming_if_changed(registration, old_status)
     
     # If organization confirms participant completed project, auto-create pending volunteer record
     if new_status == RegistrationStatus.COMPLETED.value:
-        existing_record = VolunteerRecord.query.filter_by(
-            user_id=registration.user_id,
-            project_id=registration.project_id
-        ).first()
-        
-        if not existing_record:
-            # Auto-approve short records disabled (SystemSettings removed)
-            record_status = VolunteerRecordStatus.PENDING.value
-            # If you want auto-approve for short projects, adjust here
-            if project.duration <= 4 and False:
-                record_status = VolunteerRecordStatus.APPROVED.value
-            
-            volunteer_record = VolunteerRecord(
-                user_id=registration.user_id,
-                project_id=registration.project_id,
-                hours=project.duration,
-                points=project.points,
-                status=record_status,
-                completed_at=datetime.utcnow()
-            )
-            db.session.add(volunteer_record)
+        db.session.flush()
+        insert_missing_volunteer_records(Registration.id == registration.id)
     
     db.session.commit()
+    catalog_version.bump()
     current_app.logger.info(f'Registration updated id={registration.id} project={project.id} from={old_status} to={new_status} by user={current_user.id}')
     
     # Check if project should be auto-completed
@@ -363,8 +527,12 @@ def api_registration_delete(registration_id):
             return jsonify({'error': 'Unauthorized'}), 403
     
     # Instead of deleting, mark as cancelled
+    old_status = registration.status
     registration.status = RegistrationStatus.CANCELLED.value
+    _adjust_active_registrations(registration.project_id, old_status, registration.status)
+    _recount_upcoming_if_changed(registration, old_status)
     db.session.commit()
+    catalog_version.bump()
     current_app.logger.info(f'Registration cancelled id={registration.id} project={registration.project_id} by user={current_user.id}')
     
     return jsonify({'message': 'Registration cancelled successfully'}), 200
@@ -380,19 +548,20 @@ def api_organization_all_registrations():
     # Get all projects for this organization
     projects = Project.query.filter_by(organization_id=current_user.id).all()
     
+    # One query for every registration across those projects, participants joined in
+    registrations_by_project = defaultdict(list)
+    registrations = (
+        Registration.query.join(Project)
+        .filter(Project.organization_id == current_user.id)
+        .options(joinedload(Registration.user))
+        .order_by(Registration.id)
+    )
+    for reg in registrations:
+        registrations_by_project[reg.project_id].append(serializers.organization_registration(reg))
+    
     projects_with_registrations = []
     for project in projects:
-        registrations = Registration.query.filter_by(project_id=project.id).all()
-        registrations_payload = []
-        for reg in registrations:
-            participant = reg.user
-            registrations_payload.append({
-                'id': reg.id,
-                'participant_name': participant.display_name or participant.username,
-                'participant_email': participant.email,
-                'registration_date': reg.created_at.strftime('%Y-%m-%d') if reg.created_at else None,
-                'status': reg.status
-            })
+        registrations_payload = registrations_by_project.get(project.id, [])
         
         projects_with_registrations.append({
             'project_id': project.id,
@@ -4,7 +4,12 @@ from flask_login import login_required, current_user, logout_user
 from datetime import datetime, timedelta
 import logging
 
-from models import db, User, Registration, VolunteerRecord, Comment, Project
+from models import db, User, Project
+from utils.user_cache import user_cache
+from utils.catalog_cache import catalog_version
+from utils import serializers
+from jobs import submit_job
+from api.api_jobs import job_accepted
 
 bp = Blueprint('api_users', __name__)
 logger = logging.getLogger(__name__)
@@ -22,23 +27,12 @@ def api_users_list():
         return jsonify({'error': 'Unauthorized'}), 403
     
     # Retrieve non-admin users, ordered by creation date desc
-    users = User.query.filter(User.user_type != 'admin').order_by(User.created_at.desc()).limit(100).all()
+    # (an IN over the non-admin types lets SQLite use ix_user_type_created_at)
+    users = User.query.filter(
+        User.user_type.in_(('participant', 'organization'))
+    ).order_by(User.created_at.desc()).limit(100).all()
     
-    result = []
-    for u in users:
-        result.append({
-            'id': u.id,
-            'username': u.username,
-            'display_name': u.display_name,
-            'email': u.email,
-            'user_type': u.user_type,
-            'is_active': u.is_active if hasattr(u, 'is_active') else True,
-            'ban_reason': getattr(u, 'ban_reason', None),
-            'ban_until': u.ban_until.isoformat() if getattr(u, 'ban_until', None) else None,
-            'created_at': u.created_at.strftime('%Y-%m-%d') if u.created_at else None
-        })
-    
-    return jsonify(result)
+    return jsonify([serializers.user(u) for u in users])
 
 
 @bp.route('/api/v1/users', methods=['POST'])
@@ -85,17 +79,7 @@ def api_create_admin():
 @login_required
 def api_users_me():
     """Get current user information."""
-    return jsonify({
-        'id': current_user.id,
-        'username': current_user.username,
-        'display_name': current_user.display_name,
-        'email': current_user.email,
-        'user_type': current_user.user_type,
-        'is_active': current_user.is_active if hasattr(current_user, 'is_active') else True,
-        'ban_reason': getattr(current_user, 'ban_reason', None),
-        'ban_until': current_user.ban_until.isoformat() if getattr(current_user, 'ban_until', None) else None,
-        'created_at': current_user.created_at.strftime('%Y-%m-%d') if current_user.created_at else None
-    })
+    return jsonify(serializers.user(current_user))
 
 
 @bp.route('/api/v1/users/<int:user_id>', methods=['GET'])
@@ -110,17 +94,7 @@ def api_user_detail(user_id):
         if current_user.id != user_id:
             return jsonify({'error': 'Unauthorized'}), 403
     
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'display_name': user.display_name,
-        'email': user.email,
-        'user_type': user.user_type,
-        'is_active': user.is_active if hasattr(user, 'is_active') else True,
-        'ban_reason': getattr(user, 'ban_reason', None),
-        'ban_until': user.ban_until.isoformat() if getattr(user, 'ban_until', None) else None,
-        'created_at': user.created_at.strftime('%Y-%m-%d') if user.created_at else None
-    })
+    return jsonify(serializers.user(user))
 
 
 @bp.route('/api/v1/users/<int:user_id>', methods=['PATCH'])
@@ -173,6 +147,10 @@ def api_user_update(user_id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     db.session.commit()
+    # Ban/unban and profile edits must reach every cached session snapshot;
+    # organization names also appear in the project catalog
+    user_cache.bump()
+    catalog_version.bump()
     logger.info(f'User updated id={user.id} by user={current_user.id} type={current_user.user_type}')
     
     return jsonify({
@@ -209,9 +187,12 @@ def api_user_delete_admin(user_id):
 
 def _delete_user(user, is_admin_action=False):
     """Helper function to perform user deletion logic."""
-    # If a LocalProxy (current_user) is passed, unwrap to the actual model instance
+    # If a LocalProxy (current_user) is passed, unwrap it; the session user is a
+    # read-only snapshot, so load the model instance for deletion
     if hasattr(user, "_get_current_object"):
         user = user._get_current_object()
+    if not isinstance(user, User):
+        user = User.query.get_or_404(user.id)
     user_id = user.id
     
     # For organizations
@@ -223,43 +204,24 @@ def _delete_user(user, is_admin_action=False):
                 'error': f'Cannot delete account: You have {project_count} project(s). Please delete all projects first before deleting your account.'
             }), 400
     
-    # Cascade delete all associated data
-    try:
-        # If admin deletes an organization, also delete its projects and related data
-        if user.user_type == 'organization' and is_admin_action:
-            org_projects = Project.query.filter_by(organization_id=user_id).all()
-            for proj in org_projects:
-                # Delete comments under this project
-                Comment.query.filter_by(project_id=proj.id).delete(synchronize_session=False)
-                # Delete registrations and volunteer records for this project
-                Registration.query.filter_by(project_id=proj.id).delete(synchronize_session=False)
-                VolunteerRecord.query.filter_by(project_id=proj.id).delete(synchronize_session=False)
-                # Finally delete the project
-                db.session.delete(proj)
-        
-        # Delete comments and their replies (cascade delete for user's own comments)
-        user_comment_ids = [c.id for c in Comment.query.filter_by(user_id=user_id).all()]
-        if user_comment_ids:
-            Comment.query.filter(Comment.parent_id.in_(user_comment_ids)).delete(synchronize_session=False)
-        Comment.query.filter_by(user_id=user_id).delete(synchronize_session=False)
-        
-        VolunteerRecord.query.filter_by(user_id=user_id).delete(synchronize_session=False)
-        Registration.query.filter_by(user_id=user_id).delete(synchronize_session=False)
-        
-        # If user is deleting themselves, logout first
-        if not is_admin_action:
-            logout_user()
-        
-        db.session.delete(user)
-        db.session.commit()
-        actor_id = getattr(current_user._get_current_object(), "id", None) if hasattr(current_user, "_get_current_object") else getattr(current_user, "id", None)
-        current_app.logger.info(f'User deleted id={user_id} by {"admin" if is_admin_action else "self"} user={actor_id}')
-        
-        return jsonify({
-            'message': 'Account deleted successfully',
-            'redirect': '/' if not is_admin_action else None
-        })
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f'Error deleting user id={user_id}: {str(e)}', exc_info=True)
-        return jsonify({'error': f'Failed to delete user: {str(e)}'}), 500
+    # Deactivate right away so the account can no longer sign in, then let a
+    # background job remove the data
+    user.is_active = False
+    user.ban_reason = 'Account deletion in progress'
+    user.ban_until = None
+    db.session.commit()
+    user_cache.bump()
+    
+    # If user is deleting themselves, logout first
+    if not is_admin_action:
+        logout_user()
+    
+    job = submit_job(
+        'delete_user',
+        {'user_id': user_id},
+        owner_id=current_user.id if is_admin_action else None,
+    )
+    current_app.logger.info(f'User delete queued id={user_id} job={job.id} by {"admin" if is_admin_action else "self"}')
+    
+    return job_accepted(job, 'Account deletion started', redirect='/' if not is_admin_action else None)
+
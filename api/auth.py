@@ -12,6 +12,7 @@ from sqlalchemy import or_
 
 from models import db, User
 from forms import LoginForm, RegisterForm
+from utils.user_cache import user_cache
 
 bp = Blueprint('auth', __name__)
 
@@ -62,6 +63,8 @@ def login():
                         user.ban_reason = None
                         user.ban_until = None
                         db.session.commit()
+                        # Drop the cached "banned" entry for this user
+                        user_cache.bump()
                     else:
                         # Still banned, show remaining time
                         remaining = user.ban_until - datetime.utcnow()
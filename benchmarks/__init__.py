@@ -0,0 +1,4 @@
+"""Benchmarks and stress harnesses, run from the project root with `python -m benchmarks.<name>`.
+
+Each harness runs against a throwaway SQLite database, never the configured one.
+"""
@@ -0,0 +1,29 @@
+"""Shared setup for benchmark harnesses."""
+import os
+import tempfile
+
+
+def isolated_app(prefix='svs_bench'):
+    """Create the Flask app against a fresh temporary SQLite database.
+
+    Environment overrides must be in place before `config` is imported,
+    so this imports the app factory lazily. Returns (app, workdir).
+    """
+    workdir = tempfile.mkdtemp(prefix=f'{prefix}_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['LOG_FILE'] = os.path.join(workdir, 'app.log')
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    os.environ['SEED_SAMPLE_DATA'] = 'false'
+    os.environ['METRICS_DIR'] = os.path.join(workdir, 'metrics')
+
+    from wsgi import app
+    return app, workdir
+
+
+def login_client(app, user_id):
+    """Return a test client whose session is authenticated as user_id (no password check)."""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    return client
@@ -0,0 +1,485 @@
+"""Latency, SQL queries and memory for every route, driven through the Flask test client.
+
+Generates a synthetic dataset (utils.synthetic, see `flask generate-dataset`)
+on a throwaway database, then sends every route in the URL map --iterations
+requests after --warmup unmeasured ones. Read-only routes run first; routes
+that write use a fresh target row per request (or flip a row back and forth)
+so every request does the same work. The embedded job runner is off, so
+routes that start background work only queue their job.
+
+Per route it reports p50/p95/p99 latency in ms (request through the test
+client, body included), SQL queries per request (from the Server-Timing
+header) and how much the process peak RSS grew while the route ran; the
+overall peak RSS is reported too. Output is JSON with sorted keys, so two
+runs diff cleanly; --baseline (or --compare on two saved files) flags
+routes whose p95 or query count regressed and exits non-zero:
+
+    python -m benchmarks.api_suite --scale 1 --iterations 50 > before.json
+    python -m benchmarks.api_suite --scale 1 --iterations 50 --baseline before.json > after.json
+    python -m benchmarks.api_suite --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._support import isolated_app, login_client
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Dataset rows at --scale 1 (a few seconds to generate)
+BASE_DATASET = {
+    'organizations': 20,
+    'participants': 2000,
+    'projects': 4000,
+    'registrations': 40000,
+    'records': 12000,
+    'comments': 8000,
+}
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Route:
+    """One route to drive: `path`, `body` (JSON) and `form` may be callables taking (ctx, i).
+
+    role is 'anonymous', 'fresh' (a new anonymous client per request),
+    'participant', 'organization', 'admin', or a callable (ctx, i) -> user id.
+    """
+
+    def __init__(self, method, rule, role, path, body=None, form=None, expect=200, writes=False):
+        self.method = method
+        self.rule = rule
+        self.role = role
+        self.path = path
+        self.body = body
+        self.form = form
+        self.expect = expect
+        self.writes = writes
+
+    @property
+    def key(self):
+        return f'{self.method} {self.rule}'
+
+
+def _at(values):
+    """(ctx, i) -> values[i]: a distinct target row per request."""
+    return lambda ctx, i: values(ctx)[i]
+
+
+def _flip(a, b):
+    """(ctx, i) -> a or b alternately, so a write can be repeated without drifting the data."""
+    return lambda ctx, i: a if i % 2 == 0 else b
+
+
+ROUTES = [
+    # -- Pages ---------------------------------------------------------------
+    Route('GET', '/', 'anonymous', '/'),
+    Route('GET', '/login', 'anonymous', '/login'),
+    Route('GET', '/register', 'anonymous', '/register'),
+    Route('GET', '/participant/dashboard', 'participant', '/participant/dashboard'),
+    Route('GET', '/organization/dashboard', 'organization', '/organization/dashboard'),
+    Route('GET', '/admin/panel', 'admin', '/admin/panel'),
+    Route('GET', '/project/<int:project_id>', 'anonymous', lambda ctx, i: f"/project/{ctx['open_project']}"),
+    Route('GET', '/volunteer-record', 'participant', '/volunteer-record'),
+    Route('GET', '/static/<path:filename>', 'anonymous', '/static/css/base.css'),
+    Route('GET', '/metrics', 'admin', '/metrics'),
+
+    # -- Projects ------------------------------------------------------------
+    Route('GET', '/api/v1/projects', 'anonymous', '/api/v1/projects'),
+    Route('GET', '/api/v1/projects/search', 'anonymous', '/api/v1/projects/search?q=garden'),
+    Route('GET', '/api/v1/projects/<int:project_id>', 'anonymous',
+          lambda ctx, i: f"/api/v1/projects/{ctx['open_project']}"),
+    Route('GET', '/api/v1/projects/<int:project_id>/comments', 'participant',
+          lambda ctx, i: f"/api/v1/projects/{ctx['commented_project']}/comments"),
+    Route('GET', '/api/v1/comments/<int:comment_id>/replies', 'participant',
+          lambda ctx, i: f"/api/v1/comments/{ctx['thread']}/replies"),
+    Route('GET', '/api/v1/projects/<int:project_id>/registrations', 'organization',
+          lambda ctx, i: f"/api/v1/projects/{ctx['open_project']}/registrations"),
+    Route('GET', '/api/v1/leaderboard', 'anonymous', '/api/v1/leaderboard'),
+
+    # -- Registrations, records and dashboards -----------------------------------
+    Route('GET', '/api/organization/all-registrations', 'organization', '/api/organization/all-registrations'),
+    Route('GET', '/api/v1/registrations/<int:registration_id>', 'participant',
+          lambda ctx, i: f"/api/v1/registrations/{ctx['own_registration']}"),
+    Route('GET', '/api/v1/records', 'participant', '/api/v1/records'),
+    Route('GET', '/api/v1/records/<int:record_id>', 'participant',
+          lambda ctx, i: f"/api/v1/records/{ctx['own_record']}"),
+    Route('GET', '/api/v1/users/me/records', 'participant', '/api/v1/users/me/records'),
+    Route('GET', '/api/v1/users/me/dashboard', 'participant', '/api/v1/users/me/dashboard'),
+    Route('GET', '/api/v1/users/me', 'participant', '/api/v1/users/me'),
+
+    # -- Admin ---------------------------------------------------------------
+    Route('GET', '/api/v1/admin/review/projects', 'admin', '/api/v1/admin/review/projects'),
+    Route('GET', '/api/v1/admin/review/records', 'admin', '/api/v1/admin/review/records'),
+    Route('GET', '/api/v1/admin/logs', 'admin', '/api/v1/admin/logs'),
+    Route('GET', '/api/v1/users', 'admin', '/api/v1/users'),
+    Route('GET', '/api/v1/users/<int:user_id>', 'admin', lambda ctx, i: f"/api/v1/users/{ctx['participant']}"),
+
+    # -- Jobs ----------------------------------------------------------------
+    Route('GET', '/api/v1/jobs/<job_id>', 'participant', lambda ctx, i: f"/api/v1/jobs/{ctx['job']}"),
+    Route('GET', '/api/v1/jobs/<job_id>/download', 'participant',
+          lambda ctx, i: f"/api/v1/jobs/{ctx['job']}/download"),
+
+    # -- Writes --------------------------------------------------------------
+    Route('POST', '/login', 'fresh', '/login', expect=302, writes=True,
+          form=lambda ctx, i: {'username': ctx['participant_name'], 'password': ctx['password'],
+                               'user_type': 'participant'}),
+    Route('GET', '/logout', lambda ctx, i: ctx['participant'], '/logout', expect=302, writes=True),
+    Route('POST', '/register', 'fresh', '/register', expect=302, writes=True,
+          form=lambda ctx, i: {'username': f"bench_new_{ctx['run']}_{i}", 'email': f"bench_new_{ctx['run']}_{i}@example.com",
+                               'password': 'BenchPass123!', 'confirm_password': 'BenchPass123!',
+                               'user_type': 'participant'}),
+    Route('POST', '/api/v1/projects', 'organization', '/api/v1/projects', expect=201, writes=True,
+          body=lambda ctx, i: {'title': f'Bench project {i}', 'description': 'Created by the API suite',
+                               'category': 'Ecology', 'date': ctx['next_month'], 'location': 'Bench Park',
+                               'max_participants': 20, 'duration': 2.0, 'points': 20}),
+    Route('PATCH', '/api/v1/projects/<int:project_id>', 'organization',
+          lambda ctx, i: f"/api/v1/projects/{ctx['open_project']}", writes=True,
+          body=lambda ctx, i: {'description': f'Updated by the API suite ({i % 2})'}),
+    Route('PATCH', '/api/v1/projects/<int:project_id>/review', 'admin',
+          lambda ctx, i: f"/api/v1/projects/{ctx['pending_project']}/review", writes=True,
+          body=lambda ctx, i: {'status': _flip('approved', 'rejected')(ctx, i)}),
+    Route('PATCH', '/api/v1/projects/<int:project_id>/rating', 'admin',
+          lambda ctx, i: f"/api/v1/projects/{ctx['open_project']}/rating", writes=True,
+          body=lambda ctx, i: {'rating': _flip(4.5, 3.5)(ctx, i)}),
+    Route('DELETE', '/api/v1/projects/<int:project_id>', 'organization',
+          _at(lambda ctx: [f'/api/v1/projects/{pid}' for pid in ctx['deletable_projects']]),
+          expect=202, writes=True),
+    Route('POST', '/api/v1/projects/<int:project_id>/comments', lambda ctx, i: ctx['commenter'],
+          lambda ctx, i: f"/api/v1/projects/{ctx['commented_project']}/comments", expect=201, writes=True,
+          body=lambda ctx, i: {'comment': f'Benchmark comment {i}', 'parent_id': ctx['thread'] if i % 2 else None}),
+    Route('POST', '/api/v1/projects/<int:project_id>/registrations', _at(lambda ctx: ctx['fresh_participants']),
+          lambda ctx, i: f"/api/v1/projects/{ctx['signup_project']}/registrations", expect=201, writes=True),
+    Route('PATCH', '/api/v1/registrations/<int:registration_id>', 'organization',
+          lambda ctx, i: f"/api/v1/registrations/{ctx['org_registration']}", writes=True,
+          body=lambda ctx, i: {'status': _flip('approved', 'registered')(ctx, i)}),
+    Route('PATCH', '/api/v1/registrations/batch', 'organization', '/api/v1/registrations/batch', writes=True,
+          body=lambda ctx, i: {'registration_ids': ctx['org_registrations'],
+                               'status': _flip('approved', 'registered')(ctx, i)}),
+    Route('DELETE', '/api/v1/registrations/<int:registration_id>',
+          _at(lambda ctx: [user_id for _, user_id in ctx['cancellable']]),
+          _at(lambda ctx: [f'/api/v1/registrations/{rid}' for rid, _ in ctx['cancellable']]), writes=True),
+    Route('PATCH', '/api/v1/records/<int:record_id>', 'admin',
+          lambda ctx, i: f"/api/v1/records/{ctx['own_record']}", writes=True,
+          body=lambda ctx, i: {'status': _flip('pending', 'approved')(ctx, i)}),
+    Route('PATCH', '/api/v1/records/batch', 'admin', '/api/v1/records/batch', writes=True,
+          body=lambda ctx, i: {'record_ids': ctx['pending_records'], 'status': _flip('approved', 'pending')(ctx, i)}),
+    Route('GET', '/api/participant/export-all-records', 'participant', '/api/participant/export-all-records',
+          expect=202, writes=True),
+    Route('POST', '/api/participant/export-filtered-records', 'participant',
+          '/api/participant/export-filtered-records', expect=202, writes=True,
+          body=lambda ctx, i: {'category': 'Ecology', 'year': ctx['year']}),
+    Route('POST', '/api/v1/jobs', 'participant', '/api/v1/jobs', expect=202, writes=True,
+          body=lambda ctx, i: {'name': 'export_records', 'params': {}}),
+    Route('POST', '/api/v1/users', 'admin', '/api/v1/users', expect=201, writes=True,
+          body=lambda ctx, i: {'username': f"bench_admin_{ctx['run']}_{i}",
+                               'email': f"bench_admin_{ctx['run']}_{i}@example.com", 'password': 'BenchPass123!'}),
+    Route('PATCH', '/api/v1/users/<int:user_id>', 'participant',
+          lambda ctx, i: f"/api/v1/users/{ctx['participant']}", writes=True,
+          body=lambda ctx, i: {'display_name': f'Bench Volunteer {i % 2}'}),
+    Route('DELETE', '/api/v1/users/<int:user_id>', 'admin',
+          _at(lambda ctx: [f'/api/v1/users/{uid}' for uid in ctx['deletable_users']]), expect=202, writes=True),
+    Route('DELETE', '/api/v1/users/me', _at(lambda ctx: ctx['self_deleting_users']), '/api/v1/users/me',
+          expect=202, writes=True),
+]
+
+
+def _pick(app, requests_per_route, workdir):
+    """Choose the users and rows the routes target. Returns the context dict."""
+    from models import db, User, Project, Registration, VolunteerRecord, Comment, Job, JobStatus
+    from utils.synthetic import SYNTHETIC_PASSWORD
+
+    n = requests_per_route
+    today = datetime.utcnow().date()
+    with app.app_context():
+        scalar, scalars = db.session.scalar, db.session.scalars
+        count = db.func.count
+        admin = scalar(db.select(User.id).where(User.user_type == 'admin').order_by(User.id))
+        # The busiest organization and participant: the heaviest dashboards
+        organization = scalar(
+            db.select(Project.organization_id).group_by(Project.organization_id).order_by(count().desc())
+        )
+        participant = scalar(
+            db.select(VolunteerRecord.user_id).group_by(VolunteerRecord.user_id).order_by(count().desc())
+        )
+        open_project = scalar(
+            db.select(Project.id).where(Project.organization_id == organization, Project.status == 'approved',
+                                        Project.date > today).order_by(Project.active_registrations.desc())
+        )
+        thread_root = db.session.execute(
+            db.select(Comment.id, Comment.project_id).where(Comment.parent_id.is_(None))
+            .order_by(Comment.reply_count.desc())
+        ).first()
+        org_registrations = scalars(
+            db.select(Registration.id).where(Registration.project_id == open_project,
+                                             Registration.status.in_(('registered', 'approved')))
+            .order_by(Registration.id)
+        ).all()
+        participants = scalars(
+            db.select(User.id).where(User.user_type == 'participant', User.id != participant).order_by(User.id)
+        ).all()
+        # Disjoint participant pools for sign-ups, admin deletions and self-deletions;
+        # cancellations come from everyone else
+        fresh, deletable, self_deleting = participants[:n], participants[n:2 * n], participants[2 * n:3 * n]
+        taken = set(participants[:3 * n])
+        cancellable = [
+            (rid, uid) for rid, uid in db.session.execute(
+                db.select(Registration.id, Registration.user_id)
+                .join(Project, Project.id == Registration.project_id)
+                .where(Registration.status == 'registered', Project.date > today,
+                       Project.id != open_project)
+                .order_by(Registration.id)
+            )
+            if uid not in taken
+        ]
+        deletable_projects = scalars(
+            db.select(Project.id).where(Project.organization_id == organization, Project.status == 'pending')
+            .order_by(Project.id)
+        ).all()
+        pending_projects = scalars(
+            db.select(Project.id).where(Project.status == 'pending', Project.organization_id != organization)
+        ).all()
+        pending_records = scalars(
+            db.select(VolunteerRecord.id).where(VolunteerRecord.status == 'pending').order_by(VolunteerRecord.id)
+            .limit(20)
+        ).all()
+
+        # A project with room for every sign-up the suite sends
+        signup = Project(
+            title='API suite sign-ups', description='Open project for the API suite', category='Ecology',
+            organization_id=organization, date=today + timedelta(days=30), location='Bench Park',
+            max_participants=100000, min_participants=1, duration=2.0, points=20, status='approved',
+        )
+        db.session.add(signup)
+        # A finished export the job routes can poll and download
+        result_path = os.path.join(workdir, 'export.xlsx')
+        with open(result_path, 'wb') as f:
+            f.write(b'\0' * 16384)
+        job = Job(id='0' * 32, name='export_records', status=JobStatus.SUCCEEDED.value, owner_id=participant,
+                  params='{}', result=json.dumps({'filename': 'export.xlsx'}), result_path=result_path,
+                  created_at=datetime.utcnow(), started_at=datetime.utcnow(), finished_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+
+        ctx = {
+            'run': int(time.time()),
+            'password': SYNTHETIC_PASSWORD,
+            'admin': admin,
+            'organization': organization,
+            'participant': participant,
+            'participant_name': scalar(db.select(User.username).where(User.id == participant)),
+            'open_project': open_project,
+            'commented_project': thread_root.project_id,
+            'thread': thread_root.id,
+            'commenter': scalar(
+                db.select(Comment.user_id).where(Comment.project_id == thread_root.project_id,
+                                                 Comment.user_id != organization)
+            ) or organization,
+            'own_registration': scalar(db.select(Registration.id).where(Registration.user_id == participant)),
+            'own_record': scalar(db.select(VolunteerRecord.id).where(VolunteerRecord.user_id == participant)),
+            'org_registration': org_registrations[0],
+            'org_registrations': org_registrations[1:21],
+            'pending_project': pending_projects[0],
+            'pending_records': pending_records,
+            'deletable_projects': deletable_projects,
+            'signup_project': signup.id,
+            'fresh_participants': fresh,
+            'deletable_users': deletable,
+            'self_deleting_users': self_deleting,
+            'cancellable': cancellable,
+            'job': job.id,
+            'next_month': (today + timedelta(days=30)).isoformat(),
+            'year': today.year - 1,
+        }
+    shortfalls = {
+        name: len(ctx[name]) for name in ('deletable_projects', 'fresh_participants', 'deletable_users',
+                                          'self_deleting_users', 'cancellable')
+        if len(ctx[name]) < n
+    }
+    if shortfalls:
+        raise SystemExit(f'Dataset too small for {n} requests per route (increase --scale): {shortfalls}')
+    return ctx
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list."""
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+def _run_route(app, route, ctx, warmup, iterations, clients):
+    latencies, queries, statuses = [], [], {}
+    rss_before = _peak_rss_kb()
+    for i in range(warmup + iterations):
+        if route.role == 'fresh':
+            client = app.test_client()
+        elif callable(route.role):
+            client = login_client(app, route.role(ctx, i))
+        else:
+            client = clients[route.role]
+        path = route.path(ctx, i) if callable(route.path) else route.path
+        kwargs = {}
+        if route.body is not None:
+            kwargs['json'] = route.body(ctx, i)
+        if route.form is not None:
+            kwargs['data'] = route.form(ctx, i)
+
+        started = time.perf_counter()
+        response = client.open(path, method=route.method, **kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        response.close()
+        if i < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        match = _QUERIES.search(response.headers.get('Server-Timing', ''))
+        if match:
+            queries.append(int(match.group(1)))
+
+    latencies.sort()
+    queries.sort()
+    rss_after = _peak_rss_kb()
+    return {
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p95_ms': round(_percentile(latencies, 95), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'queries_p50': _percentile(queries, 50) if queries else None,
+        'queries_max': queries[-1] if queries else None,
+        'rss_growth_kb': rss_after - rss_before if rss_before is not None else None,
+        'status': statuses,
+        'unexpected_status': sum(n for code, n in statuses.items() if code != str(route.expect)),
+    }
+
+
+def compare(old, new, tolerance, min_ms):
+    """Regression messages between two suite results (dicts as printed by main)."""
+    old_routes, new_routes = old['api_suite']['routes'], new['api_suite']['routes']
+    problems = []
+    for key in sorted(old_routes):
+        before, after = old_routes[key], new_routes.get(key)
+        if after is None:
+            problems.append(f'{key}: missing from the new run')
+            continue
+        if after['unexpected_status'] > before['unexpected_status']:
+            problems.append(f"{key}: unexpected status codes {after['status']}")
+        if (after['p95_ms'] > before['p95_ms'] * (1 + tolerance)
+                and after['p95_ms'] - before['p95_ms'] > min_ms):
+            problems.append(f"{key}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+        if (before['queries_max'] is not None and after['queries_max'] is not None
+                and after['queries_max'] > before['queries_max']):
+            problems.append(f"{key}: queries/request {before['queries_max']} -> {after['queries_max']}")
+    return problems
+
+
+def _report(problems):
+    for problem in problems:
+        print(f'REGRESSION {problem}', file=sys.stderr)
+    if not problems:
+        print('No regressions.', file=sys.stderr)
+    return 1 if problems else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='dataset size multiplier')
+    parser.add_argument('--iterations', type=int, default=30, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured requests per route first')
+    parser.add_argument('--seed', type=int, default=0, help='dataset random seed')
+    parser.add_argument('--only', default=None, help='only run routes whose "METHOD rule" contains this')
+    parser.add_argument('--baseline', default=None, help='compare the results with this earlier output')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), default=None,
+                        help='compare two saved outputs without running the suite')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed relative p95 growth before a route is flagged')
+    parser.add_argument('--min-ms', type=float, default=2.0,
+                        help='p95 growth below this many ms is never flagged')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.load(open(path)) for path in args.compare)
+        return _report(compare(old, new, args.tolerance, args.min_ms))
+    if args.iterations <= 0 or args.warmup < 0:
+        parser.error('--iterations must be positive and --warmup not negative')
+
+    os.environ['JOB_RUNNER_EMBEDDED'] = 'false'
+    app, workdir = isolated_app('svs_api_suite')
+
+    from models import db
+    from utils.synthetic import generate_dataset
+
+    dataset = {name: max(1, int(rows * args.scale)) for name, rows in BASE_DATASET.items()}
+    started = time.perf_counter()
+    with app.app_context():
+        generate_dataset(seed=args.seed, **dataset)
+        db.session.remove()
+    print(f'Generated dataset in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    rss_after_dataset = _peak_rss_kb()
+
+    ctx = _pick(app, args.warmup + args.iterations, workdir)
+    clients = {'anonymous': app.test_client()}
+    for role in ('participant', 'organization', 'admin'):
+        clients[role] = login_client(app, ctx[role])
+
+    routes = [route for route in ROUTES if args.only is None or args.only in route.key]
+    # Reads see the data as generated; writes go last
+    routes.sort(key=lambda route: route.writes)
+    results = {}
+    for route in routes:
+        results[route.key] = _run_route(app, route, ctx, args.warmup, args.iterations, clients)
+        print(json.dumps({route.key: results[route.key]}), file=sys.stderr)
+
+    driven = {route.key for route in ROUTES}
+    uncovered = sorted(
+        f'{method} {rule.rule}'
+        for rule in app.url_map.iter_rules()
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+        if f'{method} {rule.rule}' not in driven
+    )
+    output = {
+        'api_suite': {
+            'config': {
+                'dataset': dataset,
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'seed': args.seed,
+                'json_backend': app.json.backend,
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+            },
+            'peak_rss_mb': {
+                'after_dataset': round(rss_after_dataset / 1024, 1) if rss_after_dataset is not None else None,
+                'after_suite': round(_peak_rss_kb() / 1024, 1) if resource is not None else None,
+            },
+            'routes': results,
+            'uncovered': uncovered,
+        }
+    }
+    print(json.dumps(output, indent=2, sort_keys=True))
+    if uncovered:
+        print(f'Routes without a scenario: {", ".join(uncovered)}', file=sys.stderr)
+    failing = [key for key, result in results.items() if result['unexpected_status']]
+    if failing:
+        print(f'Routes answering with unexpected status codes: {", ".join(failing)}', file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            return _report(compare(json.load(f), output, args.tolerance, args.min_ms))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Time and peak-memory benchmark for the volunteer record Excel export.
+
+Seeds one participant per size with that many records on a throwaway database,
+then exports them with the streaming engine (`stream_volunteer_records_excel`)
+and, up to --legacy-max rows, with the previous in-memory approach for comparison.
+
+    python -m benchmarks.excel_export --sizes 1000 10000 100000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from benchmarks._support import isolated_app
+
+
+def _seed(app, sizes, projects_per_user=200):
+    """Create an organization, projects and one participant per size. Returns {size: user_id}."""
+    from models import db, User, Project, VolunteerRecord, ProjectStatus, VolunteerRecordStatus
+
+    with app.app_context():
+        org = User(username='bench_org', email='bench_org@example.com', user_type='organization',
+                   display_name='Bench Org', password_hash='!')
+        db.session.add(org)
+        db.session.flush()
+        today = datetime.utcnow().date()
+        projects = [
+            Project(title=f'Bench project {i}', description='Benchmark', category=('Environmental', 'Education')[i % 2],
+                    organization_id=org.id, date=today - timedelta(days=i), location='Bench',
+                    max_participants=10, duration=2.5, points=20, status=ProjectStatus.COMPLETED.value)
+            for i in range(projects_per_user)
+        ]
+        db.session.add_all(projects)
+        db.session.flush()
+        project_ids = [p.id for p in projects]
+
+        users = {}
+        now = datetime.utcnow()
+        for size in sizes:
+            user = User(username=f'bench_{size}', email=f'bench_{size}@example.com',
+                        user_type='participant', password_hash='!')
+            db.session.add(user)
+            db.session.flush()
+            db.session.execute(
+                db.insert(VolunteerRecord),
+                [
+                    {'user_id': user.id, 'project_id': project_ids[i % len(project_ids)],
+                     'hours': 2.5, 'points': 20, 'status': VolunteerRecordStatus.APPROVED.value,
+                     'completed_at': now - timedelta(hours=i)}
+                    for i in range(size)
+                ],
+            )
+            users[size] = user.id
+        db.session.commit()
+        return users
+
+
+def _legacy_export(user_id):
+    """The pre-streaming export: load every ORM record, lazy-load joins, build a full in-memory workbook."""
+    from openpyxl import Workbook
+    from models import VolunteerRecord
+
+    records = VolunteerRecord.query.filter_by(user_id=user_id).order_by(VolunteerRecord.completed_at.desc()).all()
+    wb = Workbook()
+    ws = wb.active
+    for row_idx, record in enumerate(records, start=2):
+        project = record.project
+        organization = project.organization if project else None
+        ws.cell(row=row_idx, column=1, value=project.title if project else 'Unknown Project')
+        ws.cell(row=row_idx, column=2, value=project.category if project else 'N/A')
+        ws.cell(row=row_idx, column=3, value=organization.display_name or organization.username if organization else 'Unknown Organization')
+        ws.cell(row=row_idx, column=4, value=record.completed_at.strftime('%Y-%m-%d') if record.completed_at else 'N/A')
+        ws.cell(row=row_idx, column=5, value=record.hours)
+        ws.cell(row=row_idx, column=6, value=record.points)
+        ws.cell(row=row_idx, column=7, value=record.status)
+    output = BytesIO()
+    wb.save(output)
+    return output
+
+
+def _measure(app, fn):
+    """Return (seconds, peak traced MiB, output bytes) for fn run inside an app context.
+
+    fn runs twice: once untraced for wall time (tracemalloc slows allocation-heavy
+    code several-fold) and once under tracemalloc for peak memory.
+    """
+    from models import db
+
+    with app.app_context():
+        db.session.expunge_all()
+        started = time.perf_counter()
+        output = fn()
+        elapsed = time.perf_counter() - started
+        output.seek(0, 2)
+        size = output.tell()
+        output.close()
+
+    with app.app_context():
+        db.session.expunge_all()
+        tracemalloc.start()
+        fn().close()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return round(elapsed, 3), round(peak / (1024 * 1024), 2), size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='largest size to also run through the legacy in-memory export (0 to skip)')
+    args = parser.parse_args(argv)
+
+    app, _ = isolated_app('svs_excel')
+    users = _seed(app, args.sizes)
+
+    from utils import stream_volunteer_records_excel
+
+    results = []
+    for size in args.sizes:
+        user_id = users[size]
+        seconds, peak_mib, nbytes = _measure(
+            app, lambda: stream_volunteer_records_excel(user_id, 'bench')[0]
+        )
+        result = {'rows': size, 'streaming': {'seconds': seconds, 'peak_mib': peak_mib, 'bytes': nbytes}}
+        if size <= args.legacy_max:
+            seconds, peak_mib, nbytes = _measure(app, lambda: _legacy_export(user_id))
+            result['legacy'] = {'seconds': seconds, 'peak_mib': peak_mib, 'bytes': nbytes}
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    print(json.dumps({'excel_export': results}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
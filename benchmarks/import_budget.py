@@ -0,0 +1,124 @@
+"""Startup import budget: time and modules imported by `import wsgi` (create_app), from -X importtime.
+
+Runs `python -X importtime -c "import wsgi"` --runs times, each in a fresh
+process, and reads the per-module import times Python writes to stderr.
+Importing `wsgi` runs create_app(), so the cumulative time of the `wsgi`
+entry is the whole worker startup. An unmeasured first run creates the
+throwaway database (later runs take the boot check's fast path) and
+writes the bytecode caches.
+
+Exits non-zero when the median startup exceeds --budget-ms, when more than
+--max-modules modules are imported, or when a module that should only load
+on first use (DEFERRED) is imported at startup. Timings depend on the
+machine, so set --budget-ms from a run on the machine the check runs on:
+
+    python -m benchmarks.import_budget --runs 7 --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# Modules create_app must not import, and where they belong instead
+DEFERRED = {
+    'openpyxl': 'utils.write_records_excel imports it on the first Excel export',
+    'marshmallow_sqlalchemy': 'unused; schemas.py builds on plain marshmallow',
+}
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_app(env):
+    """One `import wsgi` under -X importtime; returns [(depth, module, self_us, cumulative_us)]."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import wsgi'], cwd=_ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode:
+        raise SystemExit(f'import wsgi failed:\n{proc.stderr[-2000:]}')
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((len(indent) // 2, module, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def _find(entries, depth, module):
+    """Index of the entry for `module` imported at `depth`."""
+    return next(i for i, entry in enumerate(entries) if entry[:2] == (depth, module))
+
+
+def _children(entries, index):
+    """(module, cumulative_us) of the direct imports of entries[index].
+
+    Children are listed before their parent: they are the entries one level
+    deeper between the previous entry at the parent's depth and the parent.
+    """
+    depth = entries[index][0]
+    start = max((i + 1 for i in range(index) if entries[i][0] <= depth), default=0)
+    return [(module, cumulative) for d, module, _, cumulative in entries[start:index] if d == depth + 1]
+
+
+def measure(runs, env):
+    """Median startup ms, module count and the heaviest direct imports of `app` over `runs` runs."""
+    _import_app(env)  # warm-up: creates the database, compiles bytecode
+    samples = []
+    for _ in range(runs):
+        entries = _import_app(env)
+        total = entries[_find(entries, 0, 'wsgi')][3]
+        samples.append((total, entries))
+        print(f'import wsgi: {total / 1000:.1f} ms, {len(entries)} modules', file=sys.stderr)
+    samples.sort(key=lambda sample: sample[0])
+    total, entries = samples[len(samples) // 2]
+    # app's direct imports: what create_app's module pulls in
+    direct = sorted(_children(entries, _find(entries, 1, 'app')), key=lambda item: item[1], reverse=True)
+    modules = {module for _, module, _, _ in entries}
+    return {
+        'startup_ms': round(total / 1000, 1),
+        'startup_ms_runs': [round(sample[0] / 1000, 1) for sample in samples],
+        'modules': len(entries),
+        'heaviest': {module: round(cumulative / 1000, 1) for module, cumulative in direct[:10]},
+        'deferred_imported': sorted(
+            name for name in DEFERRED if any(m == name or m.startswith(name + '.') for m in modules)
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='measured runs; the median is checked')
+    parser.add_argument('--budget-ms', type=float, default=1000.0, help='median `import wsgi` time allowed')
+    parser.add_argument('--max-modules', type=int, default=850, help='modules the process may have imported')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='svs_imports_')
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        LOG_FILE=os.path.join(workdir, 'app.log'),
+        LOG_LEVEL='WARNING',
+        SEED_SAMPLE_DATA='false',
+        METRICS_DIR=os.path.join(workdir, 'metrics'),
+    )
+    result = measure(args.runs, env)
+
+    failures = []
+    if result['startup_ms'] > args.budget_ms:
+        failures.append(f"startup {result['startup_ms']} ms exceeds the {args.budget_ms:g} ms budget")
+    if result['modules'] > args.max_modules:
+        failures.append(f"{result['modules']} modules imported, budget is {args.max_modules}")
+    for name in result['deferred_imported']:
+        failures.append(f'{name} is imported at startup ({DEFERRED[name]})')
+    result.update({'budget_ms': args.budget_ms, 'max_modules': args.max_modules, 'failures': failures})
+
+    print(json.dumps({'import_budget': result}, indent=2))
+    for failure in failures:
+        print(f'OVER BUDGET: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""Latency benchmark for full-text project search (`utils.search`).
+
+Seeds --projects synthetic projects on a throwaway database (the FTS index is
+filled by the sync triggers as rows are inserted), then times first pages and
+cursor pages for a mix of rare, common, multi-term and prefix queries.
+
+    python -m benchmarks.project_search --projects 500000
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks._support import isolated_app
+
+CATEGORIES = ['Environmental', 'Education', 'Community', 'Health', 'Animal Welfare', 'Arts', 'Elderly Care', 'Sports']
+ACTIVITIES = ['cleanup', 'planting', 'tutoring', 'workshop', 'fundraiser', 'repair', 'survey', 'festival',
+              'restoration', 'mentoring', 'collection', 'distribution', 'recycling', 'gardening', 'painting']
+PLACES = ['beach', 'river', 'park', 'library', 'school', 'shelter', 'garden', 'market', 'forest', 'harbour',
+          'museum', 'clinic', 'stadium', 'wetland', 'village']
+SYLLABLES = ['ka', 'lo', 'mi', 'ren', 'sa', 'tor', 'vel', 'qu', 'ab', 'ix', 'on', 'du', 'fe', 'gra', 'hel', 'zu']
+BATCH_SIZE = 10000
+
+
+def _word(rng):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def _seed(app, count, seed=42):
+    """Insert `count` projects through the sync triggers. Returns (seconds, two rare words)."""
+    from models import db, User, Project, ProjectStatus
+
+    rng = random.Random(seed)
+    # Zipf-distributed vocabulary: a few words are very common, most are rare
+    vocabulary = [_word(rng) for _ in range(20000)]
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    towns = [_word(rng).capitalize() for _ in range(500)]
+    statuses = [ProjectStatus.APPROVED.value] * 6 + [ProjectStatus.COMPLETED.value] * 3 + [ProjectStatus.PENDING.value]
+    today = date.today()
+
+    with app.app_context():
+        org = User(username='bench_org', email='bench_org@example.com', user_type='organization',
+                   display_name='Bench Org', password_hash='!')
+        db.session.add(org)
+        db.session.commit()
+        started = time.perf_counter()
+        for offset in range(0, count, BATCH_SIZE):
+            rows = []
+            for _ in range(min(BATCH_SIZE, count - offset)):
+                activity, place = rng.choice(ACTIVITIES), rng.choice(PLACES)
+                words = ' '.join(rng.choices(vocabulary, cum_weights=cum_weights, k=30))
+                rows.append({
+                    'title': f'{place.capitalize()} {activity} {_word(rng)}',
+                    'description': f'Join us for a {activity} at the {place}. {words}',
+                    'category': rng.choice(CATEGORIES),
+                    'organization_id': org.id,
+                    'date': today + timedelta(days=rng.randint(-365, 365)),
+                    'location': f'{rng.choice(towns)} {place}',
+                    'max_participants': 20,
+                    'min_participants': 1,
+                    'duration': 2.0,
+                    'points': 10,
+                    'status': rng.choice(statuses),
+                    'requirements': f'Bring {_word(rng)} and {rng.choice(vocabulary)}',
+                })
+            db.session.execute(db.insert(Project), rows)
+            db.session.commit()
+        # Long tail words; short ones can collide with the random words in titles
+        rare_words = [word for word in vocabulary[-500:] if len(word) >= 9][:2]
+        return round(time.perf_counter() - started, 1), rare_words
+
+
+def _time_query(app, match, statuses, runs, limit=20, from_date=None):
+    """Return timings (ms) of first pages and of the following cursor page, plus the hit count."""
+    from models import db
+    from utils.search import ranking_window, search_projects
+
+    first, second = [], []
+    max_ranked = app.config['SEARCH_MAX_RANKED_MATCHES']
+    with app.app_context():
+        hits = db.session.execute(
+            db.text('SELECT count(*) FROM project_fts WHERE project_fts MATCH :m'), {'m': match}
+        ).scalar()
+        for _ in range(runs):
+            db.session.expunge_all()
+            # Same calls as GET /api/v1/projects/search: window lookup, then the ranked page
+            started = time.perf_counter()
+            min_rowid = ranking_window(match, max_ranked, statuses, from_date=from_date)
+            page = search_projects(match, statuses, limit, min_rowid=min_rowid, from_date=from_date)
+            first.append((time.perf_counter() - started) * 1000)
+            if len(page) == limit:
+                last_project, _, last_rank, _, _ = page[-1]
+                started = time.perf_counter()
+                search_projects(match, statuses, limit, after=(last_rank, last_project.id),
+                                min_rowid=min_rowid, from_date=from_date)
+                second.append((time.perf_counter() - started) * 1000)
+    return hits, first, second
+
+
+def _summary(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(samples), 2),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--projects', type=int, default=500000)
+    parser.add_argument('--runs', type=int, default=50, help='timed runs per query')
+    parser.add_argument('--max-ranked', type=int, help='override SEARCH_MAX_RANKED_MATCHES')
+    args = parser.parse_args(argv)
+
+    app, _ = isolated_app('svs_search')
+    if args.max_ranked:
+        app.config['SEARCH_MAX_RANKED_MATCHES'] = args.max_ranked
+    seed_seconds, rare_words = _seed(app, args.projects)
+    print(json.dumps({'seeded': args.projects, 'seconds': seed_seconds}), file=sys.stderr)
+
+    from models import ProjectStatus
+    from utils.search import fts_match_expression
+
+    public = (ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value, ProjectStatus.COMPLETED.value)
+    available = (ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)
+    queries = [
+        ('rare term', rare_words[0], public, None),
+        ('rare term + place', f'{rare_words[1]} beach', public, None),
+        ('place + activity', 'beach cleanup', public, None),
+        ('available place + activity', 'river planting', available, date.today()),
+        ('prefix (type-ahead)', 'wetl', public, None),
+        ('common term', 'park', public, None),
+    ]
+
+    results = []
+    for name, text, statuses, from_date in queries:
+        match = fts_match_expression(text)
+        hits, first, second = _time_query(app, match, statuses, args.runs, from_date=from_date)
+        result = {'query': name, 'q': text, 'matches': hits,
+                  'first_page': _summary(first), 'next_page': _summary(second)}
+        results.append(result)
+        print(json.dumps(result), file=sys.stderr)
+
+    print(json.dumps({'project_search': {'projects': args.projects,
+                                         'max_ranked_matches': app.config['SEARCH_MAX_RANKED_MATCHES'],
+                                         'queries': results}}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
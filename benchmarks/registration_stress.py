@@ -0,0 +1,114 @@
+"""Concurrency stress harness for the project sign-up path.
+
+Fires N parallel POST /api/v1/projects/<id>/registrations requests from N
+distinct participants at a single project with limited capacity, then checks
+that the project was never overbooked and reports throughput.
+
+    python -m benchmarks.registration_stress --requests 500 --capacity 50 --workers 32
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from benchmarks._support import isolated_app, login_client
+
+
+def _prepare(app, n_participants, capacity):
+    """Create one organization, one open project and n participants. Returns (project_id, user_ids)."""
+    from models import db, User, Project, ProjectStatus
+
+    with app.app_context():
+        org = User(username='stress_org', email='stress_org@example.com', user_type='organization',
+                   password_hash='!')
+        db.session.add(org)
+        db.session.flush()
+        project = Project(
+            title='Flash Sign-up', description='Stress test project', category='Environmental',
+            organization_id=org.id, date=datetime.utcnow().date() + timedelta(days=7),
+            location='Anywhere', max_participants=capacity, min_participants=1,
+            duration=2.0, points=10, status=ProjectStatus.APPROVED.value,
+        )
+        db.session.add(project)
+        db.session.flush()
+        db.session.execute(
+            db.insert(User),
+            [
+                {'username': f'stress_{i}', 'email': f'stress_{i}@example.com',
+                 'user_type': 'participant', 'password_hash': '!'}
+                for i in range(n_participants)
+            ],
+        )
+        db.session.commit()
+        user_ids = [u.id for u in User.query.filter_by(user_type='participant').all()]
+        return project.id, user_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500, help='parallel sign-ups (one per participant)')
+    parser.add_argument('--capacity', type=int, default=50, help='project max_participants')
+    parser.add_argument('--workers', type=int, default=32, help='concurrent client threads')
+    args = parser.parse_args(argv)
+
+    app, workdir = isolated_app('svs_stress')
+    project_id, user_ids = _prepare(app, args.requests, args.capacity)
+    clients = [login_client(app, uid) for uid in user_ids]
+    url = f'/api/v1/projects/{project_id}/registrations'
+
+    def sign_up(client):
+        started = time.perf_counter()
+        response = client.post(url, json={})
+        return response.status_code, (response.get_json() or {}).get('error'), time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(sign_up, clients))
+    elapsed = time.perf_counter() - started
+
+    from models import db, Project, Registration, ACTIVE_REGISTRATION_STATUSES
+    with app.app_context():
+        project = db.session.get(Project, project_id)
+        stored_count = project.active_registrations
+        actual_count = Registration.query.filter(
+            Registration.project_id == project_id,
+            Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+        ).count()
+        project_status = project.status
+
+    statuses = Counter(code for code, _, _ in results)
+    latencies = sorted(latency for _, _, latency in results)
+    report = {
+        'requests': args.requests,
+        'workers': args.workers,
+        'capacity': args.capacity,
+        'responses': dict(statuses),
+        'errors': dict(Counter(error for code, error, _ in results if code != 201)),
+        'registrations': actual_count,
+        'counter': stored_count,
+        'project_status': project_status,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(args.requests / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+        'workdir': workdir,
+    }
+    print(json.dumps(report, indent=2))
+
+    expected = min(args.capacity, args.requests)
+    ok = (
+        actual_count == stored_count == statuses.get(201, 0) == expected
+        and set(statuses) <= {201, 400}
+    )
+    if not ok:
+        print('FAIL: overbooking or counter drift detected', file=sys.stderr)
+        return 1
+    print(f'OK: {expected} seats filled, zero overbooking')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
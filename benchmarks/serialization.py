@@ -0,0 +1,210 @@
+"""Serialization cost per 10k rows: hand-built dicts + Flask's JSON provider vs. utils.serializers + FastJSONProvider.
+
+Seeds participants, projects and approved records on a throwaway database,
+loads them once with their relationships, then times building the response
+dicts and encoding them to JSON for a few resource shapes. "before" is the
+per-endpoint dict code the APIs used to carry, encoded by Flask's default
+provider (sorted keys, json module); "after" is the compiled serializer
+encoded by FastJSONProvider with the configured JSON_BACKEND.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks._support import isolated_app
+
+
+def _seed(app, participants, projects):
+    from models import db, User, Project, VolunteerRecord, ProjectStatus, VolunteerRecordStatus
+
+    with app.app_context():
+        org = User(username='bench_org', email='bench_org@example.com', user_type='organization',
+                   display_name='Bench Org', password_hash='!')
+        db.session.add(org)
+        db.session.flush()
+        today = datetime.utcnow().date()
+        db.session.execute(db.insert(Project), [
+            {'title': f'Bench project {i}', 'description': 'Benchmark project description',
+             'category': ('Environmental', 'Education', 'Community')[i % 3], 'organization_id': org.id,
+             'date': today + timedelta(days=i % 90), 'location': 'Bench', 'max_participants': 20,
+             'duration': 2.5, 'points': 20, 'status': ProjectStatus.APPROVED.value,
+             'created_at': datetime.utcnow()}
+            for i in range(projects)
+        ])
+        db.session.execute(db.insert(User), [
+            {'username': f'bench_{i}', 'email': f'bench_{i}@example.com', 'user_type': 'participant',
+             'display_name': f'Bench Participant {i}' if i % 2 else None, 'password_hash': '!',
+             'created_at': datetime.utcnow()}
+            for i in range(participants)
+        ])
+        project_ids = db.session.scalars(db.select(Project.id)).all()
+        user_ids = db.session.scalars(db.select(User.id).where(User.user_type == 'participant')).all()
+        now = datetime.utcnow()
+        db.session.execute(db.insert(VolunteerRecord), [
+            {'user_id': user_id, 'project_id': project_id, 'hours': 2.5, 'points': 20,
+             'status': VolunteerRecordStatus.APPROVED.value, 'completed_at': now - timedelta(hours=n)}
+            for n, (user_id, project_id) in enumerate(
+                (user_id, project_id) for user_id in user_ids for project_id in project_ids
+            )
+        ])
+        db.session.commit()
+
+
+# The dict code the endpoints carried before utils.serializers
+
+def _legacy_record(record):
+    project = record.project
+    participant = record.user
+    organization = project.organization if project else None
+    return {
+        'id': record.id,
+        'user_id': record.user_id,
+        'project_id': record.project_id,
+        'hours': record.hours,
+        'points': record.points,
+        'status': record.status,
+        'completed_at': record.completed_at.strftime('%Y-%m-%d') if record.completed_at else None,
+        'project': {
+            'id': project.id,
+            'title': project.title,
+            'category': project.category
+        } if project else None,
+        'participant': {
+            'id': participant.id,
+            'name': participant.display_name or participant.username
+        } if participant else None,
+        'organization': {
+            'id': organization.id,
+            'name': organization.display_name or organization.username
+        } if organization else None
+    }
+
+
+def _legacy_project_card(p):
+    organization_name = (
+        p.organization.display_name or p.organization.username if p.organization else None
+    )
+    return {
+        'id': p.id,
+        'title': p.title,
+        'category': p.category,
+        'date': p.date.strftime('%Y-%m-%d') if p.date else None,
+        'location': p.location,
+        'rating': p.rating,
+        'max_participants': p.max_participants,
+        'current_participants': p.active_registrations,
+        'status': p.status,
+        'organization_name': organization_name,
+        'description': p.description,
+        'created_at': p.created_at.strftime('%Y-%m-%d') if hasattr(p, 'created_at') and p.created_at else None,
+        'organization': {
+            'id': p.organization_id,
+            'name': organization_name
+        }
+    }
+
+
+def _legacy_user(u):
+    return {
+        'id': u.id,
+        'username': u.username,
+        'display_name': u.display_name,
+        'email': u.email,
+        'user_type': u.user_type,
+        'is_active': u.is_active if hasattr(u, 'is_active') else True,
+        'ban_reason': getattr(u, 'ban_reason', None),
+        'ban_until': u.ban_until.isoformat() if getattr(u, 'ban_until', None) else None,
+        'created_at': u.created_at.strftime('%Y-%m-%d') if u.created_at else None
+    }
+
+
+def _load(rows):
+    """Load `rows` objects per shape with every relationship the serializers touch."""
+    from sqlalchemy.orm import joinedload
+    from models import db, User, Project, VolunteerRecord
+
+    records = db.session.scalars(
+        db.select(VolunteerRecord)
+        .options(joinedload(VolunteerRecord.user),
+                 joinedload(VolunteerRecord.project).joinedload(Project.organization))
+        .limit(rows)
+    ).unique().all()
+    projects = db.session.scalars(db.select(Project).options(joinedload(Project.organization))).unique().all()
+    users = db.session.scalars(db.select(User).where(User.user_type == 'participant')).all()
+    # Fewer distinct projects and users exist than rows; serialize them repeatedly
+    return {
+        'record': records,
+        'project_card': (projects * (rows // len(projects) + 1))[:rows],
+        'user': (users * (rows // len(users) + 1))[:rows],
+    }
+
+
+def _time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _measure(build, provider, objects, repeat):
+    """Best-of-repeat milliseconds per 10k rows for building the dicts and for encoding them."""
+    per_10k = 10000 / len(objects)
+    build_s, payload = _time(lambda: [build(obj) for obj in objects], repeat)
+    encode_s, body = _time(lambda: provider.response(payload).get_data(), repeat)
+    return {
+        'build_ms': round(build_s * 1000 * per_10k, 2),
+        'encode_ms': round(encode_s * 1000 * per_10k, 2),
+        'total_ms': round((build_s + encode_s) * 1000 * per_10k, 2),
+        'bytes': len(body),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='rows serialized per shape')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement (best is kept)')
+    args = parser.parse_args(argv)
+
+    app, _ = isolated_app('svs_serialization')
+    participants = 100
+    _seed(app, participants, projects=max(1, -(-args.rows // participants)))
+
+    from flask.json.provider import DefaultJSONProvider
+    from utils import serializers
+
+    before_provider = DefaultJSONProvider(app)
+    after_provider = app.json
+    legacy = {'record': _legacy_record, 'project_card': _legacy_project_card, 'user': _legacy_user}
+
+    results = {}
+    with app.app_context():
+        shapes = _load(args.rows)
+        for shape, objects in shapes.items():
+            compiled = serializers.SERIALIZERS[shape]
+            if [legacy[shape](obj) for obj in objects[:100]] != [compiled(obj) for obj in objects[:100]]:
+                raise SystemExit(f'{shape}: serializer output differs from the legacy dicts')
+            before = _measure(legacy[shape], before_provider, objects, args.repeat)
+            after = _measure(compiled, after_provider, objects, args.repeat)
+            results[shape] = {
+                'rows': len(objects),
+                'before': before,
+                'after': after,
+                'speedup': round(before['total_ms'] / after['total_ms'], 2),
+            }
+            print(json.dumps({shape: results[shape]}), file=sys.stderr)
+
+    print(json.dumps({
+        'serialization': {'json_backend': after_provider.backend, 'per_rows': 10000, 'shapes': results}
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Boot time of N workers starting together: per-boot init_db (before) vs. the bootstrap head check (after).
+
+Fills a throwaway database with a synthetic dataset, then starts --workers
+Python processes at once, each importing `wsgi` (which creates the
+application like a gunicorn worker does) and reporting how long that took.
+"before" replays the boot path the app used to have in every worker:
+create_all, search index, admin check, wiping and reseeding the demo data
+and moving every project's date. "after" is the current boot with
+SEED_SAMPLE_DATA on, which only checks that the schema is at the Alembic
+head. "cold" starts the workers on an empty database, where one of them
+creates the schema and seeds while the others wait on the init lock.
+
+    python -m benchmarks.startup --workers 8 --projects 20000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from benchmarks._support import isolated_app
+
+_RESULT = 'STARTUP_RESULT '
+
+
+def _child(mode):
+    """Worker process: boot the app and print how long it took."""
+    started = time.perf_counter()
+    if mode == 'before':
+        os.environ['DB_INIT_ON_BOOT'] = 'false'
+    from wsgi import app
+    if mode == 'before':
+        from bootstrap import _ensure_admin, seed_sample_data, update_project_dates
+        from models import db
+        from utils.search import ensure_project_fts
+
+        with app.app_context():
+            db.create_all()
+            ensure_project_fts()
+            _ensure_admin(app)
+            seed_sample_data(app)
+            update_project_dates(app)
+    print(_RESULT + json.dumps({'boot_s': time.perf_counter() - started}), flush=True)
+
+
+def _start_workers(mode, workers, env):
+    """Start the workers together; returns wall seconds, per-worker boot seconds and failures."""
+    started = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, '-m', 'benchmarks.startup', '--child', mode], env=env,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    boots, failures = [], []
+    for proc in procs:
+        out, err = proc.communicate()
+        results = [line[len(_RESULT):] for line in out.splitlines() if line.startswith(_RESULT)]
+        if proc.returncode or not results:
+            lines = err.strip().splitlines() or [f'exit {proc.returncode}']
+            failures.append(next((line for line in reversed(lines) if 'Error' in line), lines[-1]))
+        else:
+            boots.append(json.loads(results[-1])['boot_s'])
+    wall = time.perf_counter() - started
+    boots.sort()
+    return {
+        'wall_s': round(wall, 3),
+        'boot_p50_s': round(boots[len(boots) // 2], 3) if boots else None,
+        'boot_max_s': round(boots[-1], 3) if boots else None,
+        'failures': len(failures),
+        'errors': sorted(set(failures)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8, help='processes started together')
+    parser.add_argument('--organizations', type=int, default=100)
+    parser.add_argument('--participants', type=int, default=5000)
+    parser.add_argument('--projects', type=int, default=20000)
+    parser.add_argument('--registrations', type=int, default=100000)
+    parser.add_argument('--child', choices=('before', 'after'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child(args.child)
+        return 0
+
+    app, workdir = isolated_app('svs_startup')
+    from models import db
+    from utils.synthetic import generate_dataset
+
+    dataset = {
+        'organizations': args.organizations,
+        'participants': args.participants,
+        'projects': args.projects,
+        'registrations': args.registrations,
+        'records': args.registrations // 5,
+        'comments': args.registrations // 10,
+    }
+    with app.app_context():
+        generate_dataset(**dataset)
+        db.session.remove()
+        db.engine.dispose()
+    database = os.path.join(workdir, 'bench.db')
+    print(f'Dataset ready: {dataset}', file=sys.stderr)
+
+    env = dict(os.environ, SEED_SAMPLE_DATA='true')
+    results = {}
+    # "before" rewrites the data, so each mode starts from its own copy
+    for mode in ('before', 'after'):
+        copy = os.path.join(workdir, f'{mode}.db')
+        shutil.copy(database, copy)
+        mode_env = dict(env, DATABASE_URL=f'sqlite:///{copy}')
+        results[mode] = _start_workers(mode, args.workers, mode_env)
+        print(json.dumps({mode: results[mode]}), file=sys.stderr)
+    cold_env = dict(env, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'cold.db')}")
+    results['cold'] = _start_workers('after', args.workers, cold_env)
+    print(json.dumps({'cold': results['cold']}), file=sys.stderr)
+
+    print(json.dumps({'startup': {'workers': args.workers, 'dataset': dataset, **results}}, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,454 @@
+"""Database initialization: schema, search index, admin account and demo data.
+
+Kept out of the request-serving boot path. create_app() only calls
+ensure_database(), which reads the schema revision (one query) and
+returns when it is at the Alembic head. Otherwise the first process to
+take the init lock (a file in the instance folder) creates or migrates the
+schema, creates the admin account and, on a new database, seeds the demo
+data; workers started alongside it wait on the lock, find the schema at
+head and carry on. The lock is per host, like the SQLite file it guards.
+
+Deployments can skip the boot check (DB_INIT_ON_BOOT=false) and run
+`flask init-db` once per release instead; `flask init-db --seed` resets
+the demo data.
+"""
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app
+from sqlalchemy import inspect, text
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development server, no lock
+    fcntl = None
+
+from models import (
+    db,
+    User,
+    Project,
+    Registration,
+    VolunteerRecord,
+    UserStats,
+    Comment,
+    ProjectStatus,
+    RegistrationStatus,
+    VolunteerRecordStatus,
+)
+from utils import leaderboard
+from utils.catalog_cache import catalog_version
+from utils.search import ensure_project_fts
+
+LOCK_FILE = 'db-init.lock'
+
+# Schema states reported by schema_state()
+CURRENT = 'current'          # at the Alembic head
+BEHIND = 'behind'            # versioned, older revision: needs `upgrade`
+EMPTY = 'empty'              # no tables yet
+UNVERSIONED = 'unversioned'  # tables but no alembic_version (created by create_all before migrations)
+
+_heads = {}
+
+
+def _alembic_config():
+    config = current_app.extensions['migrate'].migrate.get_config()
+    # migrations/env.py would otherwise reapply alembic.ini's logging setup in the running app
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def schema_heads():
+    """Head revision(s) of the migration scripts, read once per process."""
+    from alembic.script import ScriptDirectory
+
+    config = _alembic_config()
+    location = config.get_main_option('script_location')
+    if location not in _heads:
+        _heads[location] = frozenset(ScriptDirectory.from_config(config).get_heads())
+    return _heads[location]
+
+
+def schema_state():
+    """CURRENT, BEHIND, EMPTY or UNVERSIONED for the app's database. Needs an app context."""
+    from alembic.runtime.migration import MigrationContext
+
+    with db.engine.connect() as connection:
+        revisions = frozenset(MigrationContext.configure(connection).get_current_heads())
+        if revisions:
+            return CURRENT if revisions == schema_heads() else BEHIND
+        return UNVERSIONED if inspect(connection).has_table(User.__tablename__) else EMPTY
+
+
+def _has_model_columns():
+    """True if every table and column of the models exists in the database."""
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            return False
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        if not columns.issuperset(table.columns.keys()):
+            return False
+    return True
+
+
+@contextmanager
+def init_lock(app: Flask):
+    """Exclusive lock serializing database initialization across the processes of this host."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, LOCK_FILE), 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def ensure_database(app: Flask) -> bool:
+    """Initialize the database unless its schema is already at head. Returns True if it initialized.
+
+    Safe to call from every worker at once: initialization runs under
+    init_lock() and the state is checked again once the lock is held.
+    """
+    with app.app_context():
+        if schema_state() == CURRENT:
+            return False
+        with init_lock(app):
+            if schema_state() == CURRENT:
+                # Another worker initialized it while we waited
+                return False
+            init_db(app)
+        return True
+
+
+def init_db(app: Flask, seed=None) -> None:
+    """Create or migrate the schema and create the admin account; seed demo data if asked.
+
+    seed=None seeds only a database created here, when SEED_SAMPLE_DATA is on.
+    Run under init_lock() (ensure_database and `flask init-db` do).
+    """
+    from alembic import command
+
+    with app.app_context():
+        state = schema_state()
+        if state == EMPTY:
+            # The migrations start from an existing schema, so a new database is
+            # created from the models and stamped at head
+            db.create_all()
+            command.stamp(_alembic_config(), 'head')
+            app.logger.info('Created database schema at revision %s.', ', '.join(sorted(schema_heads())))
+        elif state == BEHIND:
+            command.upgrade(_alembic_config(), 'head')
+            app.logger.info('Migrated database schema to revision %s.', ', '.join(sorted(schema_heads())))
+        elif state == UNVERSIONED:
+            db.create_all()
+            if _has_model_columns():
+                # Built by create_all from the current models (before boot stamped databases)
+                command.stamp(_alembic_config(), 'head')
+                app.logger.info('Stamped existing database schema at revision %s.',
+                                ', '.join(sorted(schema_heads())))
+            else:
+                app.logger.warning(
+                    'Database has no Alembic revision and lacks model columns; created missing tables only. '
+                    'Run `flask db stamp <revision>` and `flask db upgrade` to bring it to head.'
+                )
+        # FTS5 index and its sync triggers are not part of the ORM metadata
+        ensure_project_fts()
+
+        if db.engine.dialect.name == 'sqlite':
+            # Persistent per database file; switching needs the exclusive access held here
+            db.session.execute(text('PRAGMA journal_mode=WAL;'))
+            db.session.commit()
+
+        _ensure_admin(app)
+
+        if seed is None:
+            seed = state == EMPTY and app.config.get('SEED_SAMPLE_DATA', True)
+        if seed:
+            seed_sample_data(app)
+            update_project_dates(app)
+        else:
+            app.logger.info('Skipping demo data seeding.')
+
+
+def _ensure_admin(app: Flask) -> None:
+    """Create the admin account if it doesn't exist."""
+    # Security: Read credentials from environment variables to avoid hardcoded secrets
+    admin_username = app.config.get('ADMIN_USERNAME', 'admin')
+    admin = User.query.filter_by(username=admin_username).first()
+    
+    if not admin:
+        admin_email = app.config.get('ADMIN_EMAIL', 'admin@example.com')
+        admin_password = app.config.get('ADMIN_PASSWORD', 'admin123') or 'admin123'
+        if admin_password == 'admin123':
+            app.logger.warning("Using default admin password; override via ADMIN_PASSWORD.")
+        
+        admin = User(username=admin_username, email=admin_email, user_type='admin')
+        admin.set_password(admin_password)
+        
+        # Set is_active for new admin user
+        if hasattr(admin, 'is_active'):
+            admin.is_active = True
+            
+        db.session.add(admin)
+        db.session.commit()
+        app.logger.info(f"Admin user '{admin_username}' created.")
+
+
+def update_project_dates(app: Flask) -> None:
+    """Update existing project dates to future dates so they're visible on homepage."""
+    today = datetime.utcnow().date()
+    projects = Project.query.all()
+    
+    for i, project in enumerate(projects):
+        # Update approved projects to future dates
+        if project.status in (
+            ProjectStatus.APPROVED.value,
+            ProjectStatus.IN_PROGRESS.value,
+        ):
+            # Set dates to 15-30 days in the future
+            days_offset = 15 + (i % 16)  # Distribute dates between 15-30 days
+            project.date = today + timedelta(days=days_offset)
+            db.session.add(project)
+            app.logger.info(f"Updated project '{project.title}' date to {project.date}")
+    
+    db.session.flush()
+    # Upcoming counts depend on the dates just moved
+    UserStats.rebuild()
+    db.session.commit()
+    catalog_version.bump()
+    app.logger.info(f"Updated {len(projects)} project dates")
+
+
+def seed_sample_data(app: Flask) -> None:
+    """Populate the database with initial sample data for demonstration purposes."""
+    
+    app.logger.info("Seeding sample data...")
+    
+    # Remove existing data to ensure clean state for demo
+    # Note: In production, one should be very careful with this!
+    Registration.query.delete()
+    VolunteerRecord.query.delete()
+    Comment.query.delete()
+    db.session.commit()
+    
+    # Helper utilities to fetch or create users
+    def _get_or_create_user(username: str, email: str, user_type: str, display_name: str = None) -> User:
+        user = User.query.filter_by(username=username).first()
+        if not user:
+            user = User(
+                username=username,
+                email=email,
+                user_type=user_type,
+                display_name=display_name or username
+            )
+            # Use environment variable or simple default for demo users
+            # Note: Demo users always have same simple password for ease of testing
+            user.set_password('Volunteer123!' if user_type == 'participant' else 'OrgPass123!')
+            db.session.add(user)
+            db.session.commit()
+        return user
+    
+    def _get_or_create_project(title: str, org_user: User, **kwargs) -> Project:
+        project = Project.query.filter_by(title=title).first()
+        if not project:
+            project = Project(
+                title=title,
+                organization_id=org_user.id,
+                status='approved',
+                **kwargs
+            )
+            db.session.add(project)
+            db.session.commit()
+        else:
+            # Update project fields if provided
+            if 'status' in kwargs:
+                project.status = kwargs['status']
+            if 'date' in kwargs:
+                project.date = kwargs['date']
+            if 'location' in kwargs:
+                project.location = kwargs['location']
+            if 'category' in kwargs:
+                project.category = kwargs['category']
+            if 'description' in kwargs:
+                project.description = kwargs['description']
+            if 'max_participants' in kwargs:
+                project.max_participants = kwargs['max_participants']
+            if 'duration' in kwargs:
+                project.duration = kwargs['duration']
+            if 'points' in kwargs:
+                project.points = kwargs['points']
+            if 'rating' in kwargs:
+                project.rating = kwargs['rating']
+            if 'requirements' in kwargs:
+                project.requirements = kwargs['requirements']
+                db.session.add(project)
+                db.session.commit()
+        return project
+    
+    # Keep three accounts: admin (created earlier), one org, one participant
+    greenearth = _get_or_create_user("greenearth", "contact@greenearth.org", "organization", "Green Earth Environmental")
+    emma = _get_or_create_user("emma", "emma@example.com", "participant", "Emma Wilson")
+    admin_user = User.query.filter_by(user_type='admin').first()
+    
+    # Create sample projects covering various states
+    # Use future dates for active projects and past dates for completed ones
+    today = datetime.utcnow().date()
+    projects = {
+        "pending_project": _get_or_create_project(
+            "Community Garden Initiative", greenearth,
+            date=today + timedelta(days=30), location="Community Center",
+            category="Environmental", description="Establish a community garden to promote sustainable living and local food production.",
+            max_participants=15, duration=6.0, points=100, rating=0.0,
+            requirements="Interest in gardening and sustainable practices."
+        ),
+        "open_project": _get_or_create_project(
+            "Beach Cleanup Action", greenearth,
+            date=today + timedelta(days=15), location="Golden Coast",
+            category="Environmental", description="Join a community effort to remove debris from the shoreline and protect marine ecosystems.",
+            max_participants=25, duration=4.5, points=70, rating=4.6,
+            requirements="Able to walk on sandy terrain and handle cleanup tools."
+        ),
+        "in_progress_project": _get_or_create_project(
+            "River Conservation Program", greenearth,
+            date=today + timedelta(days=10), location="Riverside Park",
+            category="Environmental", description="Monitor water quality and clean up riverbanks to protect aquatic ecosystems.",
+            max_participants=20, duration=5.0, points=75, rating=4.7,
+            requirements="Comfortable working near water and able to use testing equipment."
+        ),
+        "rejected_project": _get_or_create_project(
+            "Night Market Setup", greenearth,
+            date=today + timedelta(days=22), location="Downtown Square",
+            category="Education", description="Help set up and manage a community night market event.",
+            max_participants=20, duration=5.0, points=80, rating=0.0,
+            requirements="Available in evenings and able to lift moderate weights."
+        ),
+        "completed_project": _get_or_create_project(
+            "Urban Greening Planting Project", greenearth,
+            date=today - timedelta(days=30), location="City Park",
+            category="Environmental", description="Plant native trees and shrubs to improve urban biodiversity and air quality.",
+            max_participants=30, duration=5.0, points=90, rating=4.9,
+            requirements="Comfortable with outdoor manual work for several hours."
+        ),
+        "record_pending_project": _get_or_create_project(
+            "Community Book Donation", greenearth,
+            date=today - timedelta(days=10), location="Civic Center",
+            category="Education", description="Organize and catalog donated books before delivering them to local community centers.",
+            max_participants=12, duration=3.5, points=55, rating=4.3,
+            requirements="Attention to detail and ability to lift small boxes."
+        ),
+        "record_rejected_project": _get_or_create_project(
+            "Urban Street Tree Care", greenearth,
+            date=today - timedelta(days=8), location="Main Avenue",
+            category="Environmental", description="Water and mulch street trees to improve urban canopy health.",
+            max_participants=12, duration=2.0, points=40, rating=4.0,
+            requirements="Comfortable with light outdoor work."
+        ),
+    }
+    
+    # Set statuses explicitly
+    projects["open_project"].status = ProjectStatus.APPROVED.value
+    projects["in_progress_project"].status = ProjectStatus.IN_PROGRESS.value
+    projects["pending_project"].status = ProjectStatus.PENDING.value
+    projects["rejected_project"].status = ProjectStatus.REJECTED.value
+    projects["completed_project"].status = ProjectStatus.COMPLETED.value
+    projects["record_pending_project"].status = ProjectStatus.APPROVED.value
+    projects["record_rejected_project"].status = ProjectStatus.APPROVED.value
+    
+    db.session.commit()
+    
+    # Seed registrations to cover statuses: registered, approved, cancelled, completed, rejected
+    registrations = [
+        (emma, projects["open_project"], "registered"),
+        (emma, projects["in_progress_project"], "approved"),
+        (emma, projects["completed_project"], "completed"),
+        (emma, projects["record_pending_project"], "completed"),
+        (emma, projects["record_rejected_project"], "rejected"),
+        (emma, projects["pending_project"], "cancelled"),
+    ]
+    
+    for user, proj, status in registrations:
+        existing = Registration.query.filter_by(
+            user_id=user.id, project_id=proj.id, status=status).first()
+        if not existing:
+            reg = Registration(
+                user_id=user.id,
+                project_id=proj.id,
+                status=status,
+                created_at=datetime.utcnow(),
+            )
+            db.session.add(reg)
+    
+    db.session.flush()
+    Project.recount_active_registrations()
+    db.session.commit()
+    
+    # Create records for completed registrations (pending and approved variants)
+    for reg in Registration.query.filter_by(status=RegistrationStatus.COMPLETED.value).all():
+        existing = VolunteerRecord.query.filter_by(user_id=reg.user_id, project_id=reg.project_id).first()
+        if not existing:
+            project = reg.project
+            record = VolunteerRecord(
+                user_id=reg.user_id,
+                project_id=reg.project_id,
+                hours=project.duration,
+                points=project.points,
+                status=VolunteerRecordStatus.PENDING.value,  # pending review by default
+                completed_at=datetime.utcnow()
+            )
+            db.session.add(record)
+    
+    # Additional record variants for review states
+    if not VolunteerRecord.query.filter_by(user_id=emma.id, project_id=projects["record_pending_project"].id).first():
+        db.session.add(VolunteerRecord(
+            user_id=emma.id,
+            project_id=projects["record_pending_project"].id,
+            hours=projects["record_pending_project"].duration,
+            points=projects["record_pending_project"].points,
+            status=VolunteerRecordStatus.PENDING.value,
+            completed_at=datetime.utcnow()
+        ))
+    if not VolunteerRecord.query.filter_by(user_id=emma.id, project_id=projects["record_rejected_project"].id).first():
+        db.session.add(VolunteerRecord(
+            user_id=emma.id,
+            project_id=projects["record_rejected_project"].id,
+            hours=projects["record_rejected_project"].duration,
+            points=projects["record_rejected_project"].points,
+            status=VolunteerRecordStatus.REJECTED.value,
+            completed_at=datetime.utcnow()
+        ))
+    
+    # Seed comments (participants + organization) and a reply
+    emma_comment = Comment(
+        user_id=emma.id,
+        project_id=projects["open_project"].id,
+        content="Looking forward to joining the beach cleanup!"
+    )
+    org_comment = Comment(
+        user_id=greenearth.id,
+        project_id=projects["in_progress_project"].id,
+        content="Thanks for the support! We still need 5 more volunteers."
+    )
+    db.session.add_all([emma_comment, org_comment])
+    db.session.flush()  # obtain IDs for replies
+    emma_comment.place_in_thread()
+    org_comment.place_in_thread()
+    
+    reply_comment = Comment(
+        user_id=greenearth.id,
+        project_id=projects["open_project"].id,
+        parent_id=emma_comment.id,
+        content="Welcome! Please check the packing list we just uploaded."
+    )
+    db.session.add(reply_comment)
+    db.session.flush()
+    reply_comment.place_in_thread(emma_comment)
+
+    # Leaderboards are derived from the records replaced above
+    leaderboard.rebuild()
+    db.session.commit()
+    app.logger.info("Sample data seeded successfully.")
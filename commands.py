@@ -0,0 +1,441 @@
+"""Maintenance CLI commands, run with `flask <command>`.
+
+Currently provides:
+- recount-registrations: verify/repair Project.active_registrations
+- check-query-plans: fail if a hot query falls back to a full table scan
+- complete-past-projects: auto-complete eligible past-date projects in chunks
+- run-jobs: run the background job runner in the foreground
+- purge: delete a user or project (and dependent rows) in chunks; resumes interrupted purges
+- rebuild-search-index: rebuild (or check) the project full-text index
+- rebuild-user-stats: verify/rebuild the per-participant dashboard totals (user_stats)
+- refresh-leaderboard: roll the monthly leaderboards over; verify/rebuild all boards
+- generate-dataset: bulk-insert a synthetic dataset for load testing and benchmarks
+- init-db: create/migrate the schema and admin account (release step); reseed demo data
+"""
+import click
+from flask import Flask
+from flask.cli import with_appcontext
+from sqlalchemy import func
+from datetime import date, datetime, timedelta
+
+from models import (
+    db,
+    User,
+    Project,
+    Registration,
+    VolunteerRecord,
+    UserStats,
+    LeaderboardEntry,
+    Comment,
+    ProjectStatus,
+    RegistrationStatus,
+    VolunteerRecordStatus,
+    ACTIVE_REGISTRATION_STATUSES,
+)
+from utils import leaderboard
+from utils.catalog_cache import catalog_version
+
+
+def register_commands(app: Flask) -> None:
+    """Register all maintenance commands with the Flask CLI."""
+    app.cli.add_command(recount_registrations_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(complete_past_projects_command)
+    app.cli.add_command(run_jobs_command)
+    app.cli.add_command(purge_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_user_stats_command)
+    app.cli.add_command(refresh_leaderboard_command)
+    app.cli.add_command(generate_dataset_command)
+    app.cli.add_command(init_db_command)
+
+
+def _active_registration_drift():
+    """Return (project_id, stored, actual) rows where the counter is out of sync."""
+    actual_counts = (
+        db.session.query(
+            Registration.project_id.label('project_id'),
+            func.count(Registration.id).label('actual'),
+        )
+        .filter(Registration.status.in_(ACTIVE_REGISTRATION_STATUSES))
+        .group_by(Registration.project_id)
+        .subquery()
+    )
+    actual = func.coalesce(actual_counts.c.actual, 0)
+    return (
+        db.session.query(Project.id, Project.active_registrations, actual)
+        .outerjoin(actual_counts, actual_counts.c.project_id == Project.id)
+        .filter(Project.active_registrations != actual)
+        .order_by(Project.id)
+        .all()
+    )
+
+
+@click.command('recount-registrations')
+@click.option('--verify-only', is_flag=True, help='Report drift without repairing it.')
+@with_appcontext
+def recount_registrations_command(verify_only):
+    """Verify and repair Project.active_registrations against the Registration table."""
+    drift = _active_registration_drift()
+    for project_id, stored, actual in drift:
+        click.echo(f'project={project_id} stored={stored} actual={actual}')
+
+    if not drift:
+        click.echo('All project participant counters are in sync.')
+        return
+    if verify_only:
+        raise click.ClickException(f'{len(drift)} project(s) have drifted counters.')
+
+    # A full recount is a single statement; prefer it over a huge IN list
+    project_ids = [project_id for project_id, _, _ in drift] if len(drift) <= 500 else None
+    Project.recount_active_registrations(project_ids)
+    db.session.commit()
+    click.echo(f'Repaired {len(drift)} project counter(s).')
+
+
+def _hot_queries():
+    """Return (name, statement) pairs mirroring the queries issued by the API hot paths."""
+    today = datetime.utcnow().date()
+    return [
+        ('available projects', Project.query.filter(
+            Project.status.in_((ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value)),
+            Project.date >= today,
+        ).order_by(Project.date.asc(), Project.id.asc())),
+        ('pending projects', Project.query.filter_by(
+            status=ProjectStatus.PENDING.value
+        ).order_by(Project.created_at.desc())),
+        ('organization projects', Project.query.filter_by(
+            organization_id=1
+        ).order_by(Project.created_at.desc())),
+        ('active registrations of project', db.session.query(func.count(Registration.id)).filter(
+            Registration.project_id == 1,
+            Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+        )),
+        ('registrations of project by status', Registration.query.filter_by(
+            project_id=1, status=RegistrationStatus.COMPLETED.value
+        )),
+        ('registrations of user', Registration.query.filter_by(
+            user_id=1
+        ).order_by(Registration.created_at.desc())),
+        ('pending records', VolunteerRecord.query.filter_by(
+            status=VolunteerRecordStatus.PENDING.value
+        ).order_by(VolunteerRecord.completed_at.desc())),
+        ('approved records of user', VolunteerRecord.query.filter_by(
+            user_id=1, status=VolunteerRecordStatus.APPROVED.value
+        )),
+        ('comments of project', Comment.query.filter_by(
+            project_id=1
+        ).order_by(Comment.created_at.desc())),
+        ('root threads of project', Comment.query.filter(
+            Comment.project_id == 1, Comment.parent_id.is_(None)
+        ).order_by(Comment.created_at.desc(), Comment.id.desc()).limit(21)),
+        ('replies of thread', Comment.query.filter(
+            Comment.descendants_clause(1, '0000000001')
+        ).order_by(Comment.path).limit(21)),
+        ('replies to comments', Comment.query.filter(Comment.parent_id.in_((1, 2, 3)))),
+        ('leaderboard top', LeaderboardEntry.query.filter_by(
+            category='', period=''
+        ).order_by(LeaderboardEntry.position).limit(10)),
+        ('leaderboard neighbour', LeaderboardEntry.query.filter(
+            LeaderboardEntry.category == '', LeaderboardEntry.period == '',
+            LeaderboardEntry.points > 100,
+        ).order_by(LeaderboardEntry.points, LeaderboardEntry.hours, LeaderboardEntry.user_id).limit(1)),
+        ('non-admin users', User.query.filter(
+            User.user_type.in_(('participant', 'organization'))
+        ).order_by(User.created_at.desc()).limit(100)),
+    ]
+
+
+def _is_full_scan(detail):
+    """True for EXPLAIN QUERY PLAN rows like 'SCAN registration' (no index used)."""
+    return detail.startswith('SCAN ') and ' USING ' not in detail
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', '-v', is_flag=True, help='Print the full plan of every query.')
+@with_appcontext
+def check_query_plans_command(verbose):
+    """Run EXPLAIN QUERY PLAN on each hot query and fail on full table scans."""
+    failures = []
+    for name, query in _hot_queries():
+        statement = getattr(query, 'statement', query)
+        sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = [row[3] for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}'))]
+        scans = [detail for detail in plan if _is_full_scan(detail)]
+        click.echo(f"{'FAIL' if scans else 'ok':4} {name}")
+        if verbose or scans:
+            for detail in plan:
+                click.echo(f'       {detail}')
+        if scans:
+            failures.append(name)
+
+    if failures:
+        raise click.ClickException(
+            f'{len(failures)} hot query(s) use a full table scan: {", ".join(failures)}'
+        )
+
+
+@click.command('complete-past-projects')
+@click.option('--chunk-size', default=500, show_default=True,
+              help='Projects completed per transaction; bounds how long the write lock is held.')
+@click.option('--dry-run', is_flag=True, help='Only report how many projects are eligible.')
+@with_appcontext
+def complete_past_projects_command(chunk_size, dry_run):
+    """Auto-complete every eligible past-date project and backfill its volunteer records.
+
+    Projects normally complete when their last registration is finalized; this
+    sweeper catches those whose date passed without further edits. It can be
+    scheduled (e.g. daily via cron) and is safe to re-run or interrupt.
+    """
+    from api.api_registrations import auto_complete_projects
+
+    if chunk_size <= 0:
+        raise click.BadParameter('must be positive', param_hint='--chunk-size')
+    today = date.today()
+
+    if dry_run:
+        eligible = 0
+        after_id = None
+        while True:
+            # Count through a rolled-back sweep so eligibility uses the exact same rules
+            ids = auto_complete_projects(today=today, after_id=after_id, limit=chunk_size)
+            db.session.rollback()
+            eligible += len(ids)
+            if len(ids) < chunk_size:
+                break
+            after_id = max(ids)
+        click.echo(f'{eligible} project(s) eligible for auto-completion.')
+        return
+
+    total = 0
+    after_id = None
+    while True:
+        # Each chunk is its own short transaction; ids only move forward, so
+        # ineligible projects are scanned once per sweep
+        ids = auto_complete_projects(today=today, after_id=after_id, limit=chunk_size)
+        db.session.commit()
+        if ids:
+            catalog_version.bump()
+            total += len(ids)
+            click.echo(f'Completed {len(ids)} project(s) (ids {min(ids)}..{max(ids)}).')
+        if len(ids) < chunk_size:
+            break
+        after_id = max(ids)
+    click.echo(f'Auto-completed {total} project(s).')
+
+
+@click.command('run-jobs')
+@with_appcontext
+def run_jobs_command():
+    """Run the background job runner in the foreground.
+
+    Use with JOB_RUNNER_EMBEDDED=false so web workers only queue jobs and
+    this process executes them.
+    """
+    from flask import current_app
+    from jobs import runner
+
+    click.echo(f'Job runner started ({current_app.config["JOB_THREAD_WORKERS"]} thread, '
+               f'{current_app.config["JOB_PROCESS_WORKERS"]} process workers).')
+    runner.run_forever()
+
+
+@click.command('purge')
+@click.argument('kind', type=click.Choice(['user', 'project']))
+@click.argument('object_id', type=int)
+@click.option('--chunk-size', type=int, default=None,
+              help='Rows deleted per transaction (default: PURGE_CHUNK_SIZE).')
+@with_appcontext
+def purge_command(kind, object_id, chunk_size):
+    """Delete a user or project with everything below it, in short transactions.
+
+    Safe to run again on a purge that was interrupted; it picks up whatever
+    rows are left.
+    """
+    from utils.purge import purge_project, purge_user
+
+    if chunk_size is not None and chunk_size <= 0:
+        raise click.BadParameter('must be positive', param_hint='--chunk-size')
+    purge = purge_user if kind == 'user' else purge_project
+    counts = purge(object_id, chunk_size)
+    if counts is None:
+        raise click.ClickException(f'No {kind} with id {object_id}.')
+    click.echo(f'Purged {kind} {object_id}: ' + ', '.join(f'{n} {name}' for name, n in counts.items()))
+
+
+@click.command('rebuild-search-index')
+@click.option('--check', is_flag=True, help='Only verify the index against the project table.')
+@with_appcontext
+def rebuild_search_index_command(check):
+    """Rebuild the project full-text search index from the project table.
+
+    The index is kept in sync by triggers; rebuild after bulk loads that
+    bypassed them or if --check reports a mismatch.
+    """
+    from sqlalchemy.exc import DatabaseError
+    from utils.search import check_project_fts, rebuild_project_fts
+
+    if check:
+        try:
+            check_project_fts()
+        except DatabaseError as e:
+            raise click.ClickException(f'Search index is out of sync: {e.orig}')
+        click.echo('Search index is in sync.')
+        return
+
+    started = datetime.now()
+    rebuild_project_fts()
+    count = db.session.query(func.count(Project.id)).scalar()
+    click.echo(f'Indexed {count} project(s) in {(datetime.now() - started).total_seconds():.2f}s.')
+
+
+@click.command('rebuild-user-stats')
+@click.option('--verify-only', is_flag=True, help='Report drift without repairing it.')
+@click.option('--all', 'rebuild_all', is_flag=True, help='Rebuild every participant, not just drifted rows.')
+@with_appcontext
+def rebuild_user_stats_command(verify_only, rebuild_all):
+    """Verify and rebuild user_stats against the record and registration tables.
+
+    Rows are maintained incrementally; missing rows are built on first read,
+    so only stored rows are verified.
+    """
+    if rebuild_all:
+        started = datetime.now()
+        count = UserStats.rebuild()
+        db.session.commit()
+        click.echo(f'Rebuilt stats for {count} participant(s) in {(datetime.now() - started).total_seconds():.2f}s.')
+        return
+
+    drift = UserStats.drift()
+    for stats, actual in drift:
+        click.echo(
+            f'user={stats.user_id} '
+            f'hours={stats.total_hours}/{actual["total_hours"]} '
+            f'points={stats.total_points}/{actual["total_points"]} '
+            f'completed={stats.completed_count}/{actual["completed_count"]} '
+            f'upcoming={stats.upcoming_count}/{actual["upcoming_count"]} (stored/actual)'
+        )
+
+    if not drift:
+        click.echo('All user stats are in sync.')
+        return
+    if verify_only:
+        raise click.ClickException(f'{len(drift)} user(s) have drifted stats.')
+
+    # A full rebuild is a single statement; prefer it over a huge IN list
+    user_ids = [stats.user_id for stats, _ in drift] if len(drift) <= 500 else None
+    UserStats.rebuild(user_ids)
+    db.session.commit()
+    click.echo(f'Repaired stats for {len(drift)} user(s).')
+
+
+@click.command('refresh-leaderboard')
+@click.option('--verify-only', is_flag=True, help='Report drift without repairing it.')
+@click.option('--all', 'rebuild_all', is_flag=True, help='Rebuild every board from the volunteer records.')
+@with_appcontext
+def refresh_leaderboard_command(verify_only, rebuild_all):
+    """Roll the monthly leaderboards over, or verify/rebuild every board.
+
+    By default drops month boards older than LEADERBOARD_MONTHS and rebuilds
+    the current and previous month, so a month's final standings are settled
+    once it closes. Meant to be scheduled (e.g. daily via cron); safe to re-run.
+    """
+    if verify_only:
+        drift = leaderboard.drift()
+        for (category, period, user_id), stored, actual in drift:
+            click.echo(
+                f'board=({category or "*"}, {period or "*"}) user={user_id} '
+                f'stored={stored} actual={actual} (points, hours, records, rank)'
+            )
+        if drift:
+            raise click.ClickException(f'{len(drift)} leaderboard entry(s) have drifted.')
+        click.echo('All leaderboards are in sync.')
+        return
+
+    started = datetime.now()
+    if rebuild_all:
+        written = leaderboard.rebuild()
+        db.session.commit()
+        click.echo(f'Rebuilt {written} leaderboard entry(s) in {(datetime.now() - started).total_seconds():.2f}s.')
+        return
+
+    today = datetime.utcnow().date()
+    last_month = date(today.year, today.month, 1) - timedelta(days=1)
+    pruned = leaderboard.prune()
+    written = leaderboard.rebuild([leaderboard.period_of(last_month), leaderboard.period_of(today)])
+    db.session.commit()
+    click.echo(
+        f'Pruned {pruned} expired month entry(s); rebuilt {written} entry(s) for '
+        f'{leaderboard.period_of(last_month)} and {leaderboard.period_of(today)} '
+        f'in {(datetime.now() - started).total_seconds():.2f}s.'
+    )
+
+
+@click.command('generate-dataset')
+@click.option('--organizations', default=5000, show_default=True, help='Organization accounts.')
+@click.option('--participants', default=200000, show_default=True, help='Participant accounts.')
+@click.option('--projects', default=500000, show_default=True, help='Projects, spread over the organizations.')
+@click.option('--registrations', default=5000000, show_default=True,
+              help='Registrations on open and completed projects.')
+@click.option('--records', default=2000000, show_default=True,
+              help='Volunteer records, drawn from completed registrations.')
+@click.option('--comments', default=1000000, show_default=True, help='Comments, about 40% of them replies.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same data.')
+@click.option('--batch-size', default=None, type=int,
+              help='Rows per INSERT transaction (default: 5000).')
+@click.option('--prefix', default='synth', show_default=True, help='Username prefix of the generated accounts.')
+@with_appcontext
+def generate_dataset_command(organizations, participants, projects, registrations, records, comments,
+                             seed, batch_size, prefix):
+    """Bulk-insert a synthetic dataset for load testing and benchmarks.
+
+    Adds to whatever is already in the database. Every generated account
+    uses the password Synthetic123!. Derived tables (seat counters,
+    user_stats, leaderboards) are rebuilt at the end.
+    """
+    from utils.synthetic import DEFAULT_BATCH_SIZE, generate_dataset
+
+    if batch_size is not None and batch_size <= 0:
+        raise click.BadParameter('must be positive', param_hint='--batch-size')
+    for name, value in (('--organizations', organizations), ('--participants', participants),
+                        ('--projects', projects), ('--registrations', registrations),
+                        ('--records', records), ('--comments', comments)):
+        if value < 0:
+            raise click.BadParameter('must not be negative', param_hint=name)
+
+    started = datetime.now()
+    try:
+        counts = generate_dataset(
+            organizations, participants, projects, registrations, records, comments,
+            seed=seed, batch_size=batch_size or DEFAULT_BATCH_SIZE, prefix=prefix, echo=click.echo,
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        'Generated ' + ', '.join(f'{n} {name}' for name, n in counts.items())
+        + f' in {(datetime.now() - started).total_seconds():.2f}s.'
+    )
+
+
+@click.command('init-db')
+@click.option('--seed', is_flag=True,
+              help='Reset the demo data (deletes every registration, record and comment).')
+@with_appcontext
+def init_db_command(seed):
+    """Create or migrate the schema to head, build the search index and create the admin account.
+
+    Meant as a release step when DB_INIT_ON_BOOT is off; takes the same lock
+    as the boot-time check, so it is safe while workers are starting.
+    Without --seed, demo data is only seeded into a newly created database.
+    """
+    from flask import current_app
+    from bootstrap import init_db, init_lock, schema_heads
+
+    app = current_app._get_current_object()
+    started = datetime.now()
+    with init_lock(app):
+        init_db(app, seed=True if seed else None)
+    click.echo(
+        f'Database at revision {", ".join(sorted(schema_heads()))} '
+        f'in {(datetime.now() - started).total_seconds():.2f}s.'
+    )
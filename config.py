@@ -34,5 +34,58 @@ class Config:
     # Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
 
-    # Seed demo data toggle (default True for dev, set to False in production)
+    # Log rotation: size of each file in bytes and number of backups (app.log.1 .. app.log.N)
+    LOG_MAX_BYTES = 102400
+    LOG_BACKUP_COUNT = 10
+
+    # Session user snapshot cache (per process); TTL in seconds, 0 disables it
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', '60'))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '1024'))
+
+    # Background jobs: thread pool for I/O/database tasks, process pool for
+    # CPU-heavy ones (exports); finished results are kept this many hours
+    JOB_THREAD_WORKERS = int(os.environ.get('JOB_THREAD_WORKERS', '2'))
+    JOB_PROCESS_WORKERS = int(os.environ.get('JOB_PROCESS_WORKERS', '2'))
+    JOB_POLL_INTERVAL = 2.0
+    JOB_RESULT_MAX_AGE_HOURS = 24
+    # Rows deleted per transaction when purging users/projects (utils.purge)
+    PURGE_CHUNK_SIZE = 500
+    # Run jobs inside the web process; set to false when `flask run-jobs` runs separately
+    JOB_RUNNER_EMBEDDED = os.environ.get('JOB_RUNNER_EMBEDDED', 'true').lower() in ('1', 'true', 'yes')
+
+    # Full-text search ranks at most this many (newest) matches per query;
+    # BM25 costs a few microseconds per row and FTS5 cannot prune to a top-k
+    SEARCH_MAX_RANKED_MATCHES = int(os.environ.get('SEARCH_MAX_RANKED_MATCHES', '250'))
+
+    # Monthly leaderboards are kept for this many months (current month included)
+    LEADERBOARD_MONTHS = int(os.environ.get('LEADERBOARD_MONTHS', '12'))
+
+    # JSON encoder for API responses: auto (orjson when installed), orjson or json
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+    # Per-request SQL accounting and the Server-Timing header (utils/request_stats.py)
+    SQL_ACCOUNTING = os.environ.get('SQL_ACCOUNTING', 'true').lower() in ('1', 'true', 'yes')
+    # N+1 detector: a statement shape repeated more than this many times in one
+    # request warns in debug mode and raises under TESTING (0 disables)
+    SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD', '20'))
+    SQL_REPEAT_ACTION = os.environ.get('SQL_REPEAT_ACTION', 'auto')  # auto | warn | raise | off
+
+    # Prometheus metrics (GET /metrics). Worker processes share values through
+    # files in METRICS_DIR (default: instance/metrics); the endpoint answers
+    # signed-in admins and the listed client addresses (none by default: behind
+    # a reverse proxy every client arrives from the proxy's address, so only
+    # list a scraper address the proxy never forwards from)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_ALLOWED_IPS = tuple(
+        ip.strip() for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip.strip()
+    )
+
+    # Create/migrate the schema on boot when it is not at the Alembic head
+    # (bootstrap.py; serialized across workers). Set to false to run
+    # `flask init-db` as a release step instead
+    DB_INIT_ON_BOOT = os.environ.get('DB_INIT_ON_BOOT', 'true').lower() in ('1', 'true', 'yes')
+
+    # Seed demo data into a newly created database (default True for dev, set to False in production);
+    # `flask init-db --seed` resets it
     SEED_SAMPLE_DATA = os.environ.get('SEED_SAMPLE_DATA', 'true').lower() in ('1', 'true', 'yes')
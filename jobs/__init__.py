@@ -0,0 +1,340 @@
+"""Local background job subsystem.
+
+Jobs are rows in the `job` table (models.Job), so they survive restarts and
+any worker process can serve status and download requests. Tasks register
+with @task(name, executor=...):
+
+- executor='thread': I/O and database work (e.g. cascade deletes). It runs in
+  a ThreadPoolExecutor inside an app context and is called as
+  fn(params, result_path).
+- executor='process': CPU-bound work (e.g. Excel generation). It runs in a
+  ProcessPoolExecutor, away from the web workers' GIL, and is called as
+  fn(params, result_path, database_uri). It must not rely on Flask state.
+
+A task may write a file to result_path and return a JSON-able dict; the
+'filename' and 'mimetype' keys describe the download. submit_job() inserts
+a queued row and wakes this process's JobRunner. The runner claims jobs
+with a guarded UPDATE, so several processes can share one queue.
+"""
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+from models import db, Job, JobStatus
+
+# name -> JobTask
+TASKS = {}
+
+
+class JobTask:
+    def __init__(self, name, fn, executor, prepare=None):
+        self.name = name
+        self.fn = fn
+        self.executor = executor
+        # Optional prepare(data, user) -> params used by POST /api/v1/jobs;
+        # tasks without one can only be submitted from server code
+        self.prepare = prepare
+
+
+def task(name, executor='thread', prepare=None):
+    """Register a job task under name."""
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown executor {executor!r}')
+
+    def decorator(fn):
+        TASKS[name] = JobTask(name, fn, executor, prepare)
+        return fn
+    return decorator
+
+
+def submit_job(name, params=None, owner_id=None):
+    """Queue a job and wake the runner. Commits. Returns the Job."""
+    if name not in TASKS:
+        raise KeyError(f'Unknown job {name!r}')
+    job = Job(
+        id=uuid.uuid4().hex,
+        name=name,
+        status=JobStatus.QUEUED.value,
+        owner_id=owner_id,
+        params=json.dumps(params or {}),
+    )
+    db.session.add(job)
+    db.session.commit()
+    if runner.app.config.get('JOB_RUNNER_EMBEDDED', True):
+        runner.start()
+        runner.wake()
+    return job
+
+
+def job_result(job):
+    """Decoded result dict of a job (empty if none)."""
+    return json.loads(job.result) if job.result else {}
+
+
+def _process_context():
+    """Multiprocessing context for process tasks.
+
+    Children must not inherit the web server's threads or database
+    connections, so fork is out. The forkserver preloads the task modules;
+    like spawn (the fallback on platforms without it), every child also
+    re-imports the launching script as __mp_main__. That is why app.py
+    only defines create_app() and the app is built in wsgi.py.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['jobs.tasks'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+class JobRunner:
+    """Claims queued jobs and runs them on a thread pool or a process pool."""
+
+    def __init__(self):
+        self.app = None
+        self.runner_id = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dispatcher = None
+        self._pools = {}
+        self._slots = {}
+        self._process_workers = 0
+        self._last_cleanup = 0.0
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['job_runner'] = self
+
+    @property
+    def results_dir(self):
+        return self.app.config.get('JOB_RESULTS_DIR') or os.path.join(self.app.instance_path, 'jobs')
+
+    def start(self):
+        """Start the pools and dispatcher thread (idempotent, lazy on first submit)."""
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            config = self.app.config
+            os.makedirs(self.results_dir, exist_ok=True)
+            self.runner_id = f'{socket.gethostname()}:{os.getpid()}'
+            thread_workers = config.get('JOB_THREAD_WORKERS', 2)
+            process_workers = config.get('JOB_PROCESS_WORKERS', 2)
+            self._process_workers = process_workers
+            self._pools = {
+                'thread': ThreadPoolExecutor(thread_workers, thread_name_prefix='job'),
+                'process': ProcessPoolExecutor(process_workers, mp_context=_process_context()),
+            }
+            self._slots = {
+                'thread': threading.BoundedSemaphore(thread_workers),
+                'process': threading.BoundedSemaphore(process_workers),
+            }
+            self._dispatcher = threading.Thread(target=self._run, name='job-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        with self.app.app_context():
+            self._recover_orphans()
+        poll_interval = self.app.config.get('JOB_POLL_INTERVAL', 2.0)
+        while True:
+            claimed = False
+            for executor in ('thread', 'process'):
+                if not self._slots[executor].acquire(blocking=False):
+                    continue
+                try:
+                    job = self._claim(executor)
+                except Exception:
+                    self.app.logger.exception('Job claim failed')
+                    job = None
+                if job is None:
+                    self._slots[executor].release()
+                    continue
+                claimed = True
+                try:
+                    self._dispatch(executor, *job)
+                except Exception as e:
+                    self._dispatch_failed(executor, job[0], e)
+            if not claimed:
+                try:
+                    self._cleanup_expired()
+                except Exception:
+                    self.app.logger.exception('Job cleanup failed')
+                self._wake.wait(poll_interval)
+                self._wake.clear()
+
+    def _claim(self, executor):
+        """Atomically move the oldest queued job of this executor to running; (id, name, params) or None."""
+        names = [name for name, t in TASKS.items() if t.executor == executor]
+        if not names:
+            return None
+        with self.app.app_context():
+            next_id = (
+                db.select(Job.id)
+                .where(Job.status == JobStatus.QUEUED.value, Job.name.in_(names))
+                .order_by(Job.created_at, Job.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            row = db.session.execute(
+                db.update(Job)
+                .where(Job.id == next_id, Job.status == JobStatus.QUEUED.value)
+                .values(status=JobStatus.RUNNING.value, started_at=datetime.utcnow(), runner=self.runner_id)
+                .returning(Job.id, Job.name, Job.params)
+            ).first()
+            db.session.commit()
+        return tuple(row) if row else None
+
+    def _dispatch(self, executor, job_id, name, params_json):
+        params = json.loads(params_json or '{}')
+        result_path = os.path.join(self.results_dir, job_id)
+        fn = TASKS[name].fn
+        if executor == 'thread':
+            self._pools['thread'].submit(self._run_in_thread, job_id, fn, params, result_path)
+            return
+        with self.app.app_context():
+            database_uri = db.engine.url.render_as_string(hide_password=False)
+        pool = self._pools['process']
+        try:
+            future = pool.submit(fn, params, result_path, database_uri)
+        except (BrokenProcessPool, RuntimeError):
+            # A child died (e.g. OOM-killed) and took the pool down with it
+            self._replace_process_pool(pool)
+            raise
+        future.add_done_callback(lambda f: self._on_process_done(job_id, result_path, f, pool))
+
+    def _dispatch_failed(self, executor, job_id, error):
+        """Fail a claimed job that never reached its pool and free its slot."""
+        self.app.logger.error(f'Job {job_id} could not be started: {error!r}')
+        try:
+            with self.app.app_context():
+                self._finish(job_id, os.path.join(self.results_dir, job_id), error=str(error) or repr(error))
+        except Exception:
+            self.app.logger.exception(f'Could not mark job {job_id} failed')
+        finally:
+            self._slots[executor].release()
+
+    def _replace_process_pool(self, broken):
+        """Swap a broken process pool for a new one (once, however many jobs saw it break)."""
+        with self._lock:
+            if self._pools.get('process') is not broken:
+                return
+            self._pools['process'] = ProcessPoolExecutor(self._process_workers, mp_context=_process_context())
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.app.logger.warning('Job process pool was broken; started a new one')
+
+    def _run_in_thread(self, job_id, fn, params, result_path):
+        try:
+            with self.app.app_context():
+                try:
+                    result = fn(params, result_path)
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f'Job {job_id} failed: {e}', exc_info=True)
+                    self._finish(job_id, result_path, error=str(e))
+                else:
+                    self._finish(job_id, result_path, result=result)
+        finally:
+            self._slots['thread'].release()
+            self.wake()
+
+    def _on_process_done(self, job_id, result_path, future, pool):
+        try:
+            with self.app.app_context():
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    self.app.logger.error(f'Job {job_id} failed: a job process died ({e!r})')
+                    self._finish(job_id, result_path, error='The job process terminated abruptly')
+                    self._replace_process_pool(pool)
+                except Exception as e:
+                    self.app.logger.error(f'Job {job_id} failed: {e!r}')
+                    self._finish(job_id, result_path, error=str(e) or repr(e))
+                else:
+                    self._finish(job_id, result_path, result=result)
+        finally:
+            self._slots['process'].release()
+            self.wake()
+
+    def _finish(self, job_id, result_path, result=None, error=None):
+        db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id)
+            .values(
+                status=JobStatus.FAILED.value if error else JobStatus.SUCCEEDED.value,
+                finished_at=datetime.utcnow(),
+                result=json.dumps(result) if result else None,
+                result_path=result_path if not error and os.path.exists(result_path) else None,
+                error=error,
+            )
+        )
+        db.session.commit()
+        self.app.logger.info(f'Job {job_id} {"failed" if error else "succeeded"}')
+
+    def _recover_orphans(self):
+        """Requeue jobs left running by a process on this host that no longer exists."""
+        host = socket.gethostname()
+        orphaned = []
+        for job_id, claimed_by in db.session.execute(
+            db.select(Job.id, Job.runner).where(Job.status == JobStatus.RUNNING.value)
+        ):
+            owner_host, _, pid = (claimed_by or '').rpartition(':')
+            if owner_host != host or not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                orphaned.append(job_id)
+            except PermissionError:
+                pass  # alive, owned by another user
+        if orphaned:
+            db.session.execute(
+                db.update(Job)
+                .where(Job.id.in_(orphaned), Job.status == JobStatus.RUNNING.value)
+                .values(status=JobStatus.QUEUED.value, runner=None, started_at=None)
+            )
+            db.session.commit()
+            self.app.logger.warning(f'Requeued {len(orphaned)} orphaned job(s)')
+
+    def _cleanup_expired(self):
+        """Hourly: drop finished jobs (and their files) older than JOB_RESULT_MAX_AGE_HOURS."""
+        now = time.monotonic()
+        if now - self._last_cleanup < 3600:
+            return
+        self._last_cleanup = now
+        cutoff = datetime.utcnow() - timedelta(hours=self.app.config.get('JOB_RESULT_MAX_AGE_HOURS', 24))
+        with self.app.app_context():
+            expired = db.session.execute(
+                db.select(Job.id, Job.result_path).where(
+                    Job.status.in_((JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)),
+                    Job.finished_at < cutoff,
+                )
+            ).all()
+            for _, path in expired:
+                if path:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            if expired:
+                db.session.execute(db.delete(Job).where(Job.id.in_([job_id for job_id, _ in expired])))
+                db.session.commit()
+
+    def run_forever(self):
+        """Run the dispatcher in the foreground (flask run-jobs)."""
+        self.start()
+        self._dispatcher.join()
+
+
+runner = JobRunner()
+
+# Register the built-in tasks
+from jobs import tasks  # noqa: E402,F401
@@ -0,0 +1,77 @@
+"""Built-in job tasks.
+
+Process tasks run in a spawned child without a Flask app, so they open their
+own engine from the database URI they are given. Thread tasks run inside an
+app context and may use db.session directly.
+"""
+from sqlalchemy import create_engine
+
+from jobs import task
+from utils.purge import purge_project, purge_user
+from utils import (
+    EXPORT_FETCH_SIZE,
+    XLSX_MIMETYPE,
+    export_filename,
+    parse_year,
+    volunteer_record_export_query,
+    write_records_excel,
+)
+
+# One engine per database URI per worker process
+_engines = {}
+
+
+def _engine(database_uri):
+    engine = _engines.get(database_uri)
+    if engine is None:
+        engine = _engines[database_uri] = create_engine(database_uri)
+    return engine
+
+
+def _prepare_export(data, user):
+    """Validate a POST /api/v1/jobs export request; returns params or raises ValueError."""
+    if user.user_type != 'participant':
+        raise PermissionError('Only participants can export volunteer records')
+    year = parse_year(data.get('year'))
+    category = data.get('category') or None
+    return export_params(user, year=year, category=category)
+
+
+def export_params(user, year=None, category=None, filename_prefix=None):
+    """Params for an export_records job for `user`."""
+    if filename_prefix is None:
+        filtered = year is not None or category is not None
+        filename_prefix = 'filtered_volunteer_records' if filtered else 'all_volunteer_records'
+    return {
+        'user_id': user.id,
+        'user_display_name': user.display_name or user.username,
+        'filename_prefix': filename_prefix,
+        'year': year,
+        'category': category,
+    }
+
+
+@task('export_records', executor='process', prepare=_prepare_export)
+def export_records(params, result_path, database_uri):
+    """Write a participant's volunteer records to an .xlsx file."""
+    stmt = volunteer_record_export_query(params['user_id'], year=params.get('year'), category=params.get('category'))
+    with _engine(database_uri).connect() as conn:
+        rows = conn.execute(stmt.execution_options(yield_per=EXPORT_FETCH_SIZE))
+        with open(result_path, 'wb') as output:
+            write_records_excel(rows, output)
+    return {
+        'filename': export_filename(params.get('filename_prefix', 'volunteer_records'), params.get('user_display_name')),
+        'mimetype': XLSX_MIMETYPE,
+    }
+
+
+@task('delete_user')
+def delete_user(params, result_path):
+    """Purge a user in chunks; safe to re-run if interrupted."""
+    return {'deleted': purge_user(params['user_id'])}
+
+
+@task('delete_project')
+def delete_project(params, result_path):
+    """Purge a project in chunks; safe to re-run if interrupted."""
+    return {'deleted': purge_project(params['project_id'])}
@@ -0,0 +1,66 @@
+"""Add ON DELETE CASCADE to foreign keys of the project/comment graph
+
+Revision ID: a3f8c6d1e927
+Revises: f1c7d2e5a804
+Create Date: 2026-10-17 15:10:12.406218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f8c6d1e927'
+down_revision = 'f1c7d2e5a804'
+branch_labels = None
+depends_on = None
+
+# Most of the original foreign keys are unnamed; this convention names them
+# on reflection so batch mode can drop them
+NAMING_CONVENTION = {
+    'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s',
+}
+
+# table -> [(column, referred table, constraint name)]
+CASCADE_FOREIGN_KEYS = {
+    'project': [('organization_id', 'user', 'fk_project_organization_id_user')],
+    'registration': [
+        ('user_id', 'user', 'fk_registration_user_id_user'),
+        ('project_id', 'project', 'fk_registration_project_id_project'),
+    ],
+    'volunteer_record': [
+        ('user_id', 'user', 'fk_volunteer_record_user_id_user'),
+        ('project_id', 'project', 'fk_volunteer_record_project_id_project'),
+    ],
+    'comment': [
+        ('project_id', 'project', 'fk_comment_project_id_project'),
+        ('user_id', 'user', 'fk_comment_user_id_user'),
+        # Named explicitly when parent_id was added
+        ('parent_id', 'comment', 'fk_comment_parent'),
+    ],
+}
+
+
+def _replace_foreign_keys(ondelete):
+    for table, foreign_keys in CASCADE_FOREIGN_KEYS.items():
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for column, referred, name in foreign_keys:
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+    # Cascades look children up by these keys
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.create_index('ix_volunteer_record_project_id', ['project_id'], unique=False)
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.create_index('ix_comment_user_id', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_index('ix_comment_user_id')
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_volunteer_record_project_id')
+    _replace_foreign_keys(None)
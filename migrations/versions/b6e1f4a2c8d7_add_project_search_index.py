@@ -0,0 +1,50 @@
+"""Add FTS5 full-text index over projects with sync triggers
+
+Revision ID: b6e1f4a2c8d7
+Revises: a3f8c6d1e927
+Create Date: 2026-10-17 16:05:43.219574
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1f4a2c8d7'
+down_revision = 'a3f8c6d1e927'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'title, description, location, category, requirements'
+NEW_VALUES = 'new.title, new.description, new.location, new.category, new.requirements'
+OLD_VALUES = 'old.title, old.description, old.location, old.category, old.requirements'
+
+
+def upgrade():
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5({COLUMNS}, "
+        "content='project', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2', "
+        "prefix='3 4 5')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN "
+        f"INSERT INTO project_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); END"
+    )
+    # Only the indexed columns, so counter updates do not touch the index
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE OF {COLUMNS} ON project BEGIN "
+        f"INSERT INTO project_fts(project_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES}); "
+        f"INSERT INTO project_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES}); END"
+    )
+    op.execute("INSERT INTO project_fts(project_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS project_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ai")
+    op.execute("DROP TABLE IF EXISTS project_fts")
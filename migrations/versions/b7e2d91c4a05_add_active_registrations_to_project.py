@@ -0,0 +1,34 @@
+"""Add denormalized active_registrations counter to project
+
+Revision ID: b7e2d91c4a05
+Revises: 23749350217c
+Create Date: 2026-10-17 09:12:40.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d91c4a05'
+down_revision = '23749350217c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_registrations', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from existing registrations (registered + approved hold a seat)
+    op.execute(
+        "UPDATE project SET active_registrations = ("
+        "SELECT COUNT(*) FROM registration "
+        "WHERE registration.project_id = project.id "
+        "AND registration.status IN ('registered', 'approved'))"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_column('active_registrations')
@@ -0,0 +1,69 @@
+"""Add composite and partial indexes for hot queries
+
+Revision ID: c4d1a8e3f290
+Revises: b7e2d91c4a05
+Create Date: 2026-10-17 11:05:12.604417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d1a8e3f290'
+down_revision = 'b7e2d91c4a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_type_created_at', ['user_type', 'created_at'], unique=False)
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.create_index('ix_project_status_date', ['status', 'date'], unique=False)
+        batch_op.create_index('ix_project_organization_created_at', ['organization_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('registration', schema=None) as batch_op:
+        batch_op.create_index('ix_registration_project_status', ['project_id', 'status'], unique=False)
+        batch_op.create_index('ix_registration_user_created_at', ['user_id', 'created_at'], unique=False)
+
+    # Partial index over seat-holding registrations (SQLite supports partial indexes since 3.8)
+    op.create_index(
+        'ix_registration_project_active',
+        'registration',
+        ['project_id'],
+        unique=False,
+        sqlite_where=sa.text("status IN ('registered', 'approved')"),
+    )
+
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.create_index('ix_volunteer_record_status_completed_at', ['status', 'completed_at'], unique=False)
+        batch_op.create_index('ix_volunteer_record_user_status', ['user_id', 'status'], unique=False)
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.create_index('ix_comment_project_created_at', ['project_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_comment_parent_id', ['parent_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_index('ix_comment_parent_id')
+        batch_op.drop_index('ix_comment_project_created_at')
+
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_volunteer_record_user_status')
+        batch_op.drop_index('ix_volunteer_record_status_completed_at')
+
+    op.drop_index('ix_registration_project_active', table_name='registration')
+
+    with op.batch_alter_table('registration', schema=None) as batch_op:
+        batch_op.drop_index('ix_registration_user_created_at')
+        batch_op.drop_index('ix_registration_project_status')
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_organization_created_at')
+        batch_op.drop_index('ix_project_status_date')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_type_created_at')
@@ -0,0 +1,56 @@
+"""Add user_stats table with per-participant dashboard totals
+
+Revision ID: c9d3e7a1f456
+Revises: b6e1f4a2c8d7
+Create Date: 2026-10-17 18:21:07.530118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d3e7a1f456'
+down_revision = 'b6e1f4a2c8d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # On an unversioned (pre-Alembic) database, bootstrap's create_all() adds the
+    # missing tables before the operator stamps an older revision and upgrades
+    if 'user_stats' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'user_stats',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('total_hours', sa.Float(), server_default='0', nullable=False),
+            sa.Column('total_points', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('upcoming_count', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('upcoming_until', sa.Date(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_user_stats_user_id_user', ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+    # Backfill every participant; rows built lazily since boot are kept
+    op.execute("""
+        INSERT OR IGNORE INTO user_stats
+            (user_id, total_hours, total_points, completed_count, upcoming_count, upcoming_until)
+        SELECT u.id,
+               (SELECT coalesce(sum(r.hours), 0) FROM volunteer_record r
+                 WHERE r.user_id = u.id AND r.status = 'approved'),
+               (SELECT coalesce(sum(r.points), 0) FROM volunteer_record r
+                 WHERE r.user_id = u.id AND r.status = 'approved'),
+               (SELECT count(*) FROM volunteer_record r
+                 WHERE r.user_id = u.id AND r.status = 'approved'),
+               (SELECT count(*) FROM registration g JOIN project p ON p.id = g.project_id
+                 WHERE g.user_id = u.id AND g.status IN ('registered', 'approved') AND p.date >= date('now')),
+               (SELECT min(p.date) FROM registration g JOIN project p ON p.id = g.project_id
+                 WHERE g.user_id = u.id AND g.status IN ('registered', 'approved') AND p.date >= date('now'))
+        FROM user u
+        WHERE u.user_type = 'participant'
+    """)
+
+
+def downgrade():
+    op.drop_table('user_stats')
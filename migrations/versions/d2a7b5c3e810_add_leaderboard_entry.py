@@ -0,0 +1,72 @@
+"""Add leaderboard_entry table with precomputed participant rankings
+
+Revision ID: d2a7b5c3e810
+Revises: c9d3e7a1f456
+Create Date: 2026-10-17 21:04:52.318446
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7b5c3e810'
+down_revision = 'c9d3e7a1f456'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Skipped when init-db found a database with no alembic_version and created
+    # the newer tables from the models; the board is rebuilt below either way
+    if 'leaderboard_entry' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'leaderboard_entry',
+            sa.Column('category', sa.String(length=50), nullable=False),
+            sa.Column('period', sa.String(length=7), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('points', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('hours', sa.Float(), server_default='0', nullable=False),
+            sa.Column('records', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_leaderboard_entry_user_id_user', ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('category', 'period', 'user_id')
+        )
+        with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+            batch_op.create_index('ix_leaderboard_entry_position', ['category', 'period', 'position'], unique=False)
+            batch_op.create_index('ix_leaderboard_entry_score', ['category', 'period', 'points', 'hours', 'user_id'], unique=False)
+            batch_op.create_index('ix_leaderboard_entry_user_id', ['user_id'], unique=False)
+
+    # Rank every approved record onto its four boards (overall, category,
+    # month, category within month). `flask refresh-leaderboard` later drops
+    # months beyond the retention window.
+    op.execute("DELETE FROM leaderboard_entry")
+    op.execute("""
+        INSERT INTO leaderboard_entry (category, period, user_id, points, hours, records, position)
+        SELECT category, period, user_id, points, hours, records,
+               row_number() OVER (PARTITION BY category, period
+                                  ORDER BY points DESC, hours DESC, user_id DESC)
+        FROM (
+            SELECT category, period, user_id,
+                   sum(points) AS points, round(sum(hours), 2) AS hours, count(*) AS records
+            FROM (
+                SELECT '' AS category, '' AS period, r.user_id, r.points, r.hours
+                  FROM volunteer_record r WHERE r.status = 'approved'
+                UNION ALL
+                SELECT p.category, '', r.user_id, r.points, r.hours
+                  FROM volunteer_record r JOIN project p ON p.id = r.project_id WHERE r.status = 'approved'
+                UNION ALL
+                SELECT '', strftime('%Y-%m', r.completed_at), r.user_id, r.points, r.hours
+                  FROM volunteer_record r WHERE r.status = 'approved' AND r.completed_at IS NOT NULL
+                UNION ALL
+                SELECT p.category, strftime('%Y-%m', r.completed_at), r.user_id, r.points, r.hours
+                  FROM volunteer_record r JOIN project p ON p.id = r.project_id
+                 WHERE r.status = 'approved' AND r.completed_at IS NOT NULL
+            )
+            GROUP BY category, period, user_id
+        )
+    """)
+
+
+def downgrade():
+    op.drop_table('leaderboard_entry')
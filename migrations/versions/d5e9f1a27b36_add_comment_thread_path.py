@@ -0,0 +1,63 @@
+"""Add materialized thread path and reply_count to comment
+
+Revision ID: d5e9f1a27b36
+Revises: c4d1a8e3f290
+Create Date: 2026-10-17 11:05:12.402915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e9f1a27b36'
+down_revision = 'c4d1a8e3f290'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thread_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('path', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill thread_id/path: parents always have a lower id than their replies,
+    # so one pass in id order sees every parent before its children
+    bind = op.get_bind()
+    rows = bind.execute(sa.text('SELECT id, parent_id FROM comment ORDER BY id')).fetchall()
+    placed = {}
+    updates = []
+    for comment_id, parent_id in rows:
+        segment = f'{comment_id:010d}'
+        parent = placed.get(parent_id) if parent_id is not None else None
+        if parent is None:
+            # Roots (and replies whose parent no longer exists) start their own thread
+            thread_id, path = comment_id, segment
+        else:
+            thread_id, path = parent[0], f'{parent[1]}.{segment}'
+        placed[comment_id] = (thread_id, path)
+        updates.append({'id': comment_id, 'thread_id': thread_id, 'path': path})
+    if updates:
+        bind.execute(
+            sa.text('UPDATE comment SET thread_id = :thread_id, path = :path WHERE id = :id'),
+            updates,
+        )
+    op.execute(
+        "UPDATE comment SET reply_count = ("
+        "SELECT COUNT(*) FROM comment AS below "
+        "WHERE below.thread_id = comment.thread_id "
+        "AND below.path > comment.path || '.' "
+        "AND below.path < comment.path || '/')"
+    )
+
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.create_index('ix_comment_thread_path', ['thread_id', 'path'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('comment', schema=None) as batch_op:
+        batch_op.drop_index('ix_comment_thread_path')
+        batch_op.drop_column('reply_count')
+        batch_op.drop_column('path')
+        batch_op.drop_column('thread_id')
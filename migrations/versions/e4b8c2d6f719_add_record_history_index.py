@@ -0,0 +1,31 @@
+"""Add (user_id, completed_at) index for paginated record history
+
+Revision ID: e4b8c2d6f719
+Revises: d2a7b5c3e810
+Create Date: 2026-10-17 22:40:18.902755
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8c2d6f719'
+down_revision = 'd2a7b5c3e810'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's boot-time db.create_all() may already have created the index
+    op.create_index(
+        'ix_volunteer_record_user_completed_at',
+        'volunteer_record',
+        ['user_id', 'completed_at'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index('ix_volunteer_record_user_completed_at', table_name='volunteer_record')
@@ -0,0 +1,37 @@
+"""Make volunteer records unique per (user_id, project_id)
+
+Revision ID: e8a4b6c0d913
+Revises: d5e9f1a27b36
+Create Date: 2026-10-17 13:20:47.551306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a4b6c0d913'
+down_revision = 'd5e9f1a27b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicates first, keeping the reviewed record if any (approved, then
+    # rejected, then pending) and otherwise the oldest
+    op.execute(
+        "DELETE FROM volunteer_record WHERE id NOT IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY user_id, project_id "
+        "ORDER BY CASE status WHEN 'approved' THEN 0 WHEN 'rejected' THEN 1 ELSE 2 END, id"
+        ") AS rank FROM volunteer_record"
+        ") WHERE rank = 1)"
+    )
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_volunteer_record_user_project', ['user_id', 'project_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('volunteer_record', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_volunteer_record_user_project', type_='unique')
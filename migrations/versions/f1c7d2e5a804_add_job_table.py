@@ -0,0 +1,50 @@
+"""Add job table for background jobs
+
+Revision ID: f1c7d2e5a804
+Revises: e8a4b6c0d913
+Create Date: 2026-10-17 14:02:31.884170
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c7d2e5a804'
+down_revision = 'e8a4b6c0d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The app's boot-time db.create_all() may already have created the table
+    if 'job' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'job',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.Column('params', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('result_path', sa.String(length=500), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('runner', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.create_index('ix_job_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index('ix_job_owner_created_at', ['owner_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('job', schema=None) as batch_op:
+        batch_op.drop_index('ix_job_owner_created_at')
+        batch_op.drop_index('ix_job_status_created_at')
+
+    op.drop_table('job')
@@ -1,14 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
-from sqlalchemy.orm import relationship
-from sqlalchemy import UniqueConstraint, CheckConstraint
+from sqlalchemy.orm import relationship, backref
+from sqlalchemy import UniqueConstraint, CheckConstraint, Index, text, event
+from sqlalchemy.engine import Engine
 import enum
+import sqlite3
 
 # SQLAlchemy instance to be initialized in app factory
 db = SQLAlchemy()
 
 
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite leaves foreign keys (and so ON DELETE CASCADE) off unless asked per connection."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
 class ProjectStatus(enum.Enum):
     """Allowed lifecycle statuses for projects."""
     PENDING = 'pending'
@@ -34,6 +45,21 @@ class VolunteerRecordStatus(enum.Enum):
     REJECTED = 'rejected'
 
 
+class JobStatus(enum.Enum):
+    """Lifecycle of a background job (see the jobs package)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+# Registration statuses that hold a seat on a project
+ACTIVE_REGISTRATION_STATUSES = (
+    RegistrationStatus.REGISTERED.value,
+    RegistrationStatus.APPROVED.value,
+)
+
+
 # Database Models
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -48,10 +74,16 @@ class User(UserMixin, db.Model):
     ban_reason = db.Column(db.String(500))  # Reason for ban (shown to user)
     ban_until = db.Column(db.DateTime)  # NULL = permanent ban when is_active=False
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Admin user lists filter by type and sort newest first
+    __table_args__ = (
+        Index('ix_user_type_created_at', 'user_type', 'created_at'),
+    )
     
-    projects = relationship('Project', backref='organization', lazy=True)
-    registrations = relationship('Registration', backref='user', lazy=True)
-    volunteer_records = relationship('VolunteerRecord', backref='user', lazy=True)
+    # Dependent rows are removed by ON DELETE CASCADE (see utils.purge for large deletes)
+    projects = relationship('Project', backref='organization', lazy=True, passive_deletes=True)
+    registrations = relationship('Registration', backref='user', lazy=True, passive_deletes=True)
+    volunteer_records = relationship('VolunteerRecord', backref='user', lazy=True, passive_deletes=True)
     
     def set_password(self, password):
         from werkzeug.security import generate_password_hash
@@ -66,7 +98,7 @@ class Project(db.Model):
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    organization_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    organization_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     date = db.Column(db.Date, nullable=False)
     location = db.Column(db.String(200), nullable=False)
     max_participants = db.Column(db.Integer, nullable=False)
@@ -78,19 +110,45 @@ class Project(db.Model):
     status = db.Column(db.String(20), default=ProjectStatus.PENDING.value)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     requirements = db.Column(db.Text)
+    # Denormalized count of registrations in ACTIVE_REGISTRATION_STATUSES.
+    # Maintained in the same transaction as every registration status change.
+    # Served to clients as current_participants (see docs/API.md).
+    active_registrations = db.Column(db.Integer, default=0, server_default='0', nullable=False)
 
     # Ensure min_participants is never greater than max_participants
     __table_args__ = (
         CheckConstraint('min_participants <= max_participants', name='ck_project_min_le_max'),
+        Index('ix_project_status_date', 'status', 'date'),
+        Index('ix_project_organization_created_at', 'organization_id', 'created_at'),
     )
     
-    registrations = relationship('Registration', backref='project', lazy=True)
-    volunteer_records = relationship('VolunteerRecord', backref='project', lazy=True)
+    registrations = relationship('Registration', backref='project', lazy=True, passive_deletes=True)
+    volunteer_records = relationship('VolunteerRecord', backref='project', lazy=True, passive_deletes=True)
+
+    @classmethod
+    def recount_active_registrations(cls, project_ids=None):
+        """Recompute active_registrations from the Registration table.
+
+        Recounts every project when project_ids is None. Does not commit.
+        Returns the number of project rows updated.
+        """
+        active_count = (
+            db.select(db.func.count(Registration.id))
+            .where(
+                Registration.project_id == cls.id,
+                Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+            )
+            .scalar_subquery()
+        )
+        stmt = db.update(cls).values(active_registrations=active_count)
+        if project_ids is not None:
+            stmt = stmt.where(cls.id.in_(project_ids))
+        return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
 
 class Registration(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
     # Registration lifecycle; see RegistrationStatus enum for allowed values
     status = db.Column(db.String(20), default=RegistrationStatus.REGISTERED.value)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -98,26 +156,312 @@ class Registration(db.Model):
     # Prevent duplicate registrations for the same user/project pair
     __table_args__ = (
         UniqueConstraint('user_id', 'project_id', name='uq_registration_user_project'),
+        Index('ix_registration_project_status', 'project_id', 'status'),
+        Index('ix_registration_user_created_at', 'user_id', 'created_at'),
+        # Partial index over seat-holding registrations only (SQLite >= 3.8)
+        Index(
+            'ix_registration_project_active',
+            'project_id',
+            sqlite_where=text("status IN ('registered', 'approved')"),
+        ),
     )
 
 class VolunteerRecord(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
     hours = db.Column(db.Float, nullable=False)
     points = db.Column(db.Integer, nullable=False)
     # Approval workflow for certified hours
     status = db.Column(db.String(20), default=VolunteerRecordStatus.PENDING.value)  # pending, approved, rejected
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # One record per participant per project; lets record backfills use INSERT OR IGNORE
+    __table_args__ = (
+        UniqueConstraint('user_id', 'project_id', name='uq_volunteer_record_user_project'),
+        Index('ix_volunteer_record_status_completed_at', 'status', 'completed_at'),
+        Index('ix_volunteer_record_user_status', 'user_id', 'status'),
+        # A participant's record history, newest first (id breaks ties via the rowid)
+        Index('ix_volunteer_record_user_completed_at', 'user_id', 'completed_at'),
+        # Child key of the project cascade
+        Index('ix_volunteer_record_project_id', 'project_id'),
+    )
+
+
+class UserStats(db.Model):
+    """Per-participant dashboard totals, kept in step with record and registration changes.
+
+    The approved-record totals are moved by SQL-side deltas in the same
+    transaction as each record status change. upcoming_count depends on
+    project dates, so it is recounted for the users whose registrations
+    change, and upcoming_until (earliest project date it counts) tells
+    readers when time alone has made it stale. Rows are built on first
+    read (see current()); a missing row is never incremented.
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    # Approved volunteer records only
+    total_hours = db.Column(db.Float, default=0.0, server_default='0', nullable=False)
+    total_points = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    completed_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Seat-holding registrations on projects dated today or later
+    upcoming_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    upcoming_until = db.Column(db.Date)
+
+    @staticmethod
+    def _actual(user_id, today):
+        """Correlated subqueries computing every column from source rows for user_id."""
+        approved = db.and_(
+            VolunteerRecord.user_id == user_id,
+            VolunteerRecord.status == VolunteerRecordStatus.APPROVED.value,
+        )
+        upcoming = db.and_(
+            Registration.user_id == user_id,
+            Registration.status.in_(ACTIVE_REGISTRATION_STATUSES),
+            Project.date >= today,
+        )
+        return {
+            'total_hours': db.select(db.func.coalesce(db.func.sum(VolunteerRecord.hours), 0.0))
+            .where(approved).scalar_subquery(),
+            'total_points': db.select(db.func.coalesce(db.func.sum(VolunteerRecord.points), 0))
+            .where(approved).scalar_subquery(),
+            'completed_count': db.select(db.func.count(VolunteerRecord.id)).where(approved).scalar_subquery(),
+            'upcoming_count': db.select(db.func.count(Registration.id))
+            .join(Project, Project.id == Registration.project_id)
+            .where(upcoming).scalar_subquery(),
+            'upcoming_until': db.select(db.func.min(Project.date))
+            .join(Registration, Registration.project_id == Project.id)
+            .where(upcoming).scalar_subquery(),
+        }
+
+    @classmethod
+    def rebuild(cls, user_ids=None, today=None):
+        """Recompute rows from source tables, creating missing ones.
+
+        Covers every participant when user_ids is None. Does not commit.
+        Returns the number of rows written.
+        """
+        actual = cls._actual(User.id, today or datetime.utcnow().date())
+        users = db.select(User.id, *actual.values()).where(User.user_type == 'participant')
+        if user_ids is not None:
+            users = users.where(User.id.in_(user_ids))
+        stmt = db.insert(cls).from_select(['user_id', *actual], users).prefix_with('OR REPLACE')
+        return db.session.execute(stmt).rowcount
+
+    @classmethod
+    def add_approved_records(cls, record_filter, sign=1):
+        """Add (sign=1) or remove (sign=-1) the selected records' hours and points.
+
+        Call before the status change, with record_filter selecting the records
+        that enter (or leave) the approved status. Does not commit.
+        """
+        selected = db.and_(record_filter, VolunteerRecord.user_id == cls.user_id)
+
+        def total(expression):
+            return db.select(expression).where(selected).scalar_subquery()
+
+        stmt = (
+            db.update(cls)
+            .where(cls.user_id.in_(db.select(VolunteerRecord.user_id).where(record_filter)))
+            .values(
+                total_hours=cls.total_hours + sign * total(db.func.coalesce(db.func.sum(VolunteerRecord.hours), 0.0)),
+                total_points=cls.total_points + sign * total(db.func.coalesce(db.func.sum(VolunteerRecord.points), 0)),
+                completed_count=cls.completed_count + sign * total(db.func.count(VolunteerRecord.id)),
+            )
+        )
+        return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
+
+    @classmethod
+    def recount_upcoming(cls, user_ids, today=None):
+        """Recount upcoming_count/upcoming_until for user_ids after their registrations change.
+
+        Each recount is an index range over the user's registrations. Does not commit.
+        """
+        actual = cls._actual(cls.user_id, today or datetime.utcnow().date())
+        stmt = (
+            db.update(cls)
+            .where(cls.user_id.in_(user_ids))
+            .values(upcoming_count=actual['upcoming_count'], upcoming_until=actual['upcoming_until'])
+        )
+        return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
+
+    @classmethod
+    def current(cls, user_id, today=None):
+        """Return the participant's stats row, building it or expiring upcoming_count as needed.
+
+        Normally a single primary-key read. Commits only when it had to write.
+        Returns None for users who are not participants.
+        """
+        today = today or datetime.utcnow().date()
+        stats = db.session.get(cls, user_id)
+        if stats is not None and (stats.upcoming_until is None or stats.upcoming_until >= today):
+            return stats
+        if stats is None:
+            cls.rebuild([user_id], today)
+        else:
+            # A counted project date has passed
+            cls.recount_upcoming([user_id], today)
+        db.session.commit()
+        return db.session.get(cls, user_id, populate_existing=True)
+
+    @classmethod
+    def drift(cls, today=None):
+        """Return (row, actual values) for stored rows that disagree with the source tables.
+
+        upcoming_count is only compared for rows not yet expired by date (those
+        are fixed on read).
+        """
+        today = today or datetime.utcnow().date()
+        actual = cls._actual(cls.user_id, today)
+        rows = db.session.execute(db.select(cls, *actual.values()).order_by(cls.user_id)).all()
+        drifted = []
+        for stats, *values in rows:
+            values = dict(zip(actual, values))
+            if (
+                abs(stats.total_hours - values['total_hours']) > 1e-6
+                or stats.total_points != values['total_points']
+                or stats.completed_count != values['completed_count']
+                or (
+                    (stats.upcoming_until is None or stats.upcoming_until >= today)
+                    and stats.upcoming_count != values['upcoming_count']
+                )
+            ):
+                drifted.append((stats, values))
+        return drifted
+
+
+class LeaderboardEntry(db.Model):
+    """One participant's standing on one leaderboard (see utils.leaderboard).
+
+    A board is a (category, period) pair, '' meaning all categories or all
+    time; periods are 'YYYY-MM' months. position is the participant's
+    1-based place on the board, kept current on every change so that
+    top-K and "my rank" are index reads.
+    """
+    __tablename__ = 'leaderboard_entry'
+
+    category = db.Column(db.String(50), primary_key=True)
+    period = db.Column(db.String(7), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    # Approved volunteer records on the board
+    points = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    hours = db.Column(db.Float, default=0.0, server_default='0', nullable=False)
+    records = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        # Top-K pages and board sizes
+        Index('ix_leaderboard_entry_position', 'category', 'period', 'position'),
+        # Finding a participant's new neighbours when their score changes
+        Index('ix_leaderboard_entry_score', 'category', 'period', 'points', 'hours', 'user_id'),
+        Index('ix_leaderboard_entry_user_id', 'user_id'),
+    )
+
+def comment_path_segment(comment_id):
+    """Fixed-width path segment so materialized paths sort in reply (id) order."""
+    return f'{comment_id:010d}'
+
+
 class Comment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    parent_id = db.Column(db.Integer, db.ForeignKey('comment.id'), nullable=True)  # For replies
+    parent_id = db.Column(db.Integer, db.ForeignKey('comment.id', ondelete='CASCADE'), nullable=True)  # For replies
+    # Thread key: id of the root comment of the thread (own id for root comments)
+    thread_id = db.Column(db.Integer, nullable=True)
+    # Materialized path of ids from the root, e.g. '0000000012.0000000034'; set by place_in_thread()
+    path = db.Column(db.Text, nullable=True)
+    # Number of replies anywhere below this comment (the whole thread for a root comment)
+    reply_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_comment_project_created_at', 'project_id', 'created_at'),
+        Index('ix_comment_parent_id', 'parent_id'),
+        # Child key of the user cascade
+        Index('ix_comment_user_id', 'user_id'),
+        Index('ix_comment_thread_path', 'thread_id', 'path'),
+    )
     
-    project = relationship('Project', backref='comments', lazy=True)
-    user = relationship('User', backref='comments', lazy=True)
-    parent = relationship('Comment', remote_side=[id], backref='replies', lazy=True)
+    project = relationship('Project', backref=backref('comments', passive_deletes=True), lazy=True)
+    user = relationship('User', backref=backref('comments', passive_deletes=True), lazy=True)
+    parent = relationship('Comment', remote_side=[id], backref=backref('replies', passive_deletes=True), lazy=True)
+
+    @property
+    def depth(self):
+        """0 for a root comment, 1 for a direct reply, and so on."""
+        return self.path.count('.') if self.path else 0
+
+    def place_in_thread(self, parent=None):
+        """Set thread_id/path for a flushed comment and bump reply_count on its ancestors.
+
+        Must be called once, after the comment has an id. Does not commit.
+        """
+        segment = comment_path_segment(self.id)
+        if parent is None:
+            self.thread_id = self.id
+            self.path = segment
+            return
+        self.thread_id = parent.thread_id
+        self.path = f'{parent.path}.{segment}'
+        ancestor_ids = [int(part) for part in parent.path.split('.')]
+        db.session.execute(
+            db.update(Comment)
+            .where(Comment.id.in_(ancestor_ids))
+            .values(reply_count=Comment.reply_count + 1),
+            execution_options={'synchronize_session': False},
+        )
+
+    @classmethod
+    def descendants_clause(cls, thread_id, path):
+        """Filter for every reply below the comment at path (a range on ix_comment_thread_path)."""
+        # '/' is the character after '.', so this range is exactly the 'path.' prefix
+        return db.and_(cls.thread_id == thread_id, cls.path > path + '.', cls.path < path + '/')
+
+    @classmethod
+    def recount_replies(cls, thread_ids=None):
+        """Recompute reply_count from the stored paths.
+
+        Recounts every comment when thread_ids is None. Does not commit.
+        Returns the number of comment rows updated.
+        """
+        below = db.aliased(cls)
+        reply_total = (
+            db.select(db.func.count(below.id))
+            .where(
+                below.thread_id == cls.thread_id,
+                below.path > cls.path + '.',
+                below.path < cls.path + '/',
+            )
+            .scalar_subquery()
+        )
+        stmt = db.update(cls).values(reply_count=reply_total)
+        if thread_ids is not None:
+            stmt = stmt.where(cls.thread_id.in_(thread_ids))
+        return db.session.execute(stmt, execution_options={'synchronize_session': False}).rowcount
+
+
+class Job(db.Model):
+    """A background job run by jobs.JobRunner; result files live under instance/jobs."""
+    # Random hex id, so job URLs cannot be enumerated
+    id = db.Column(db.String(32), primary_key=True)
+    name = db.Column(db.String(50), nullable=False)  # registered task name
+    status = db.Column(db.String(20), default=JobStatus.QUEUED.value, nullable=False)
+    # Submitting user; not a foreign key so jobs outlive (e.g. account deletion) their owner
+    owner_id = db.Column(db.Integer, nullable=True)
+    params = db.Column(db.Text)  # JSON
+    result = db.Column(db.Text)  # JSON summary returned by the task
+    result_path = db.Column(db.String(500))  # downloadable output, if any
+    error = db.Column(db.Text)
+    runner = db.Column(db.String(100))  # host:pid that claimed the job
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # Runners claim the oldest queued job
+        Index('ix_job_status_created_at', 'status', 'created_at'),
+        Index('ix_job_owner_created_at', 'owner_id', 'created_at'),
+    )
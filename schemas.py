@@ -1,11 +1,7 @@
-from flask_marshmallow import Marshmallow
-from marshmallow import fields, validates_schema, ValidationError, validate
+from marshmallow import Schema, fields, validates_schema, ValidationError, validate
 
-# Global Marshmallow instance, initialized with the Flask app in app.py
-ma = Marshmallow()
 
-
-class ProjectCreateSchema(ma.Schema):
+class ProjectCreateSchema(Schema):
     """Schema for validating project creation payloads (organization publish form)."""
     title = fields.Str(required=True, validate=validate.Length(min=3, max=200))
     description = fields.Str(required=True, validate=validate.Length(min=1))
@@ -33,7 +29,7 @@ class ProjectCreateSchema(ma.Schema):
             )
 
 
-class ProjectUpdateSchema(ma.Schema):
+class ProjectUpdateSchema(Schema):
     """Schema for validating partial project updates (PATCH endpoint)."""
     title = fields.Str(required=False, validate=validate.Length(min=3, max=200))
     description = fields.Str(required=False, validate=validate.Length(min=1))
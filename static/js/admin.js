@@ -17,14 +17,34 @@ document.querySelectorAll('.nav-item[data-tab]').forEach(item => {
     });
 });
 
+// Review queues are paged with cursors; "Load more" appends the next page
+const reviewQueuePageSize = 50;
+let pendingProjects = [];
+let pendingProjectsCursor = null;
+let pendingRecords = [];
+let pendingRecordsCursor = null;
+
+function renderLoadMoreButton(cursor, total, loaded, onClick) {
+    if (!cursor) return '';
+    return `
+        <div class="text-center mt-4">
+            <button class="btn btn-outline" onclick="${onClick}">Load more (${loaded} of ${total})</button>
+        </div>
+    `;
+}
+
 // Load pending projects
-async function loadPendingProjects() {
+async function loadPendingProjects(append = false) {
     try {
-        const response = await fetch('/api/v1/projects?all=true');
+        const params = new URLSearchParams({ limit: String(reviewQueuePageSize) });
+        if (append && pendingProjectsCursor) params.append('cursor', pendingProjectsCursor);
+
+        const response = await fetch(`/api/v1/admin/review/projects?${params.toString()}`);
         if (!response.ok) throw new Error('Failed to load projects');
 
-        const projects = await response.json();
-        const pendingProjects = projects.filter(p => p.status === 'pending');
+        const data = await response.json();
+        pendingProjects = append ? pendingProjects.concat(data.projects) : data.projects;
+        pendingProjectsCursor = data.next_cursor;
 
         const container = document.getElementById('project-review-tab');
         const header = container.querySelector('.mb-8');
@@ -41,7 +61,7 @@ async function loadPendingProjects() {
                                 <h3 style="margin: 0;">${project.title}</h3>
                                 <div class="flex items-center gap-2 mt-2">
                                     <span class="badge badge-orange">Pending Review</span>
-                                    <span class="text-sm text-gray-600">${project.organization_name || 'Organization'} · Submitted ${project.created_at || 'Recently'}</span>
+                                    <span class="text-sm text-gray-600">${project.organization_name || 'Organization'} · Submitted ${project.submitted_date || 'Recently'}</span>
                                 </div>
                             </div>
                         </div>
@@ -71,6 +91,9 @@ async function loadPendingProjects() {
                     </div>
                 </div>
     `).join('');
+            html += renderLoadMoreButton(
+                pendingProjectsCursor, data.totals.projects, pendingProjects.length, 'loadPendingProjects(true)'
+            );
         }
 
         container.innerHTML = '';
@@ -153,13 +176,25 @@ async function saveProjectRating(projectId) {
 }
 
 // Load hour records
-async function loadHourRecords() {
+async function loadHourRecords(append = false) {
     try {
-        const response = await fetch('/api/v1/records?status=pending');
+        const params = new URLSearchParams({ limit: String(reviewQueuePageSize) });
+        if (append && pendingRecordsCursor) params.append('cursor', pendingRecordsCursor);
+
+        const response = await fetch(`/api/v1/admin/review/records?${params.toString()}`);
         if (!response.ok) throw new Error('Failed to load records');
 
-        const records = await response.json();
-        renderHourRecords(records);
+        const data = await response.json();
+        pendingRecords = append ? pendingRecords.concat(data.records) : data.records;
+        pendingRecordsCursor = data.next_cursor;
+        renderHourRecords(pendingRecords);
+
+        const loadMore = document.getElementById('records-load-more');
+        if (loadMore) {
+            loadMore.innerHTML = renderLoadMoreButton(
+                pendingRecordsCursor, data.totals.records, pendingRecords.length, 'loadHourRecords(true)'
+            );
+        }
     } catch (e) {
         console.error(e);
     }
@@ -415,6 +450,8 @@ async function deleteUser(userId) {
         });
 
         if (response.ok) {
+            // Deletion runs as a background job; refresh once it has finished
+            await waitForJob((await response.json()).status_url);
             await Modal.success('User deleted successfully');
             loadUsers();
         } else {
@@ -94,11 +94,12 @@ function renderProjectCard(project) {
 
 async function fetchProjects() {
     try {
-        const response = await fetch('/api/v1/projects?available=true');
+        // Only the first page is needed for the featured section
+        const response = await fetch('/api/v1/projects?available=true&limit=4');
         if (!response.ok) {
             throw new Error('Failed to load projects');
         }
-        const projects = await response.json();
+        const { projects } = await response.json();
         // Transform response to match expected format
         return projects.map(p => ({
             ...p,
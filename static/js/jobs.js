@@ -0,0 +1,46 @@
+/**
+ * Background job helpers
+ * Heavy endpoints answer 202 with a job; poll its status URL until it finishes
+ */
+
+/**
+ * Poll a job until it succeeds or fails
+ * @param {string} statusUrl - The job's status_url from the 202 response
+ * @param {Object} options - Optional configuration
+ * @param {number} options.interval - Milliseconds between polls (default: 1000)
+ * @param {number} options.timeout - Give up after this many milliseconds (default: 300000)
+ * @returns {Promise<Object>} The finished job (rejects if it failed)
+ */
+async function waitForJob(statusUrl, options = {}) {
+    const interval = options.interval || 1000;
+    const deadline = Date.now() + (options.timeout || 300000);
+
+    while (Date.now() < deadline) {
+        const response = await fetch(statusUrl);
+        if (!response.ok) {
+            throw new Error('Failed to check job status');
+        }
+        const job = await response.json();
+        if (job.status === 'succeeded') {
+            return job;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Job failed');
+        }
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+    throw new Error('Job is taking too long');
+}
+
+/**
+ * Trigger a browser download for a finished job's file
+ * @param {Object} job - A succeeded job with a download_url
+ */
+function downloadJobResult(job) {
+    const a = document.createElement('a');
+    a.href = job.download_url;
+    a.download = job.filename || '';
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+}
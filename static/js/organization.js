@@ -818,6 +818,8 @@ async function deleteProject(projectId) {
         });
         
         if (response.ok) {
+            // Deletion runs as a background job; refresh once it has finished
+            await waitForJob((await response.json()).status_url);
             await Modal.success('Project deleted successfully.');
             loadProjects();
             // Reload dashboard data to update statistics
@@ -285,6 +285,54 @@ async function loadAvailableProjects() {
     }
 }
 
+// Full-text search over available projects; an empty query shows the full list
+let searchRequestId = 0;
+
+async function searchAvailableProjects(query) {
+    const browseContainer = document.getElementById('browse-projects');
+    if (!browseContainer) return;
+
+    const requestId = ++searchRequestId;
+    if (!query.trim()) {
+        loadAvailableProjects();
+        return;
+    }
+
+    try {
+        const params = new URLSearchParams({ q: query, available: 'true', limit: '30' });
+        const response = await fetch(`/api/v1/projects/search?${params}`);
+        if (requestId !== searchRequestId) return;  // a newer search is in flight
+        if (response.status === 400) {
+            browseContainer.innerHTML = '<p class="text-gray-500 text-center py-6">Type a word to search.</p>';
+            return;
+        }
+        if (!response.ok) {
+            throw new Error('Failed to search projects');
+        }
+        const data = await response.json();
+        if (requestId !== searchRequestId) return;
+        // highlight.title is HTML-escaped with matches wrapped in <mark>
+        const projects = data.projects.map(p => ({ ...p, title: p.highlight?.title || p.title }));
+        browseContainer.innerHTML = projects.length
+            ? projects.map(project => renderProjectCard(project)).join('')
+            : '<p class="text-gray-500 text-center py-6">No projects match your search.</p>';
+    } catch (error) {
+        console.error(error);
+        browseContainer.innerHTML = '<p class="text-gray-500 text-center py-6">Search failed. Please try again later.</p>';
+    }
+}
+
+function initProjectSearch() {
+    const input = document.getElementById('browse-search');
+    if (!input) return;
+
+    let debounceTimer = null;
+    input.addEventListener('input', function () {
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(() => searchAvailableProjects(input.value), 250);
+    });
+}
+
 // Display name editing functionality
 let originalDisplayName = '';
 
@@ -419,6 +467,8 @@ document.addEventListener('DOMContentLoaded', function () {
     // Initialize delete account button
     initDeleteAccountButton();
 
+    initProjectSearch();
+
     fetchDashboardData().then(data => {
         if (data.error) {
             const dashboardContainers = [
@@ -3,7 +3,8 @@
  * Handles functionality for project detail page:
  * - Project registration
  * - Comment submission and replies
- * - Loading and displaying comments
+ * - Loading further pages of comment threads and replies
+ *   (the first page is rendered by the server)
  */
 
 // Get project metadata embedded in the HTML container (id, permissions, etc.)
@@ -164,8 +165,8 @@ function hideReplyBox(commentId) {
     }
 }
 
-// Add comment to DOM
-function addCommentToDOM(comment) {
+// Add comment to DOM (at the top for a new post, at the bottom when paging)
+function addCommentToDOM(comment, append = false) {
     const container = document.getElementById('comments-container');
     if (!container) return;
 
@@ -212,8 +213,12 @@ function addCommentToDOM(comment) {
         <div id="replies-${comment.id}" class="replies-container" style="margin-left: 1rem; margin-top: 0.5rem;"></div>
     `;
 
-    // Insert at the top
-    container.insertBefore(commentDiv, container.firstChild);
+    if (append) {
+        container.appendChild(commentDiv);
+    } else {
+        // Insert at the top
+        container.insertBefore(commentDiv, container.firstChild);
+    }
 }
 
 // Add reply to DOM
@@ -224,6 +229,10 @@ function addReplyToDOM(parentId, reply) {
     const replyDiv = document.createElement('div');
     replyDiv.className = 'reply-item';
     replyDiv.style.cssText = 'border-left: 2px solid #e5e7eb; padding-left: 0.75rem; padding-top: 0.5rem; padding-bottom: 0.5rem; margin-bottom: 0.5rem;';
+    // Nested replies are shown flat in thread order, indented by depth
+    if (reply.depth > 1) {
+        replyDiv.style.marginLeft = `${reply.depth - 1}rem`;
+    }
 
     replyDiv.innerHTML = `
         <div class="flex items-center gap-2 mb-1">
@@ -244,39 +253,89 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
-// Load comments
-async function loadComments(projectId) {
+// Render a "show more" button after a thread's replies, or remove it when the thread is exhausted
+function setMoreRepliesButton(commentId, cursor) {
+    const commentDiv = document.querySelector(`.comment-item[data-comment-id="${commentId}"]`);
+    if (!commentDiv) return;
+    let btn = commentDiv.querySelector('.btn-more-replies');
+    if (!cursor) {
+        if (btn) btn.remove();
+        return;
+    }
+    if (!btn) {
+        btn = document.createElement('button');
+        btn.className = 'btn-more-replies';
+        btn.textContent = 'Show more replies';
+        btn.style.cssText = 'background: none; border: none; color: var(--primary-green); cursor: pointer; padding: 0.25rem 0.5rem; margin-left: 1rem; font-size: 0.875rem;';
+        btn.addEventListener('click', () => loadMoreReplies(commentId, btn));
+        commentDiv.appendChild(btn);
+    }
+    btn.dataset.cursor = cursor;
+}
+
+// Load the next page of replies of a thread
+async function loadMoreReplies(commentId, btn) {
+    const cursor = btn?.dataset.cursor;
+    if (!cursor) return;
+    btn.disabled = true;
+    try {
+        const params = new URLSearchParams({ cursor });
+        const response = await fetch(`/api/v1/comments/${commentId}/replies?${params.toString()}`);
+        if (!response.ok) {
+            throw new Error('Failed to load replies');
+        }
+        const { replies, next_cursor } = await response.json();
+        replies.forEach(reply => addReplyToDOM(commentId, reply));
+        setMoreRepliesButton(commentId, next_cursor);
+    } catch (error) {
+        console.error('Error loading replies:', error);
+    } finally {
+        btn.disabled = false;
+    }
+}
+
+// Render the "load more comments" button for the next page of threads
+function setMoreCommentsButton(projectId, cursor) {
+    const wrapper = document.getElementById('comments-load-more');
+    if (!wrapper) return;
+    wrapper.innerHTML = '';
+    if (!cursor) return;
+    const btn = document.createElement('button');
+    btn.className = 'btn';
+    btn.textContent = 'Load more comments';
+    btn.addEventListener('click', () => loadComments(projectId, cursor));
+    wrapper.appendChild(btn);
+}
+
+// Load comments: a page of threads (with their first replies) appended after the
+// ones already shown; without a cursor the list is replaced by the first page
+async function loadComments(projectId, cursor = null) {
     try {
-        const response = await fetch(`/api/v1/projects/${projectId}/comments`);
+        const params = new URLSearchParams();
+        if (cursor) params.append('cursor', cursor);
+        const response = await fetch(`/api/v1/projects/${projectId}/comments?${params.toString()}`);
         if (!response.ok) {
             throw new Error('Failed to load comments');
         }
-        const comments = await response.json();
+        const { comments, next_cursor } = await response.json();
 
         const container = document.getElementById('comments-container');
         if (!container) return;
 
-        // Clear existing comments (keep the structure)
-        container.innerHTML = '';
-
-        if (comments.length === 0) {
-            container.innerHTML = '<p class="text-gray-500 text-center py-4">No comments yet. Be the first to ask a question!</p>';
-            return;
+        if (!cursor) {
+            container.innerHTML = '';
+            if (comments.length === 0) {
+                container.innerHTML = '<p class="text-gray-500 text-center py-4">No comments yet. Be the first to ask a question!</p>';
+            }
         }
 
-        // Render comments with replies
+        // Render threads with their inline replies
         comments.forEach(comment => {
-            addCommentToDOM(comment);
-            // Render replies if any
-            if (comment.replies && comment.replies.length > 0) {
-                const repliesContainer = document.getElementById(`replies-${comment.id}`);
-                if (repliesContainer) {
-                    comment.replies.forEach(reply => {
-                        addReplyToDOM(comment.id, reply);
-                    });
-                }
-            }
+            addCommentToDOM(comment, true);
+            (comment.replies || []).forEach(reply => addReplyToDOM(comment.id, reply));
+            setMoreRepliesButton(comment.id, comment.replies_next_cursor);
         });
+        setMoreCommentsButton(projectId, next_cursor);
     } catch (error) {
         console.error('Error loading comments:', error);
     }
@@ -287,9 +346,6 @@ document.addEventListener('DOMContentLoaded', function () {
     const projectData = getProjectData();
     
     if (projectData.projectId) {
-        // Load comments
-        loadComments(projectData.projectId);
-        
         // Set up register button click handler if it exists
         const registerBtn = document.getElementById('register-btn');
         if (registerBtn && !registerBtn.disabled && registerBtn.onclick === null) {
@@ -306,3 +362,5 @@ window.submitComment = submitComment;
 window.submitReply = submitReply;
 window.showReplyBox = showReplyBox;
 window.hideReplyBox = hideReplyBox;
+window.loadComments = loadComments;
+window.loadMoreReplies = loadMoreReplies;
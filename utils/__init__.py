@@ -3,16 +3,20 @@
 Currently exports:
 - require_user_type: decorator to enforce a specific Flask-Login user_type
 - generate_excel_from_records: helper to create an Excel export for volunteer records
+- stream_volunteer_records_excel: SQL-filtered, constant-memory Excel export
+- encode_cursor / decode_cursor: opaque keyset pagination cursors
+- parse_year: validated year filter for record queries
 """
 from flask import request, jsonify
 from flask_login import login_required, current_user
 from functools import wraps
-from datetime import datetime
-from io import BytesIO
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from datetime import date, datetime
+import base64
+import json
+import tempfile
+from sqlalchemy.orm import aliased
 
-from models import VolunteerRecord
+from models import db, User, Project, VolunteerRecord
 
 
 def require_user_type(user_type):
@@ -31,78 +35,196 @@ def require_user_type(user_type):
     return decorator
 
 
-def generate_excel_from_records(records, filename_prefix="volunteer_records", user_display_name=None):
-    """Helper function to generate an Excel workbook from a list of VolunteerRecord rows."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Volunteer Records"
-    
+def encode_cursor(*values):
+    """Encode the sort key of the last row of a page into an opaque cursor string.
+
+    Dates and datetimes are stored as ISO strings; callers decode them back
+    with `decode_cursor` and parse the values they expect.
+    """
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by `encode_cursor`.
+
+    Returns a list with `size` values, or None if the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+# Year filters become the range [year-01-01, year+1-01-01), which datetime must hold
+MIN_FILTER_YEAR = 1
+MAX_FILTER_YEAR = 9998
+
+
+def parse_year(value):
+    """Parse an optional year filter; None when empty. Raises ValueError if malformed or out of range."""
+    if not value:
+        return None
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid year')
+    if not MIN_FILTER_YEAR <= year <= MAX_FILTER_YEAR:
+        raise ValueError('Invalid year')
+    return year
+
+
+# Excel export layout, shared by every volunteer record export
+EXPORT_HEADERS = ['Project Name', 'Category', 'Organization', 'Date', 'Certified Hours', 'Points Earned', 'Status']
+EXPORT_COLUMN_WIDTHS = [30, 15, 25, 12, 15, 15, 12]
+RECORD_STATUS_DISPLAY = {
+    'approved': 'Certified',
+    'pending': 'Pending',
+    'rejected': 'Rejected'
+}
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Exports larger than this spill from memory to a temporary file on disk
+EXPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Rows fetched from the database per round trip while streaming an export
+EXPORT_FETCH_SIZE = 2000
+
+
+def volunteer_record_export_query(user_id, year=None, category=None):
+    """Build the export SELECT for a user's records, with year/category filters applied in SQL.
+
+    Project and organization columns are joined into the same statement, so
+    no ORM objects or lazy loads are involved. Rows are
+    (title, category, org display_name, org username, completed_at, hours, points, status).
+    """
+    organization = aliased(User)
+    stmt = (
+        db.select(
+            Project.title,
+            Project.category,
+            organization.display_name,
+            organization.username,
+            VolunteerRecord.completed_at,
+            VolunteerRecord.hours,
+            VolunteerRecord.points,
+            VolunteerRecord.status,
+        )
+        .select_from(VolunteerRecord)
+        .outerjoin(Project, Project.id == VolunteerRecord.project_id)
+        .outerjoin(organization, organization.id == Project.organization_id)
+        .where(VolunteerRecord.user_id == user_id)
+    )
+    if year:
+        # Half-open range keeps the predicate sargable
+        stmt = stmt.where(
+            VolunteerRecord.completed_at >= datetime(year, 1, 1),
+            VolunteerRecord.completed_at < datetime(year + 1, 1, 1),
+        )
+    if category:
+        stmt = stmt.where(Project.category == category)
+    return stmt.order_by(VolunteerRecord.completed_at.desc(), VolunteerRecord.id.desc())
+
+
+def write_records_excel(rows, output):
+    """Write export rows to `output` using openpyxl's write-only mode.
+
+    `rows` is any iterable of tuples shaped like `volunteer_record_export_query`
+    rows; it is consumed lazily, so memory stays flat regardless of row count.
+    """
+    # openpyxl is only imported by the first export, not at app startup
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Volunteer Records")
+
+    # Column widths must be set before any row is written in write-only mode
+    for col_idx, width in enumerate(EXPORT_COLUMN_WIDTHS, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
     # Header row
-    headers = ['Project Name', 'Category', 'Organization', 'Date', 'Certified Hours', 'Points Earned', 'Status']
     header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
     header_font = Font(bold=True, color="FFFFFF")
-    
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
+    header_alignment = Alignment(horizontal='center', vertical='center')
+    header_cells = []
+    for header in EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.fill = header_fill
         cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center')
-    
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
+
     # Data rows
-    for row_idx, record in enumerate(records, start=2):
-        project = record.project
-        organization = project.organization if project else None
-        
-        ws.cell(row=row_idx, column=1, value=project.title if project else 'Unknown Project')
-        ws.cell(row=row_idx, column=2, value=project.category if project else 'N/A')
-        ws.cell(row=row_idx, column=3, value=organization.display_name or organization.username if organization else 'Unknown Organization')
-        ws.cell(row=row_idx, column=4, value=record.completed_at.strftime('%Y-%m-%d') if record.completed_at else 'N/A')
-        ws.cell(row=row_idx, column=5, value=record.hours)
-        ws.cell(row=row_idx, column=6, value=record.points)
-        
-        # Status mapping
-        status_display = {
-            'approved': 'Certified',
-            'pending': 'Pending',
-            'rejected': 'Rejected'
-        }
-        ws.cell(row=row_idx, column=7, value=status_display.get(record.status, record.status))
-    
-    # Auto-adjust column widths
-    column_widths = [30, 15, 25, 12, 15, 15, 12]
-    for col_idx, width in enumerate(column_widths, start=1):
-        ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = width
-    
-    # Save to BytesIO
-    output = BytesIO()
+    for title, category, org_display_name, org_username, completed_at, hours, points, status in rows:
+        ws.append([
+            title if title is not None else 'Unknown Project',
+            category if title is not None else 'N/A',
+            org_display_name or org_username or 'Unknown Organization',
+            completed_at.strftime('%Y-%m-%d') if completed_at else 'N/A',
+            hours,
+            points,
+            RECORD_STATUS_DISPLAY.get(status, status),
+        ])
+
     wb.save(output)
     output.seek(0)
-    
-    # Generate filename with user display_name at the front
+    return output
+
+
+def export_filename(filename_prefix, user_display_name=None):
+    """Build a timestamped .xlsx download name, prefixed with the sanitized user name if given."""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     if user_display_name:
         # Sanitize display_name for filename (remove invalid characters)
         safe_name = "".join(c for c in user_display_name if c.isalnum() or c in (' ', '-', '_')).strip()
         safe_name = safe_name.replace(' ', '_')
-        filename = f"{safe_name}_{filename_prefix}_{timestamp}.xlsx"
-    else:
-        filename = f"{filename_prefix}_{timestamp}.xlsx"
-    
-    return output, filename
-
-
-
-
-
-
-
-
-
-
-
-
+        return f"{safe_name}_{filename_prefix}_{timestamp}.xlsx"
+    return f"{filename_prefix}_{timestamp}.xlsx"
 
 
+def stream_volunteer_records_excel(user_id, filename_prefix="volunteer_records", user_display_name=None,
+                                   year=None, category=None):
+    """Export a user's volunteer records straight from SQL into a spooled .xlsx file.
 
+    Rows are streamed from the database in batches and written through a
+    write-only workbook into a SpooledTemporaryFile, so peak memory does not
+    grow with the number of records. Returns (file object, filename).
+    """
+    stmt = volunteer_record_export_query(user_id, year=year, category=category)
+    rows = db.session.execute(stmt.execution_options(yield_per=EXPORT_FETCH_SIZE))
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    write_records_excel(rows, output)
+    return output, export_filename(filename_prefix, user_display_name)
 
 
+def generate_excel_from_records(records, filename_prefix="volunteer_records", user_display_name=None):
+    """Helper function to generate an Excel workbook from a list of VolunteerRecord rows.
+
+    Prefer `stream_volunteer_records_excel` when the records can be selected in SQL.
+    """
+    def _rows():
+        for record in records:
+            project = record.project
+            organization = project.organization if project else None
+            yield (
+                project.title if project else None,
+                project.category if project else None,
+                organization.display_name if organization else None,
+                organization.username if organization else None,
+                record.completed_at,
+                record.hours,
+                record.points,
+                record.status,
+            )
+
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES)
+    write_records_excel(_rows(), output)
+    return output, export_filename(filename_prefix, user_display_name)
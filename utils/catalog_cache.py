@@ -0,0 +1,66 @@
+"""Shared cache for the public project catalog (GET /api/v1/projects).
+
+Each entry holds one serialized, user-independent page of the project
+list (the whole list for requests without `limit`), keyed by the query
+parameters, page size and cursor, and tagged with the catalog version it
+was built under. Project and registration writes bump catalog_version, a
+cross-process VersionStamp, so entries from older versions are never
+served again. Only one thread builds a given key at a time; the others
+wait for its result instead of running the same query. Per-user fields
+are overlaid by the caller after the lookup.
+"""
+import threading
+from collections import OrderedDict
+
+from utils.version_stamp import VersionStamp
+
+catalog_version = VersionStamp()
+
+
+class CatalogCache:
+    """Thread-safe LRU of key -> (version, value) with per-key build coalescing."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._building = {}  # key -> lock held by the thread building it
+
+    def _lookup(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry
+        return None
+
+    def get_or_build(self, key, builder):
+        """Return (version, value) for key, calling builder() on a miss or a stale entry."""
+        # Read the version before building so a concurrent bump makes the result stale
+        entry = self._lookup(key, catalog_version.current())
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            # Whoever held the lock may have just built it
+            version = catalog_version.current()
+            entry = self._lookup(key, version)
+            if entry is not None:
+                return entry
+            entry = (version, builder())
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                self._building.pop(key, None)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+catalog_cache = CatalogCache()
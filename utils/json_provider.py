@@ -0,0 +1,88 @@
+"""Flask JSON provider with an optional orjson backend.
+
+Flask's default provider sorts the keys of every dict and encodes through
+the standard library. This provider keeps keys in insertion order (the
+order the serializers in utils.serializers declare them) and, when orjson
+is installed, encodes responses with it straight to bytes. Dates keep
+Flask's HTTP-date format, so payloads are the same with either backend.
+
+The backend is picked with the JSON_BACKEND setting: 'auto' (orjson when
+importable, otherwise the standard library), 'orjson' or 'json'.
+"""
+from time import perf_counter
+
+from flask.json.provider import DefaultJSONProvider
+
+from utils.request_stats import add_serialize_time
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+if orjson is not None:
+    # Dates and dataclasses go through Flask's default() like with the json module
+    _ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """DefaultJSONProvider without key sorting, encoding with orjson when available."""
+
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = app.config.get('JSON_BACKEND', 'auto')
+        if backend not in BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of {', '.join(BACKENDS)}")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError('JSON_BACKEND is orjson but orjson is not installed')
+        self.backend = 'orjson' if orjson is not None and backend != 'json' else 'json'
+
+    def _orjson_option(self, kwargs):
+        """orjson options for json.dumps-style kwargs, or None if orjson cannot honour them."""
+        option = _ORJSON_OPTIONS
+        for key, value in kwargs.items():
+            if key == 'indent' and value:
+                option |= orjson.OPT_INDENT_2
+            elif key == 'sort_keys' and value:
+                option |= orjson.OPT_SORT_KEYS
+            elif key not in ('indent', 'sort_keys', 'separators', 'default'):
+                return None
+        return option
+
+    def dumps(self, obj, **kwargs):
+        option = self._orjson_option(kwargs) if self.backend == 'orjson' else None
+        if option is None:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # Encoding time is reported as `serialize` in the Server-Timing header
+        started = perf_counter()
+        try:
+            return self._response(*args, **kwargs)
+        finally:
+            add_serialize_time(perf_counter() - started)
+
+    def _response(self, *args, **kwargs):
+        if self.backend != 'orjson':
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        option = _ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
@@ -0,0 +1,405 @@
+"""Precomputed participant leaderboards.
+
+Participants are ranked by approved points, then approved hours, then user
+id (newest account first on a full tie, so places are never shared). Every
+approved record counts on four boards: overall, its project's category, the
+month of its completed_at, and that category within that month. Boards are
+stored in `leaderboard_entry` (see LeaderboardEntry) with each row's place
+on its board, so reads never aggregate:
+
+- the top K are a range of ix_leaderboard_entry_position (later pages
+  continue from a score cursor through ix_leaderboard_entry_score),
+- "my rank" is a primary-key read,
+- the board size is the last entry of ix_leaderboard_entry_position.
+
+Writers pay instead. A participant whose score changes is re-placed by
+seeking their new neighbours in ix_leaderboard_entry_score and shifting
+only the entries between the old and the new place by one. Boards touched
+by many changes at once are renumbered in one statement instead.
+
+Record status changes call add_approved_records() in their transaction;
+purges call sync_users() per chunk. Month boards are kept for
+LEADERBOARD_MONTHS months; `flask refresh-leaderboard` prunes older ones
+at period boundaries and rebuilds the current and previous month.
+"""
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, literal, tuple_, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, LeaderboardEntry, Project, User, VolunteerRecord, VolunteerRecordStatus
+
+# Board key meaning "all categories" / "all time"
+ALL = ''
+DEFAULT_LEADERBOARD_MONTHS = 12
+# Boards with more changes than this in one call are renumbered in a single
+# statement rather than shifted entry by entry
+RENUMBER_MIN_CHANGES = 100
+
+_entry = LeaderboardEntry
+_record_period = func.strftime('%Y-%m', VolunteerRecord.completed_at)
+
+
+def period_of(when):
+    """Month board key ('YYYY-MM') for a date or datetime."""
+    return when.strftime('%Y-%m')
+
+
+def first_retained_period(today=None):
+    """Oldest month whose board is kept."""
+    today = today or datetime.utcnow().date()
+    months = current_app.config.get('LEADERBOARD_MONTHS', DEFAULT_LEADERBOARD_MONTHS)
+    index = today.year * 12 + today.month - 1 - (months - 1)
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def _on_board(category, period):
+    return db.and_(_entry.category == category, _entry.period == period)
+
+
+def _order():
+    return (_entry.points.desc(), _entry.hours.desc(), _entry.user_id.desc())
+
+
+def _neighbour_position(category, period, user_id, points, hours, ahead):
+    """Position of the nearest entry ahead of (or behind) the given score, other than user_id."""
+    score = tuple_(_entry.points, _entry.hours, _entry.user_id)
+    key = tuple_(points, hours, user_id)
+    stmt = db.select(_entry.position).where(_on_board(category, period), _entry.user_id != user_id)
+    if ahead:
+        stmt = stmt.where(score > key).order_by(_entry.points, _entry.hours, _entry.user_id)
+    else:
+        stmt = stmt.where(score < key).order_by(*_order())
+    return db.session.execute(stmt.limit(1)).scalar()
+
+
+def _shift(category, period, low, high, step):
+    """Move entries placed low..high (inclusive; high=None for the end of the board) by step."""
+    stmt = db.update(_entry).where(_on_board(category, period), _entry.position >= low)
+    if high is not None:
+        stmt = stmt.where(_entry.position <= high)
+    db.session.execute(
+        stmt.values(position=_entry.position + step),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def _set_position(category, period, user_id, position):
+    db.session.execute(
+        db.update(_entry)
+        .where(_on_board(category, period), _entry.user_id == user_id)
+        .values(position=position),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def _add_scores(category, period, user_id, points, hours, records):
+    """Add to an entry's totals, creating it unplaced (position 0) if missing.
+
+    Returns (points, hours, records, position) after the change; position
+    is the entry's place before it.
+    """
+    stmt = sqlite_insert(_entry).values(
+        category=category, period=period, user_id=user_id,
+        points=points, hours=func.round(hours, 2), records=records, position=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_entry.category, _entry.period, _entry.user_id],
+        set_={
+            'points': _entry.points + stmt.excluded.points,
+            'hours': func.round(_entry.hours + stmt.excluded.hours, 2),
+            'records': _entry.records + stmt.excluded.records,
+        },
+    ).returning(_entry.points, _entry.hours, _entry.records, _entry.position)
+    return db.session.execute(stmt).one()
+
+
+def _move(category, period, user_id, points, hours, records):
+    """Apply a score change to one entry and re-place it, shifting only the entries it passes."""
+    points, hours, records, old = _add_scores(category, period, user_id, points, hours, records)
+    if records <= 0:
+        db.session.execute(
+            db.delete(_entry).where(_on_board(category, period), _entry.user_id == user_id),
+            execution_options={'synchronize_session': False},
+        )
+        if old:
+            _shift(category, period, old + 1, None, -1)
+        return
+
+    behind = _neighbour_position(category, period, user_id, points, hours, ahead=False)
+    if not old:
+        if behind is None:
+            last = db.session.execute(
+                db.select(func.max(_entry.position)).where(_on_board(category, period))
+            ).scalar()
+            new = (last or 0) + 1
+        else:
+            new = behind
+            _shift(category, period, new, None, 1)
+    elif behind is not None and behind < old:
+        # Moved up past the entries placed behind..old-1
+        new = behind
+        _shift(category, period, new, old - 1, 1)
+    else:
+        ahead = _neighbour_position(category, period, user_id, points, hours, ahead=True)
+        if ahead is None or ahead <= old:
+            return
+        # Moved down past the entries placed old+1..ahead
+        new = ahead
+        _shift(category, period, old + 1, new, -1)
+    _set_position(category, period, user_id, new)
+
+
+def renumber(category, period):
+    """Recompute every position on one board in a single statement. Does not commit."""
+    ranked = (
+        db.select(_entry.user_id, func.row_number().over(order_by=_order()).label('position'))
+        .where(_on_board(category, period))
+        .subquery()
+    )
+    db.session.execute(
+        db.update(_entry)
+        .where(_on_board(category, period), _entry.user_id == ranked.c.user_id)
+        .values(position=ranked.c.position),
+        execution_options={'synchronize_session': False},
+    )
+
+
+def _apply(changes):
+    """Apply {(category, period, user_id): [points, hours, records]} score deltas."""
+    boards = {}
+    for (category, period, user_id), delta in changes.items():
+        points, hours, records = delta
+        # Hour sums carry float noise; stored hours are rounded to 2 places
+        if points or records or abs(hours) >= 0.005:
+            boards.setdefault((category, period), []).append((user_id, delta))
+    for (category, period), deltas in boards.items():
+        if len(deltas) < RENUMBER_MIN_CHANGES:
+            for user_id, (points, hours, records) in deltas:
+                _move(category, period, user_id, points, hours, records)
+            continue
+        for user_id, (points, hours, records) in deltas:
+            _add_scores(category, period, user_id, points, hours, records)
+        db.session.execute(
+            db.delete(_entry).where(_on_board(category, period), _entry.records <= 0),
+            execution_options={'synchronize_session': False},
+        )
+        renumber(category, period)
+
+
+def _boards_of(category, period, first_period):
+    """The four boards a record in category/period counts on; expired months excluded."""
+    boards = [(ALL, ALL), (category, ALL)]
+    if period is not None and period >= first_period:
+        boards += [(ALL, period), (category, period)]
+    return boards
+
+
+def _record_totals(record_filter):
+    """(user_id, category, period, points, hours, records) sums over the selected records."""
+    return db.session.execute(
+        db.select(
+            VolunteerRecord.user_id,
+            Project.category,
+            _record_period,
+            func.sum(VolunteerRecord.points),
+            func.sum(VolunteerRecord.hours),
+            func.count(VolunteerRecord.id),
+        )
+        .join(Project, Project.id == VolunteerRecord.project_id)
+        .where(record_filter)
+        .group_by(VolunteerRecord.user_id, Project.category, _record_period)
+    ).all()
+
+
+def add_approved_records(record_filter, sign=1):
+    """Add (sign=1) or remove (sign=-1) the selected records on every board they count on.
+
+    Like UserStats.add_approved_records: call before the status change, with
+    record_filter selecting the records that enter (or leave) the approved
+    status. Does not commit.
+    """
+    first_period = first_retained_period()
+    changes = {}
+    for user_id, category, period, points, hours, records in _record_totals(record_filter):
+        for board in _boards_of(category, period, first_period):
+            delta = changes.setdefault((*board, user_id), [0, 0.0, 0])
+            delta[0] += sign * points
+            delta[1] += sign * hours
+            delta[2] += sign * records
+    _apply(changes)
+
+
+def sync_users(user_ids):
+    """Bring the given participants' entries in line with their approved records.
+
+    Used after bulk deletes, where the removed records can no longer be
+    summed. Does not commit.
+    """
+    user_ids = list(user_ids)
+    first_period = first_retained_period()
+    changes = {}
+    for user_id, category, period, points, hours, records in _record_totals(db.and_(
+        VolunteerRecord.user_id.in_(user_ids),
+        VolunteerRecord.status == VolunteerRecordStatus.APPROVED.value,
+    )):
+        for board in _boards_of(category, period, first_period):
+            delta = changes.setdefault((*board, user_id), [0, 0.0, 0])
+            delta[0] += points
+            delta[1] += hours
+            delta[2] += records
+    stored = db.session.execute(
+        db.select(_entry.category, _entry.period, _entry.user_id, _entry.points, _entry.hours, _entry.records)
+        .where(_entry.user_id.in_(user_ids))
+    ).all()
+    for category, period, user_id, points, hours, records in stored:
+        delta = changes.setdefault((category, period, user_id), [0, 0.0, 0])
+        delta[0] -= points
+        delta[1] -= hours
+        delta[2] -= records
+    _apply(changes)
+
+
+def _ranked_scores(first_period, periods=None):
+    """SELECT of every board's entries computed from approved records, with positions."""
+    base = (
+        db.select(
+            VolunteerRecord.user_id,
+            Project.category.label('category'),
+            _record_period.label('period'),
+            VolunteerRecord.points,
+            VolunteerRecord.hours,
+            VolunteerRecord.id,
+        )
+        .join(Project, Project.id == VolunteerRecord.project_id)
+        .where(VolunteerRecord.status == VolunteerRecordStatus.APPROVED.value)
+    )
+    if periods is not None:
+        base = base.where(_record_period.in_(periods))
+    base = base.subquery()
+
+    parts = []
+    for by_category in (False, True):
+        for by_period in (False, True):
+            if periods is not None and not by_period:
+                continue
+            category = base.c.category if by_category else literal(ALL)
+            period = base.c.period if by_period else literal(ALL)
+            part = db.select(
+                category.label('category'),
+                period.label('period'),
+                base.c.user_id,
+                func.sum(base.c.points).label('points'),
+                func.round(func.sum(base.c.hours), 2).label('hours'),
+                func.count(base.c.id).label('records'),
+            ).group_by(base.c.user_id)
+            if by_category:
+                part = part.group_by(base.c.category)
+            if by_period:
+                part = part.group_by(base.c.period).where(base.c.period >= first_period)
+            parts.append(part)
+    scores = union_all(*parts).subquery()
+    return db.select(
+        scores.c.category,
+        scores.c.period,
+        scores.c.user_id,
+        scores.c.points,
+        scores.c.hours,
+        scores.c.records,
+        func.row_number().over(
+            partition_by=(scores.c.category, scores.c.period),
+            order_by=(scores.c.points.desc(), scores.c.hours.desc(), scores.c.user_id.desc()),
+        ).label('position'),
+    )
+
+
+def rebuild(periods=None):
+    """Recompute boards from the volunteer records: all of them, or only those of the given months.
+
+    Does not commit. Returns the number of entries written.
+    """
+    first_period = first_retained_period()
+    clear = db.delete(_entry)
+    if periods is not None:
+        periods = list(periods)
+        clear = clear.where(_entry.period.in_(periods))
+    db.session.execute(clear, execution_options={'synchronize_session': False})
+    columns = ['category', 'period', 'user_id', 'points', 'hours', 'records', 'position']
+    return db.session.execute(
+        db.insert(_entry).from_select(columns, _ranked_scores(first_period, periods))
+    ).rowcount
+
+
+def prune(first_period=None):
+    """Delete month boards older than first_period (default: the retention window). Does not commit."""
+    first_period = first_period or first_retained_period()
+    return db.session.execute(
+        db.delete(_entry).where(_entry.period != ALL, _entry.period < first_period),
+        execution_options={'synchronize_session': False},
+    ).rowcount
+
+
+def drift():
+    """Return sorted (board key, stored, actual) for entries that disagree with the records.
+
+    Keys are (category, period, user_id); stored/actual are
+    (points, hours, records, position) or None when the entry is missing.
+    Month boards older than the retention window are not compared.
+    """
+    first_period = first_retained_period()
+    actual = {
+        (category, period, user_id): (points, hours, records, position)
+        for category, period, user_id, points, hours, records, position
+        in db.session.execute(_ranked_scores(first_period))
+    }
+    stored = {
+        (category, period, user_id): (points, hours, records, position)
+        for category, period, user_id, points, hours, records, position in db.session.execute(
+            db.select(
+                _entry.category, _entry.period, _entry.user_id,
+                _entry.points, _entry.hours, _entry.records, _entry.position,
+            ).where(db.or_(_entry.period == ALL, _entry.period >= first_period))
+        )
+    }
+    drifted = []
+    for key in sorted(actual.keys() | stored.keys()):
+        have, want = stored.get(key), actual.get(key)
+        if (
+            have is None or want is None
+            or have[0] != want[0] or abs(have[1] - want[1]) > 1e-6
+            or have[2] != want[2] or have[3] != want[3]
+        ):
+            drifted.append((key, have, want))
+    return drifted
+
+
+def top(category, period, limit, after=None):
+    """One page of a board, best first: [(entry, display name)].
+
+    after is the (points, hours, user_id) of the last entry of the previous
+    page; a score cursor stays valid while entries move between pages.
+    """
+    stmt = (
+        db.select(_entry, func.coalesce(User.display_name, User.username))
+        .join(User, User.id == _entry.user_id)
+        .where(_on_board(category, period))
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(_entry.points, _entry.hours, _entry.user_id) < tuple_(*after))
+        stmt = stmt.order_by(*_order())
+    else:
+        stmt = stmt.order_by(_entry.position)
+    return db.session.execute(stmt.limit(limit)).all()
+
+
+def entry_of(category, period, user_id):
+    """The participant's entry on a board, or None if they have no approved records there."""
+    return db.session.get(_entry, (category, period, user_id))
+
+
+def board_size(category, period):
+    """Number of participants on a board."""
+    return db.session.execute(
+        db.select(func.max(_entry.position)).where(_on_board(category, period))
+    ).scalar() or 0
@@ -0,0 +1,193 @@
+"""Indexed, rotation-aware reader for the application log (admin log viewer).
+
+The reader keeps, per log file, the byte offset of every line start and the
+line numbers of each log level. Indexes are built once and then extended
+incrementally as the file grows, and are keyed by inode so they survive
+RotatingFileHandler renaming app.log to app.log.1 and so on. The active
+file and its backups are paged newest-first as one continuous stream. A
+page is served by seeking straight to the indexed offsets counted back from
+the end of the stream, so its cost depends on the page size, not the log size.
+"""
+import os
+import re
+import threading
+from array import array
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Matches the handler format '%(asctime)s %(levelname)s: ...' configured in create_app
+_LEVEL_RE = re.compile(rb'\S+ \S+ (DEBUG|INFO|WARNING|ERROR|CRITICAL): ')
+_BLOCK_SIZE = 64 * 1024
+# Leading bytes remembered per file to detect truncation or inode reuse
+_HEAD_SIZE = 64
+
+
+class _FileIndex:
+    """Line-start offsets and per-level line numbers for one log file."""
+
+    def __init__(self, head):
+        self.head = head
+        self.offsets = array('q')  # start offset of every complete line
+        self.end = 0  # offset just past the last complete (newline-terminated) line
+        self.levels = {level: array('q') for level in LEVELS}
+        self.current_level = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def extend(self, f, size):
+        """Index the complete lines between self.end and size, reading forward in blocks."""
+        f.seek(self.end)
+        base = self.end
+        remaining = size - self.end
+        buf = b''
+        while remaining > 0:
+            block = f.read(min(_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            buf += block
+            start = 0
+            while True:
+                newline = buf.find(b'\n', start)
+                if newline < 0:
+                    break
+                self._add_line(base + start, buf, start)
+                start = newline + 1
+            buf = buf[start:]
+            base += start
+        # An unterminated trailing line is left for the next extend()
+        self.end = base
+
+    def _add_line(self, offset, buf, start):
+        line_no = len(self.offsets)
+        self.offsets.append(offset)
+        match = _LEVEL_RE.match(buf, start)
+        if match:
+            self.current_level = match.group(1).decode('ascii')
+        # Continuation lines (e.g. tracebacks) belong to the record that started them
+        if self.current_level:
+            self.levels[self.current_level].append(line_no)
+
+    def line_span(self, line_no):
+        """Return (start, stop) byte offsets of a line."""
+        stop = self.offsets[line_no + 1] if line_no + 1 < len(self.offsets) else self.end
+        return self.offsets[line_no], stop
+
+
+class LogReader:
+    """Pages the active log file and its rotated backups newest-first."""
+
+    def __init__(self, path, backup_count=0):
+        self.path = path
+        self.backup_count = backup_count
+        self._indexes = {}  # (st_dev, st_ino) -> _FileIndex
+        self._lock = threading.Lock()
+
+    def _paths(self):
+        """Active file first, then backups from newest (.1) to oldest."""
+        return [self.path] + [f'{self.path}.{i}' for i in range(1, self.backup_count + 1)]
+
+    def _open_indexed(self):
+        """Open every existing log file and bring its index up to date.
+
+        Returns [(file, index)] newest file first. Files stay open so a
+        rotation during the read cannot swap contents underneath the index.
+        """
+        opened = []
+        live_keys = set()
+        for path in self._paths():
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            stat = os.fstat(f.fileno())
+            key = (stat.st_dev, stat.st_ino)
+            head = f.read(_HEAD_SIZE)
+            index = self._indexes.get(key)
+            if index is None or stat.st_size < index.end or not head.startswith(index.head[:len(head)]):
+                # New, truncated or recycled inode: index from scratch
+                index = _FileIndex(head)
+                self._indexes[key] = index
+            elif len(index.head) < _HEAD_SIZE:
+                index.head = head
+            if stat.st_size > index.end:
+                index.extend(f, stat.st_size)
+            live_keys.add(key)
+            opened.append((f, index))
+
+        # Forget files that rotated out past backup_count
+        for key in list(self._indexes):
+            if key not in live_keys:
+                del self._indexes[key]
+        return opened
+
+    def page(self, page=1, page_size=100, level=None):
+        """Return one newest-first page of log lines, optionally restricted to a level."""
+        with self._lock:
+            opened = self._open_indexed()
+            try:
+                return self._read_page(opened, page, page_size, level)
+            finally:
+                for f, _ in opened:
+                    f.close()
+
+    def _read_page(self, opened, page, page_size, level):
+        selections = [index.levels[level] if level else None for _, index in opened]
+        sizes = [len(sel) if sel is not None else len(index) for sel, (_, index) in zip(selections, opened)]
+        total = sum(sizes)
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 1
+        page = min(max(page, 1), total_pages)
+
+        # Position of the first requested line in the newest-first stream
+        skip = (page - 1) * page_size
+        wanted = page_size
+        lines = []
+        for (f, index), selection, size in zip(opened, selections, sizes):
+            if wanted <= 0:
+                break
+            if skip >= size:
+                skip -= size
+                continue
+            # Newest-first positions skip .. skip+take-1 map to these ascending line numbers
+            take = min(wanted, size - skip)
+            first = size - skip - take
+            last = size - skip - 1
+            if selection is None:
+                # Contiguous run: one seek and one read
+                start, _ = index.line_span(first)
+                _, stop = index.line_span(last)
+                f.seek(start)
+                chunk = f.read(stop - start)
+                run = [line + b'\n' for line in chunk.split(b'\n')[:-1]]
+                lines.extend(line.decode('utf-8', errors='ignore') for line in reversed(run))
+            else:
+                for pos in range(last, first - 1, -1):
+                    start, stop = index.line_span(selection[pos])
+                    f.seek(start)
+                    lines.append(f.read(stop - start).decode('utf-8', errors='ignore'))
+            wanted -= take
+            skip = 0
+
+        return {
+            'logs': lines,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': total_pages,
+            'original_total_lines': sum(len(index) for _, index in opened),
+        }
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def get_log_reader(path, backup_count=0):
+    """Return the process-wide LogReader for path, so its index is reused across requests."""
+    with _readers_lock:
+        reader = _readers.get(path)
+        if reader is None or reader.backup_count != backup_count:
+            reader = LogReader(path, backup_count)
+            _readers[path] = reader
+        return reader
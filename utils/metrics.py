@@ -0,0 +1,447 @@
+"""Process-shared metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and fixed-bucket histograms are declared once at import
+time on the module-level `metrics` registry. Each worker process writes its
+values to its own memory-mapped file in METRICS_DIR (no cross-process locks
+on the hot path); GET /metrics reads every file in the directory and sums
+them, so a scrape sees the totals of all gunicorn workers on the host.
+
+Counters and histograms of workers that have exited are kept, so totals
+never go backwards: a starting worker folds the files of dead processes
+(including one left under its own, reused PID) into archive.db under an
+exclusive lock. Gauges (in-flight requests) only
+count live processes. Without a directory (before configure(), or on
+platforms without fcntl for the compaction lock) values stay in-process.
+"""
+import glob
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: no compaction, one process per directory assumed
+    fcntl = None
+
+from flask import g, request
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+_HEADER = struct.Struct('i')
+_KEY_LEN = struct.Struct('i')
+_VALUE = struct.Struct('d')
+_INITIAL_FILE_SIZE = 64 * 1024
+_FILE_RE = re.compile(r'^values_(\d+)\.db$')
+ARCHIVE_FILE = 'archive.db'
+
+
+def _encode_key(key):
+    return json.dumps(key, separators=(',', ':')).encode('utf-8')
+
+
+def _read_values(path):
+    """{key: value} from a value file written by _MmapValues; {} if it is missing or empty."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return {}
+    if len(data) < _HEADER.size:
+        return {}
+    used = _HEADER.unpack_from(data, 0)[0]
+    values = {}
+    pos = 8
+    while pos < used:
+        key_len = _KEY_LEN.unpack_from(data, pos)[0]
+        key_end = pos + _KEY_LEN.size + key_len
+        value_pos = (key_end + 7) & ~7
+        name, labels = json.loads(data[pos + _KEY_LEN.size:key_end])
+        values[(name, tuple(labels))] = _VALUE.unpack_from(data, value_pos)[0]
+        pos = value_pos + _VALUE.size
+    return values
+
+
+class _LocalValues:
+    """In-process values, used until the registry has a directory."""
+
+    def __init__(self):
+        self._values = {}
+
+    def inc(self, key, amount):
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        self._values[key] = value
+
+    def read(self):
+        return dict(self._values)
+
+
+class _MmapValues:
+    """Append-only key -> float64 map in a memory-mapped file owned by one process.
+
+    Layout: a 4-byte 'used' header (padded to 8), then entries of
+    [key length][JSON key][padding to 8][value]. An entry is written before
+    the header is advanced, so readers never see a partial entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = {}
+        self._file = open(path, 'w+b')
+        self._file.truncate(_INITIAL_FILE_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), _INITIAL_FILE_SIZE)
+        self._used = 8
+        _HEADER.pack_into(self._map, 0, self._used)
+
+    def _offset(self, key):
+        offset = self._offsets.get(key)
+        if offset is None:
+            encoded = _encode_key(key)
+            value_pos = (self._used + _KEY_LEN.size + len(encoded) + 7) & ~7
+            end = value_pos + _VALUE.size
+            if end > len(self._map):
+                size = len(self._map)
+                while end > size:
+                    size *= 2
+                self._map.close()
+                self._file.truncate(size)
+                self._map = mmap.mmap(self._file.fileno(), size)
+            _KEY_LEN.pack_into(self._map, self._used, len(encoded))
+            self._map[self._used + _KEY_LEN.size:self._used + _KEY_LEN.size + len(encoded)] = encoded
+            _VALUE.pack_into(self._map, value_pos, 0.0)
+            self._used = end
+            _HEADER.pack_into(self._map, 0, self._used)
+            offset = self._offsets[key] = value_pos
+        return offset
+
+    def inc(self, key, amount):
+        offset = self._offset(key)
+        _VALUE.pack_into(self._map, offset, _VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def set(self, key, value):
+        _VALUE.pack_into(self._map, self._offset(key), value)
+
+    def read(self):
+        return _read_values(self.path)
+
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _check(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}')
+        return tuple(str(v) for v in labelvalues)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1.0):
+        self.registry._inc((self.name, self._check(labelvalues)), amount)
+
+    def render(self, values):
+        for (_, labels), value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+class Gauge(Counter):
+    """A value that goes up and down; summed over live processes only."""
+
+    kind = 'gauge'
+
+    def dec(self, *labelvalues, amount=1.0):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        self.registry._set((self.name, self._check(labelvalues)), value)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._bucket_labels = [_number(b) for b in self.buckets]
+
+    def observe(self, value, *labelvalues):
+        labels = self._check(labelvalues)
+        # Per-bucket (non-cumulative) counts; render() accumulates them
+        bucket = self._bucket_labels[bisect_left(self.buckets, value)]
+        self.registry._observe(self.name, labels, bucket, value)
+
+    def render(self, values):
+        series = {}
+        for (name, labels), value in values.items():
+            *base, le_or_field = labels
+            series.setdefault(tuple(base), {})[le_or_field] = value
+        for labels in sorted(series):
+            fields = series[labels]
+            cumulative = 0.0
+            for bucket in self._bucket_labels:
+                cumulative += fields.get(bucket, 0.0)
+                le = 'le="%s"' % bucket
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {_number(cumulative)}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(fields.get("sum", 0.0))}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {_number(cumulative)}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.directory = None
+        self._store = _LocalValues()
+        self._pid = os.getpid()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name!r} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def configure(self, directory):
+        """Share values through per-process files in `directory` and archive those of exited workers."""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self.directory = directory if fcntl is not None else None
+            self._pid = None  # the value file is opened on first use in each process
+        if self.directory:
+            self._compact()
+
+    def _values(self):
+        # Files are per process; a worker forked after configure() opens its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            if self.directory:
+                path = os.path.join(self.directory, f'values_{self._pid}.db')
+                if os.path.exists(path):
+                    # Left by an exited process whose PID we reuse (or by this one
+                    # before a reconfigure): opening truncates it, so archive it first
+                    with self._locked(fcntl.LOCK_EX):
+                        self._archive([path])
+                        self._store = _MmapValues(path)
+                else:
+                    self._store = _MmapValues(path)
+            else:
+                self._store = _LocalValues()
+        return self._store
+
+    def _inc(self, key, amount):
+        with self._lock:
+            self._values().inc(key, amount)
+
+    def _set(self, key, value):
+        with self._lock:
+            self._values().set(key, value)
+
+    def _observe(self, name, labels, bucket, value):
+        with self._lock:
+            store = self._values()
+            store.inc((name, labels + (bucket,)), 1.0)
+            store.inc((name, labels + ('sum',)), value)
+
+    def _locked(self, mode):
+        return _FileLock(os.path.join(self.directory, '.lock'), mode)
+
+    def _compact(self):
+        """Fold counters and histograms of exited processes into the archive file."""
+        with self._locked(fcntl.LOCK_EX):
+            dead = []
+            for path in glob.glob(os.path.join(self.directory, 'values_*.db')):
+                match = _FILE_RE.match(os.path.basename(path))
+                if match and not _pid_alive(int(match.group(1))):
+                    dead.append(path)
+            if dead:
+                self._archive(dead)
+
+    def _archive(self, paths):
+        """Add the counters and histograms in value files `paths` to the archive and delete the files.
+
+        The caller holds the exclusive lock.
+        """
+        archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+        archived = _read_values(archive_path)
+        for path in paths:
+            for key, value in _read_values(path).items():
+                metric = self._metrics.get(key[0])
+                if metric is not None and metric.kind != 'gauge':
+                    archived[key] = archived.get(key, 0.0) + value
+        tmp_path = f'{archive_path}.{os.getpid()}.tmp'
+        store = _MmapValues(tmp_path)
+        for key, value in archived.items():
+            store.set(key, value)
+        store._map.flush()
+        os.replace(tmp_path, archive_path)
+        for path in paths:
+            os.remove(path)
+
+    def collect(self):
+        """{metric name: {(name, labels): value}} summed across processes."""
+        totals = {}
+        if not self.directory:
+            with self._lock:
+                sources = [(self._values().read(), True)]
+        else:
+            with self._lock:
+                self._values()  # make sure this process has a file
+            sources = []
+            with self._locked(fcntl.LOCK_SH):
+                for path in glob.glob(os.path.join(self.directory, '*.db')):
+                    match = _FILE_RE.match(os.path.basename(path))
+                    alive = bool(match) and _pid_alive(int(match.group(1)))
+                    sources.append((_read_values(path), alive))
+        for values, alive in sources:
+            for key, value in values.items():
+                metric = self._metrics.get(key[0])
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                series = totals.setdefault(key[0], {})
+                series[key] = series.get(key, 0.0) + value
+        return totals
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        totals = self.collect()
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.render(totals.get(name, {})))
+        return '\n'.join(lines) + '\n'
+
+
+class _FileLock:
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+
+    def __enter__(self):
+        self._file = open(self.path, 'a')
+        fcntl.flock(self._file.fileno(), self.mode)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    'svs_http_requests_total', 'HTTP requests by endpoint, method and status code',
+    ('endpoint', 'method', 'status'),
+)
+http_request_duration = metrics.histogram(
+    'svs_http_request_duration_seconds', 'HTTP request latency by endpoint and method',
+    ('endpoint', 'method'),
+)
+http_requests_in_flight = metrics.gauge(
+    'svs_http_requests_in_flight', 'HTTP requests currently being served',
+)
+db_pool_checkout_wait = metrics.histogram(
+    'svs_db_pool_checkout_wait_seconds', 'Time spent waiting for a database connection from the pool',
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+
+def _time_pool_checkout(pool):
+    # The pool has no public before-checkout hook; time its internal getter
+    get = pool._do_get
+
+    def timed_get():
+        started = perf_counter()
+        try:
+            return get()
+        finally:
+            db_pool_checkout_wait.observe(perf_counter() - started)
+
+    pool._do_get = timed_get
+
+
+def init_app(app, db):
+    """Configure the shared store and record every request. Call once per app, after db.init_app."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    metrics.configure(app.config.get('METRICS_DIR') or os.path.join(app.instance_path, 'metrics'))
+
+    from sqlalchemy import event
+
+    with app.app_context():
+        engine = db.engine
+    _time_pool_checkout(engine.pool)
+    # engine.dispose() replaces the pool
+    event.listen(engine, 'engine_disposed', lambda e: _time_pool_checkout(e.pool))
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = perf_counter()
+        http_requests_in_flight.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            endpoint = request.endpoint or 'unmatched'
+            http_requests.inc(endpoint, request.method, response.status_code)
+            http_request_duration.observe(perf_counter() - started, endpoint, request.method)
+        return response
+
+    @app.teardown_request
+    def _end_request_metrics(exc):
+        if g.pop('metrics_started', None) is not None:
+            http_requests_in_flight.dec()
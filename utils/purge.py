@@ -0,0 +1,127 @@
+"""Chunked purge engine for users and projects.
+
+Deleting an organization fans out to its projects and every registration,
+volunteer record and comment below them. Done as one statement (or one
+transaction), SQLite would hold the write lock for the whole cascade and
+stall every other writer. Instead, each dependent table is emptied in
+chunks of PURGE_CHUNK_SIZE rows, one short committed transaction per
+chunk, and the parent rows go last. ON DELETE CASCADE then only has
+stragglers (rows inserted mid-purge) left to remove.
+
+Every step is idempotent and only looks at what is still in the database,
+so an interrupted purge is resumed by running it again (the job runner
+requeues jobs whose process died).
+"""
+from flask import current_app
+
+from models import db, User, UserStats, Project, Registration, VolunteerRecord, Comment
+from utils import leaderboard
+from utils.catalog_cache import catalog_version
+from utils.user_cache import user_cache
+
+DEFAULT_PURGE_CHUNK_SIZE = 500
+
+
+def _chunk_size(chunk_size):
+    return chunk_size or current_app.config.get('PURGE_CHUNK_SIZE', DEFAULT_PURGE_CHUNK_SIZE)
+
+
+def _purge_chunks(model, criterion, chunk_size, key=None, refresh=None):
+    """Delete rows of model matching criterion, chunk_size rows per transaction.
+
+    The chunk SELECT is unordered so it stays an index range scan; replies
+    below a deleted comment go with it through ON DELETE CASCADE. If given,
+    refresh(values of key in the chunk) runs after the DELETE in the same
+    transaction to keep counters consistent. Returns the number of rows deleted.
+    """
+    columns = (model.id,) if key is None else (model.id, key)
+    total = 0
+    while True:
+        rows = db.session.execute(db.select(*columns).where(criterion).limit(chunk_size)).all()
+        if not rows:
+            return total
+        total += db.session.execute(
+            db.delete(model).where(model.id.in_([row[0] for row in rows])),
+            execution_options={'synchronize_session': False},
+        ).rowcount
+        if refresh is not None:
+            refresh({row[1] for row in rows})
+        db.session.commit()
+        if len(rows) < chunk_size:
+            return total
+
+
+def _refresh_participant_totals(user_ids):
+    """Dashboard totals and leaderboard standings of participants who lost records."""
+    UserStats.rebuild(user_ids)
+    leaderboard.sync_users(user_ids)
+
+
+def _purge_projects(project_criterion, chunk_size):
+    """Purge every project matching project_criterion and the rows below them. Commits."""
+    project_ids = db.select(Project.id).where(project_criterion)
+    # Participants keep their accounts; their stats and standings are fixed chunk by chunk
+    counts = {
+        'comments': _purge_chunks(Comment, Comment.project_id.in_(project_ids), chunk_size),
+        'registrations': _purge_chunks(
+            Registration, Registration.project_id.in_(project_ids), chunk_size,
+            key=Registration.user_id, refresh=UserStats.recount_upcoming,
+        ),
+        'volunteer_records': _purge_chunks(
+            VolunteerRecord, VolunteerRecord.project_id.in_(project_ids), chunk_size,
+            key=VolunteerRecord.user_id, refresh=_refresh_participant_totals,
+        ),
+        'projects': _purge_chunks(Project, project_criterion, chunk_size),
+    }
+    if counts['projects']:
+        catalog_version.bump()
+    return counts
+
+
+def purge_project(project_id, chunk_size=None):
+    """Delete a project and everything below it in chunks. Commits.
+
+    Returns a dict of deleted row counts, or None if the project does not exist.
+    """
+    if db.session.get(Project, project_id) is None:
+        return None
+    counts = _purge_projects(Project.id == project_id, _chunk_size(chunk_size))
+    current_app.logger.info(f'Project purged id={project_id} counts={counts}')
+    return counts
+
+
+def purge_user(user_id, chunk_size=None):
+    """Delete a user and all associated data in chunks. Commits.
+
+    An organization's projects are purged first, all of them together.
+    Seat counters of other projects and reply counts of other threads are
+    fixed chunk by chunk. Returns a dict of deleted row counts, or None if
+    the user does not exist.
+    """
+    chunk_size = _chunk_size(chunk_size)
+    if db.session.get(User, user_id) is None:
+        return None
+
+    counts = {'projects': _purge_projects(Project.organization_id == user_id, chunk_size)['projects']}
+    # Replies by others below the user's comments go with them through the
+    # cascade; the surviving threads and projects are recounted per chunk
+    counts['comments'] = _purge_chunks(
+        Comment, Comment.user_id == user_id, chunk_size,
+        key=Comment.thread_id, refresh=Comment.recount_replies,
+    )
+    counts['registrations'] = _purge_chunks(
+        Registration, Registration.user_id == user_id, chunk_size,
+        key=Registration.project_id, refresh=Project.recount_active_registrations,
+    )
+    # Leaving the leaderboards moves everyone placed behind the user up
+    counts['volunteer_records'] = _purge_chunks(
+        VolunteerRecord, VolunteerRecord.user_id == user_id, chunk_size,
+        key=VolunteerRecord.user_id, refresh=leaderboard.sync_users,
+    )
+
+    db.session.execute(db.delete(User).where(User.id == user_id))
+    db.session.commit()
+    user_cache.bump()
+    catalog_version.bump()
+    current_app.logger.info(f'User purged id={user_id} counts={counts}')
+    return counts
@@ -0,0 +1,153 @@
+"""Per-request SQL accounting, Server-Timing headers and an N+1 query detector.
+
+SQLAlchemy engine events count every statement a request executes and the
+time spent in the database; the JSON provider and Flask's template signals
+add serialization and render time. Responses carry a Server-Timing header:
+
+    Server-Timing: db;dur=4.1;desc="7 queries", serialize;dur=0.6, render;dur=0, total;dur=9.8
+
+Statements are grouped by shape (the SQL text, with expanded IN lists
+collapsed). A shape that runs more than SQL_REPEAT_THRESHOLD times in one
+request is almost always a lazy relationship loaded in a loop. It is
+logged as a warning in debug mode, and raises RepeatedQueryError under
+TESTING so the offending endpoint fails loudly (SQL_REPEAT_ACTION
+overrides: warn, raise or off).
+"""
+import re
+from collections import Counter
+from time import perf_counter
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from sqlalchemy import event
+
+_IN_LIST = re.compile(r'\(\?(?:, \?)+\)')
+ACTIONS = ('auto', 'warn', 'raise', 'off')
+
+
+class RepeatedQueryError(RuntimeError):
+    """A statement shape ran more often in one request than SQL_REPEAT_THRESHOLD allows."""
+
+
+class RequestStats:
+    """Counters for the current request; see `current()`."""
+
+    __slots__ = ('started', 'queries', 'db_time', 'serialize_time', 'render_time', 'shapes', '_render_started')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.shapes = Counter()
+        self._render_started = None
+
+    def repeated(self, threshold):
+        """[(shape, count)] of statement shapes run more than `threshold` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self):
+        total = perf_counter() - self.started
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'serialize;dur={self.serialize_time * 1000:.1f}, '
+            f'render;dur={self.render_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+
+
+def current():
+    """RequestStats for the active request, or None outside a request (CLI, jobs)."""
+    if not has_request_context():
+        return None
+    return g.get('request_stats')
+
+
+def add_serialize_time(seconds):
+    stats = current()
+    if stats is not None:
+        stats.serialize_time += seconds
+
+
+def statement_shape(statement):
+    """The statement with expanded IN (?, ?, ...) lists collapsed, so batches of any size share a shape."""
+    return _IN_LIST.sub('(?...)', statement)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current() is not None:
+        context._request_stats_started = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current()
+    if stats is None:
+        return
+    started = getattr(context, '_request_stats_started', None)
+    if started is not None:
+        stats.db_time += perf_counter() - started
+    stats.queries += 1
+    stats.shapes[statement_shape(statement)] += 1
+
+
+def _before_render(sender, template, context, **extra):
+    stats = current()
+    if stats is not None:
+        stats._render_started = perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    stats = current()
+    if stats is not None and stats._render_started is not None:
+        stats.render_time += perf_counter() - stats._render_started
+        stats._render_started = None
+
+
+def _repeat_action(app):
+    action = app.config.get('SQL_REPEAT_ACTION', 'auto')
+    if action not in ACTIONS:
+        raise ValueError(f"SQL_REPEAT_ACTION must be one of {', '.join(ACTIONS)}")
+    if action == 'auto':
+        return 'raise' if app.testing else 'warn' if app.debug else 'off'
+    return action
+
+
+def init_app(app, db):
+    """Hook the app's database engine and request cycle. Call once per app, after db.init_app."""
+    if not app.config.get('SQL_ACCOUNTING', True):
+        return
+    with app.app_context():
+        engine = db.engine
+
+    threshold = app.config.get('SQL_REPEAT_THRESHOLD', 20)
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+
+    @app.before_request
+    def _start_request_stats():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def _finish_request_stats(response):
+        stats = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        response.headers['Server-Timing'] = stats.server_timing()
+        app.logger.debug(
+            'SQL %s %s: %d queries in %.1fms', request.method, request.endpoint, stats.queries, stats.db_time * 1000
+        )
+        # Resolved per request: TESTING and DEBUG are often set after the app is created
+        action = _repeat_action(app) if threshold > 0 else 'off'
+        if action != 'off':
+            for shape, count in stats.repeated(threshold):
+                message = (
+                    f'Possible N+1 in {request.endpoint} ({request.method} {request.path}): '
+                    f'statement ran {count} times (threshold {threshold}): {shape}'
+                )
+                if action == 'raise':
+                    raise RepeatedQueryError(message)
+                app.logger.warning(message)
+        return response
@@ -0,0 +1,204 @@
+"""Full-text project search backed by an SQLite FTS5 index.
+
+`project_fts` is an external-content FTS5 table over the searchable project
+columns: it stores only the index and reads text back from `project` by
+rowid. Triggers on `project` keep it in sync, and the update trigger only
+fires for the indexed columns, so counter updates never touch it.
+
+The schema is created by migration and, for databases built with
+db.create_all(), by ensure_project_fts() at boot. Batch migrations that
+rebuild `project` drop its triggers; ensure_project_fts() restores them.
+`flask rebuild-search-index` rebuilds the index from scratch.
+"""
+import html
+import re
+
+from sqlalchemy import and_, column, exists, func, literal_column, or_, table
+
+from models import db, Project, Registration, User
+
+PROJECT_FTS_COLUMNS = ('title', 'description', 'location', 'category', 'requirements')
+# BM25 weight per column, in PROJECT_FTS_COLUMNS order: title and category hits rank first
+PROJECT_FTS_WEIGHTS = (10.0, 1.0, 3.0, 5.0, 1.0)
+
+_columns = ', '.join(PROJECT_FTS_COLUMNS)
+_new_values = ', '.join(f'new.{c}' for c in PROJECT_FTS_COLUMNS)
+_old_values = ', '.join(f'old.{c}' for c in PROJECT_FTS_COLUMNS)
+
+PROJECT_FTS_TABLE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5({_columns}, "
+    "content='project', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2', "
+    "prefix='3 4 5')"
+)
+PROJECT_FTS_TRIGGERS_DDL = (
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_ai AFTER INSERT ON project BEGIN "
+    f"INSERT INTO project_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_ad AFTER DELETE ON project BEGIN "
+    f"INSERT INTO project_fts(project_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS project_fts_au AFTER UPDATE OF {_columns} ON project BEGIN "
+    f"INSERT INTO project_fts(project_fts, rowid, {_columns}) VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO project_fts(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+)
+# Longest query accepted, in terms; later terms are ignored
+MAX_QUERY_TERMS = 8
+# A last term of MIN..MAX_PREFIX_LENGTH characters also matches as a prefix
+# (type-ahead). These lengths have prefix indexes; longer prefixes would merge
+# every matching term's doclist, and stemming already covers complete words.
+MIN_PREFIX_LENGTH = 3
+MAX_PREFIX_LENGTH = 5
+SNIPPET_TOKENS = 16
+
+# Highlight markers; control characters cannot occur in the escaped text
+_MARK_START, _MARK_END = '\x02', '\x03'
+_TERM_RE = re.compile(r'\w+')
+
+project_fts_table = table('project_fts', column('rowid'))
+# The table name as a value: MATCH and the auxiliary functions take it as first argument
+project_fts = literal_column('project_fts')
+project_fts_rowid = project_fts_table.c.rowid
+# Weighted BM25; lower is better
+project_fts_rank = func.bm25(project_fts, *PROJECT_FTS_WEIGHTS)
+
+
+def ensure_project_fts():
+    """Create the FTS table and triggers if missing; index existing rows on creation. Commits."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    created = not db.session.execute(
+        db.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'project_fts'")
+    ).first()
+    db.session.execute(db.text(PROJECT_FTS_TABLE_DDL))
+    for ddl in PROJECT_FTS_TRIGGERS_DDL:
+        db.session.execute(db.text(ddl))
+    if created:
+        db.session.execute(db.text("INSERT INTO project_fts(project_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    return created
+
+
+def rebuild_project_fts():
+    """Re-index every project from the content table. Commits."""
+    ensure_project_fts()
+    db.session.execute(db.text("INSERT INTO project_fts(project_fts) VALUES ('rebuild')"))
+    db.session.execute(db.text("INSERT INTO project_fts(project_fts) VALUES ('optimize')"))
+    db.session.commit()
+
+
+def check_project_fts():
+    """Raise sqlalchemy's DatabaseError if the index disagrees with the project table."""
+    db.session.execute(db.text("INSERT INTO project_fts(project_fts, rank) VALUES ('integrity-check', 1)"))
+    db.session.rollback()
+
+
+def fts_match_expression(query):
+    """Turn free text into a safe FTS5 MATCH expression, or None if it has no terms.
+
+    Every term is quoted (so FTS5 operators in user input are inert) and
+    all terms must match. A short last term also matches as a prefix, so
+    results follow the user's typing.
+    """
+    terms = _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    parts = [f'"{term}"' for term in terms]
+    if MIN_PREFIX_LENGTH <= len(terms[-1]) <= MAX_PREFIX_LENGTH:
+        parts[-1] += '*'
+    return ' '.join(parts)
+
+
+def _render_highlight(text):
+    """HTML-escape FTS output and turn the match markers into <mark> tags."""
+    if text is None:
+        return None
+    return html.escape(text).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def _matching_projects(stmt, match, statuses, from_date=None, exclude_user_id=None):
+    """Restrict a select over project_fts to matches that pass the project filters."""
+    stmt = (
+        stmt.select_from(project_fts_table)
+        .join(Project, Project.id == project_fts_rowid)
+        .where(project_fts.op('MATCH')(match), Project.status.in_(statuses))
+    )
+    if from_date is not None:
+        stmt = stmt.where(Project.date >= from_date)
+    if exclude_user_id is not None:
+        stmt = stmt.where(~exists().where(
+            Registration.project_id == Project.id,
+            Registration.user_id == exclude_user_id,
+        ))
+    return stmt
+
+
+def ranking_window(match, max_ranked, statuses, from_date=None, exclude_user_id=None):
+    """Lowest rowid among the newest max_ranked matches passing the filters, or None if there are fewer.
+
+    Takes the same filters as search_projects, so a window of filtered-out
+    matches never hides older ones that qualify. Walks the match's doclist
+    backwards without scoring it.
+    """
+    return db.session.execute(
+        _matching_projects(db.select(project_fts_rowid), match, statuses, from_date, exclude_user_id)
+        .order_by(project_fts_rowid.desc())
+        .limit(1)
+        .offset(max_ranked - 1)
+    ).scalar()
+
+
+def search_projects(match, statuses, limit, after=None, min_rowid=None, from_date=None, exclude_user_id=None):
+    """One page of projects matching an FTS5 expression, best match first.
+
+    Results are ordered by (weighted BM25 rank, id); `after` is the
+    (rank, id) of the last row of the previous page. With min_rowid
+    (see ranking_window) only matches from that rowid up are ranked. Returns
+    a list of (project, organization_name, rank, highlighted title, snippet) tuples.
+    """
+    # Rank ids only; project rows are loaded for the page alone so the sort
+    # never carries descriptions around
+    page = _matching_projects(
+        db.select(project_fts_rowid.label('id'), project_fts_rank.label('rank')),
+        match, statuses, from_date, exclude_user_id,
+    )
+    if min_rowid is not None:
+        # A rowid range is pushed down into FTS5, so rows below it are never scored
+        page = page.where(project_fts_rowid >= min_rowid)
+    if after is not None:
+        after_rank, after_id = after
+        page = page.where(or_(
+            project_fts_rank > after_rank,
+            and_(project_fts_rank == after_rank, Project.id > after_id),
+        ))
+    page = page.order_by(project_fts_rank, Project.id).limit(limit).subquery()
+    rows = db.session.execute(
+        db.select(Project, func.coalesce(User.display_name, User.username), page.c.rank)
+        .join(page, page.c.id == Project.id)
+        .outerjoin(User, User.id == Project.organization_id)
+        .order_by(page.c.rank, Project.id)
+    ).all()
+    if not rows:
+        return []
+
+    ids = [project.id for project, _, _ in rows]
+    highlights = {
+        rowid: (title, snippet)
+        for rowid, title, snippet in db.session.execute(
+            db.select(
+                project_fts_rowid,
+                func.highlight(project_fts, 0, _MARK_START, _MARK_END),
+                func.snippet(project_fts, -1, _MARK_START, _MARK_END, '…', SNIPPET_TOKENS),
+            )
+            .select_from(project_fts_table)
+            .where(
+                project_fts.op('MATCH')(match),
+                project_fts_rowid.between(min(ids), max(ids)),
+                # rowid + 0 keeps FTS5 on the range scan above; a rowid IN list
+                # would be a separate doclist seek per id
+                (project_fts_rowid + 0).in_(ids),
+            )
+        )
+    }
+    results = []
+    for project, organization_name, score in rows:
+        title, snippet = highlights.get(project.id, (None, None))
+        results.append((project, organization_name, score, _render_highlight(title), _render_highlight(snippet)))
+    return results
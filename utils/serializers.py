@@ -0,0 +1,404 @@
+"""Precompiled row-to-dict serializers for the JSON APIs.
+
+Each resource shape is declared once as a spec (a dict of output key to
+field) and compiled into a plain Python function whose body is a single
+dict literal. The compiled function reads loaded values straight from the
+instance __dict__, skipping SQLAlchemy's attribute instrumentation (about
+ten times cheaper per field); if a value is not loaded (expired, deferred,
+a lazy relationship) or the object has no __dict__, it falls back to plain
+attribute access, which loads it. Compiled functions are kept in
+`SERIALIZERS` by name; the module also exposes each one directly:
+
+    from utils import serializers
+    jsonify([serializers.record(r) for r in records])
+
+Fields:
+- 'attr' / 'rel.attr': attribute read; dotted paths give None (or the
+  field's default) when an intermediate object is missing
+- Date / DateTime / IsoFormat: formatted dates, None when unset
+- DisplayName: display_name, falling back to username
+- Nested: a nested object, None when the related object is missing
+- Arg: a keyword argument passed by the caller (values not on the row)
+- Call: any callable taking the object
+"""
+from itertools import count
+
+SERIALIZERS = {}
+
+
+class Attr:
+    """Attribute read along a dotted path."""
+
+    def __init__(self, path, default=None):
+        self.path = path
+        self.default = default
+
+
+class Date(Attr):
+    """A date or datetime as 'YYYY-MM-DD'."""
+
+
+class DateTime(Attr):
+    """A datetime as 'YYYY-MM-DD HH:MM:SS' (or 'YYYY-MM-DD HH:MM' with timespec='minutes')."""
+
+    def __init__(self, path, timespec='seconds'):
+        super().__init__(path)
+        self.timespec = timespec
+
+
+class IsoFormat(Attr):
+    """A date or datetime in full ISO 8601 format."""
+
+
+class DisplayName(Attr):
+    """A user's display name, falling back to the username. path=None names the object itself."""
+
+
+class Nested(Attr):
+    """A nested object built from `spec`. path=None builds it from the object itself (never None)."""
+
+    def __init__(self, path, spec):
+        super().__init__(path)
+        self.spec = spec
+
+
+class Arg:
+    """A value supplied by the caller as a keyword argument."""
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+
+class Call:
+    """The result of calling `func` with the object."""
+
+    def __init__(self, func):
+        self.func = func
+
+
+class _Compiler:
+    def __init__(self, name):
+        self.name = name
+        self.names = {}
+        self.args = {}
+        self.fast = False
+        self._ids = count(1)
+
+    def const(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return repr(value)
+        ref = f'_c{next(self._ids)}'
+        self.names[ref] = value
+        return ref
+
+    def temp(self):
+        return f'_t{next(self._ids)}'
+
+    def get(self, base, attr):
+        if not self.fast:
+            return f'{base}.{attr}'
+        if base == 'obj':
+            return f'_d[{attr!r}]'
+        return f'{base}.__dict__[{attr!r}]'
+
+    def read(self, base, path, default='None'):
+        parts = path.split('.')
+        expr = self.get(base, parts[0])
+        for part in parts[1:]:
+            t = self.temp()
+            expr = f'({self.get(t, part)} if ({t} := {expr}) is not None else {default})'
+        return expr
+
+    def bind(self, base, path, value_expr, default='None'):
+        """`value_expr` (written against `{v}`) over the value at path, or default when it is None."""
+        t = self.temp()
+        return f'({value_expr.format(v=t)} if ({t} := {self.read(base, path)}) is not None else {default})'
+
+    def field(self, base, field):
+        if isinstance(field, str):
+            field = Attr(field)
+        if isinstance(field, Arg):
+            if field.name in self.args and self.args[field.name] != field.default:
+                raise ValueError(f'{self.name}: conflicting defaults for argument {field.name!r}')
+            self.args[field.name] = field.default
+            return field.name
+        if isinstance(field, Call):
+            ref = f'_f{next(self._ids)}'
+            self.names[ref] = field.func
+            return f'{ref}({base})'
+        if isinstance(field, Nested):
+            if field.path is None:
+                return self.spec(base, field.spec)
+            t = self.temp()
+            return f'({self.spec(t, field.spec)} if ({t} := {self.read(base, field.path)}) is not None else None)'
+        default = self.const(field.default)
+        if isinstance(field, DisplayName):
+            name = f"({self.get('{v}', 'display_name')} or {self.get('{v}', 'username')})"
+            if field.path is None:
+                return name.format(v=base)
+            return self.bind(base, field.path, name, default)
+        if isinstance(field, Date):
+            return self.bind(base, field.path, '{v}.isoformat()[:10]')
+        if isinstance(field, DateTime):
+            return self.bind(base, field.path, "{v}.isoformat(' ', " + repr(field.timespec) + ')')
+        if isinstance(field, IsoFormat):
+            return self.bind(base, field.path, '{v}.isoformat()')
+        if type(field) is Attr:
+            return self.read(base, field.path, default)
+        raise TypeError(f'{self.name}: unsupported field {field!r}')
+
+    def spec(self, base, spec):
+        items = ', '.join(f'{key!r}: {self.field(base, field)}' for key, field in spec.items())
+        return '{' + items + '}'
+
+    def compile(self, spec):
+        self.fast = True
+        fast = self.spec('obj', spec)
+        self.fast = False
+        slow = self.spec('obj', spec)
+        params = ''.join(f', {name}={self.const(default)}' for name, default in self.args.items())
+        if self.args:
+            params = ', *' + params
+        source = (
+            f'def {self.name}(obj{params}):\n'
+            f'    try:\n'
+            f'        _d = obj.__dict__\n'
+            f'        return {fast}\n'
+            f'    except (AttributeError, KeyError):\n'
+            f'        return {slow}\n'
+        )
+        namespace = dict(self.names)
+        exec(compile(source, f'<serializer {self.name}>', 'exec'), namespace)
+        fn = namespace[self.name]
+        fn.source = source
+        return fn
+
+
+def serializer(name, spec):
+    """Compile `spec` into a serializer function and register it under `name`."""
+    if name in SERIALIZERS:
+        raise ValueError(f'Serializer {name!r} is already registered')
+    fn = _Compiler(name).compile(spec)
+    SERIALIZERS[name] = fn
+    return fn
+
+
+# -- Projects ---------------------------------------------------------------
+
+# Homepage / dashboard catalog (GET /api/v1/projects)
+project_card = serializer('project_card', {
+    'id': 'id',
+    'title': 'title',
+    'category': 'category',
+    'date': Date('date'),
+    'location': 'location',
+    'rating': 'rating',
+    'max_participants': 'max_participants',
+    'current_participants': 'active_registrations',
+    'status': 'status',
+    'organization_name': DisplayName('organization'),
+    'description': 'description',
+    'created_at': Date('created_at'),
+    'organization': Nested(None, {
+        'id': 'organization_id',
+        'name': DisplayName('organization'),
+    }),
+})
+
+# Full-text search hit; the organization name and ranking come from the search query
+project_search_hit = serializer('project_search_hit', {
+    'id': 'id',
+    'title': 'title',
+    'category': 'category',
+    'date': Date('date'),
+    'location': 'location',
+    'rating': 'rating',
+    'max_participants': 'max_participants',
+    'current_participants': 'active_registrations',
+    'status': 'status',
+    'organization_name': Arg('organization_name'),
+    'organization': Nested(None, {
+        'id': 'organization_id',
+        'name': Arg('organization_name'),
+    }),
+    'score': Arg('score'),
+    'highlight': Nested(None, {
+        'title': Arg('title_html'),
+        'snippet': Arg('snippet_html'),
+    }),
+})
+
+project_detail = serializer('project_detail', {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'category': 'category',
+    'date': Date('date'),
+    'location': 'location',
+    'rating': 'rating',
+    'max_participants': 'max_participants',
+    'current_participants': 'active_registrations',
+    'duration': 'duration',
+    'points': 'points',
+    'status': 'status',
+    'requirements': 'requirements',
+    'organization': Nested('organization', {
+        'id': 'id',
+        'name': DisplayName(None),
+        'email': 'email',
+    }),
+})
+
+# Admin review queue (dashboard first page and GET /api/v1/admin/review/projects)
+pending_project = serializer('pending_project', {
+    'id': 'id',
+    'title': 'title',
+    'organization_name': DisplayName('organization', 'Unknown'),
+    'organization_email': 'organization.email',
+    'date': Date('date'),
+    'location': 'location',
+    'max_participants': 'max_participants',
+    'rating': 'rating',
+    'description': 'description',
+    'submitted_date': Date('created_at'),
+})
+
+# Organization dashboard: own projects with per-status registration counts
+organization_project = serializer('organization_project', {
+    'id': 'id',
+    'title': 'title',
+    'status': 'status',
+    'date': Date('date'),
+    'location': 'location',
+    'max_participants': 'max_participants',
+    'current_participants': 'active_registrations',
+    'registration_counts': Arg('registration_counts'),
+    'total_registrations': Arg('total_registrations', 0),
+    'rating': 'rating',
+})
+
+organization_recent_project = serializer('organization_recent_project', {
+    'id': 'id',
+    'title': 'title',
+    'status': 'status',
+    'date': Date('date'),
+    'location': 'location',
+    'created_at': Date('created_at'),
+    'current_participants': 'active_registrations',
+    'max_participants': 'max_participants',
+    'rating': 'rating',
+    'organization_name': Arg('organization_name'),
+})
+
+
+# -- Volunteer records ------------------------------------------------------
+
+_RECORD = {
+    'id': 'id',
+    'user_id': 'user_id',
+    'project_id': 'project_id',
+    'hours': 'hours',
+    'points': 'points',
+    'status': 'status',
+    'completed_at': Date('completed_at'),
+    'project': Nested('project', {
+        'id': 'id',
+        'title': 'title',
+        'category': 'category',
+    }),
+    'participant': Nested('user', {
+        'id': 'id',
+        'name': DisplayName(None),
+    }),
+    'organization': Nested('project.organization', {
+        'id': 'id',
+        'name': DisplayName(None),
+    }),
+}
+
+# GET /api/v1/records and the admin review queue
+record = serializer('record', _RECORD)
+
+record_detail = serializer('record_detail', dict(_RECORD, participant=Nested('user', {
+    'id': 'id',
+    'name': DisplayName(None),
+    'email': 'email',
+})))
+
+# Admin dashboard: first page of records awaiting review
+pending_record = serializer('pending_record', {
+    'id': 'id',
+    'participant_name': DisplayName('user'),
+    'project_name': Attr('project.title', 'Unknown'),
+    'organization_name': DisplayName('project.organization', 'Unknown'),
+    'hours': 'hours',
+    'points': 'points',
+    'completion_date': Date('completed_at'),
+})
+
+
+# -- Registrations ----------------------------------------------------------
+
+_PARTICIPANT = Nested('user', {
+    'id': 'id',
+    'name': DisplayName(None),
+    'email': 'email',
+})
+
+registration = serializer('registration', {
+    'id': 'id',
+    'user_id': 'user_id',
+    'project_id': 'project_id',
+    'status': 'status',
+    'created_at': DateTime('created_at'),
+    'participant': _PARTICIPANT,
+})
+
+registration_detail = serializer('registration_detail', {
+    'id': 'id',
+    'user_id': 'user_id',
+    'project_id': 'project_id',
+    'status': 'status',
+    'created_at': DateTime('created_at'),
+    'participant': _PARTICIPANT,
+    'project': Nested('project', {
+        'id': 'id',
+        'title': 'title',
+    }),
+})
+
+# Organization view of all registrations across its projects
+organization_registration = serializer('organization_registration', {
+    'id': 'id',
+    'participant_name': DisplayName('user'),
+    'participant_email': 'user.email',
+    'registration_date': Date('created_at'),
+    'status': 'status',
+})
+
+# Participant dashboard: own registrations with a display status and progress
+participant_registration = serializer('participant_registration', {
+    'id': 'project_id',
+    'registration_id': 'id',
+    'title': 'project.title',
+    'organization_name': DisplayName('project.organization'),
+    'date': Date('project.date'),
+    'status': Arg('status'),
+    'progress': Arg('progress'),
+})
+
+
+# -- Users ------------------------------------------------------------------
+
+user = serializer('user', {
+    'id': 'id',
+    'username': 'username',
+    'display_name': 'display_name',
+    'email': 'email',
+    'user_type': 'user_type',
+    'is_active': 'is_active',
+    'ban_reason': 'ban_reason',
+    'ban_until': IsoFormat('ban_until'),
+    'created_at': Date('created_at'),
+})
@@ -0,0 +1,285 @@
+"""Synthetic dataset generator for load testing and benchmarks.
+
+Fills the database with organizations, participants, projects,
+registrations, volunteer records and comment threads at a configurable
+scale (millions of rows). Rows are built in Python and written with core
+executemany INSERTs, batch_size rows per committed transaction; ids are
+assigned up front from max(id) + 1, so nothing is ever read back. The
+derived tables (seat counters, user_stats, leaderboards) are rebuilt once
+at the end with their set-based rebuilds; the search index is kept by its
+triggers.
+
+The data is consistent with what the application itself would produce:
+registrations only exist on open or completed projects, seats are never
+oversubscribed, volunteer records come from completed registrations,
+comments are written by a project's registrants (or its organization) and
+replies carry their thread path and reply counts. The same seed
+always yields the same dataset.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+from models import (
+    db,
+    User,
+    Project,
+    Registration,
+    VolunteerRecord,
+    Comment,
+    UserStats,
+    ProjectStatus,
+    RegistrationStatus,
+    VolunteerRecordStatus,
+    comment_path_segment,
+)
+from utils import leaderboard
+from utils.catalog_cache import catalog_version
+
+DEFAULT_BATCH_SIZE = 5000
+SYNTHETIC_PASSWORD = 'Synthetic123!'
+CATEGORIES = ('Ecology', 'Education', 'Community', 'Health', 'Rural', 'Emergency')
+
+_PROJECT_STATUSES = (
+    (ProjectStatus.APPROVED.value, 40),
+    (ProjectStatus.COMPLETED.value, 40),
+    (ProjectStatus.PENDING.value, 10),
+    (ProjectStatus.IN_PROGRESS.value, 5),
+    (ProjectStatus.REJECTED.value, 5),
+)
+_RECORD_STATUSES = (
+    (VolunteerRecordStatus.APPROVED.value, 85),
+    (VolunteerRecordStatus.PENDING.value, 10),
+    (VolunteerRecordStatus.REJECTED.value, 5),
+)
+# Projects participants can hold registrations (and comment threads) on
+_REGISTRABLE = (ProjectStatus.APPROVED.value, ProjectStatus.IN_PROGRESS.value, ProjectStatus.COMPLETED.value)
+_WORDS = (
+    'river', 'garden', 'coast', 'school', 'library', 'forest', 'street', 'market', 'park', 'clinic',
+    'cleanup', 'planting', 'tutoring', 'recycling', 'repair', 'survey', 'workshop', 'drive', 'relief', 'harvest',
+)
+
+
+class _Writer:
+    """Buffers rows per model and flushes them as executemany INSERTs, one commit per batch.
+
+    Rows of one model must all have the same keys (a single executemany).
+    """
+
+    def __init__(self, batch_size, echo=None):
+        self.batch_size = batch_size
+        self.echo = echo
+        self.buffers = {}
+        self.written = {}
+
+    def add(self, model, row):
+        rows = self.buffers.setdefault(model, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        for target in ([model] if model is not None else list(self.buffers)):
+            rows = self.buffers.get(target)
+            if not rows:
+                continue
+            db.session.execute(target.__table__.insert(), rows)
+            db.session.commit()
+            name = target.__tablename__
+            self.written[name] = self.written.get(name, 0) + len(rows)
+            rows.clear()
+            if self.echo is not None:
+                self.echo(f'{name}: {self.written[name]} row(s)')
+
+
+def _next_id(model):
+    return (db.session.scalar(db.select(db.func.max(model.id))) or 0) + 1
+
+
+def _shares(total, slots, rng):
+    """Split total into `slots` near-equal ints (the remainder going to random slots)."""
+    if slots <= 0:
+        return []
+    base, remainder = divmod(total, slots)
+    shares = [base] * slots
+    for slot in rng.sample(range(slots), remainder):
+        shares[slot] += 1
+    return shares
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return lambda: rng.choices(values, weights)[0]
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def generate_dataset(
+    organizations,
+    participants,
+    projects,
+    registrations,
+    records,
+    comments,
+    seed=0,
+    batch_size=DEFAULT_BATCH_SIZE,
+    prefix='synth',
+    echo=None,
+):
+    """Insert a synthetic dataset of the given size; returns {table: rows written}.
+
+    Registrations are capped by what the projects can hold (each project
+    draws distinct participants) and records by the number of completed
+    registrations, so those two may come out lower than requested.
+    Commits as it goes; echo(message), if given, receives progress lines.
+    """
+    if projects and not organizations:
+        raise ValueError('Projects need at least one organization')
+    rng = random.Random(seed)
+    writer = _Writer(batch_size, echo)
+    now = datetime.utcnow().replace(microsecond=0)
+    today = now.date()
+
+    template = User()
+    template.set_password(SYNTHETIC_PASSWORD)
+    password_hash = template.password_hash
+
+    # -- Users ------------------------------------------------------------
+    first_user_id = _next_id(User)
+    organization_ids = range(first_user_id, first_user_id + organizations)
+    participant_ids = range(organization_ids.stop, organization_ids.stop + participants)
+    for user_id in organization_ids:
+        username = f'{prefix}_org_{user_id}'
+        writer.add(User, {
+            'id': user_id, 'username': username, 'email': f'{username}@example.com',
+            'password_hash': password_hash, 'user_type': 'organization',
+            'display_name': f'{_sentence(rng, 2)[:-1]} Trust {user_id}',
+            'description': _sentence(rng, 12), 'is_active': True,
+            'created_at': now - timedelta(days=rng.randint(30, 1500)),
+        })
+    for user_id in participant_ids:
+        username = f'{prefix}_p_{user_id}'
+        writer.add(User, {
+            'id': user_id, 'username': username, 'email': f'{username}@example.com',
+            'password_hash': password_hash, 'user_type': 'participant',
+            'display_name': f'Volunteer {user_id}' if rng.random() < 0.5 else None,
+            'description': None, 'is_active': True, 'created_at': now - timedelta(days=rng.randint(1, 1500)),
+        })
+    writer.flush(User)
+
+    # -- Projects ---------------------------------------------------------
+    project_status = _weighted(rng, _PROJECT_STATUSES)
+    first_project_id = _next_id(Project)
+    plans = []  # (id, status, organization_id, date, max_participants, duration, points) of registrable projects
+    for project_id in range(first_project_id, first_project_id + projects):
+        status = project_status()
+        if status == ProjectStatus.COMPLETED.value:
+            date = today - timedelta(days=rng.randint(1, 730))
+        else:
+            date = today + timedelta(days=rng.randint(1, 180))
+        max_participants = rng.randint(10, 60)
+        duration = rng.choice((1.0, 1.5, 2.0, 2.5, 3.0, 4.0, 6.0, 8.0))
+        points = int(duration * rng.choice((5, 10, 15)))
+        category = rng.choice(CATEGORIES)
+        organization_id = organization_ids[rng.randrange(organizations)]
+        created_at = min(now, datetime.combine(date, time()) - timedelta(days=rng.randint(7, 90)))
+        writer.add(Project, {
+            'id': project_id, 'title': f'{category} {_sentence(rng, 3)[:-1].lower()} #{project_id}',
+            'description': _sentence(rng, rng.randint(12, 40)), 'category': category,
+            'organization_id': organization_id, 'date': date,
+            'location': f'{rng.choice(_WORDS).capitalize()} District {rng.randint(1, 40)}',
+            'max_participants': max_participants, 'min_participants': 1, 'duration': duration,
+            'points': points, 'rating': round(rng.uniform(3.0, 5.0), 1) if rng.random() < 0.6 else 0.0,
+            'status': status, 'created_at': created_at, 'requirements': None,
+        })
+        if status in _REGISTRABLE:
+            plans.append((project_id, status, organization_id, date, max_participants, duration, points))
+    writer.flush(Project)
+
+    # -- Registrations, volunteer records and comment threads ------------------
+    registration_counts = [min(share, participants) for share in _shares(registrations, len(plans), rng)]
+    comment_counts = _shares(comments, len(plans), rng)
+    # Selection sampling over completed registrations gives exactly `records` records
+    completed_left = sum(
+        min(count, plan[4])
+        for count, plan in zip(registration_counts, plans)
+        if plan[1] == ProjectStatus.COMPLETED.value
+    )
+    records_left = min(records, completed_left)
+    record_status = _weighted(rng, _RECORD_STATUSES)
+    registration_id = _next_id(Registration)
+    record_id = _next_id(VolunteerRecord)
+    comment_id = _next_id(Comment)
+    for plan, registration_count, comment_count in zip(plans, registration_counts, comment_counts):
+        project_id, status, organization_id, date, max_participants, duration, points = plan
+        completed = status == ProjectStatus.COMPLETED.value
+        project_start = datetime.combine(date, time(9))
+        commenters = []  # registrants who may comment (cancelled and rejected ones may not)
+        for seat, user_id in enumerate(rng.sample(participant_ids, registration_count)):
+            if seat >= max_participants:
+                # Turned away once the project was full
+                reg_status = rng.choice((RegistrationStatus.CANCELLED.value, RegistrationStatus.REJECTED.value))
+            elif rng.random() < 0.08:
+                reg_status = RegistrationStatus.CANCELLED.value
+            elif completed:
+                reg_status = RegistrationStatus.COMPLETED.value
+            else:
+                reg_status = RegistrationStatus.APPROVED.value if rng.random() < 0.4 else RegistrationStatus.REGISTERED.value
+            writer.add(Registration, {
+                'id': registration_id, 'user_id': user_id, 'project_id': project_id, 'status': reg_status,
+                'created_at': min(now, project_start - timedelta(days=rng.randint(1, 60), minutes=rng.randint(0, 1439))),
+            })
+            registration_id += 1
+            if reg_status not in (RegistrationStatus.CANCELLED.value, RegistrationStatus.REJECTED.value):
+                commenters.append(user_id)
+            if completed and seat < max_participants:
+                if rng.random() * completed_left < records_left:
+                    writer.add(VolunteerRecord, {
+                        'id': record_id, 'user_id': user_id, 'project_id': project_id, 'hours': duration,
+                        'points': points, 'status': record_status(),
+                        'completed_at': project_start + timedelta(hours=duration, minutes=rng.randint(0, 600)),
+                    })
+                    record_id += 1
+                    records_left -= 1
+                completed_left -= 1
+
+        # Only registrants and the organizing organization may comment
+        commenters = commenters or [organization_id]
+        thread = []  # this project's comment rows, so reply counts are final before they are buffered
+        posted = datetime.combine(date, time()) - timedelta(days=30)
+        for _ in range(comment_count):
+            parent = rng.choice(thread) if thread and rng.random() < 0.4 else None
+            segment = comment_path_segment(comment_id)
+            row = {
+                'id': comment_id, 'project_id': project_id, 'user_id': rng.choice(commenters),
+                'content': _sentence(rng, rng.randint(4, 30)),
+                'parent_id': parent['id'] if parent else None,
+                'thread_id': parent['thread_id'] if parent else comment_id,
+                'path': f"{parent['path']}.{segment}" if parent else segment,
+                'reply_count': 0,
+                'created_at': min(now, posted + timedelta(minutes=len(thread) * rng.randint(1, 240))),
+            }
+            if parent is not None:
+                ancestors = {int(part) for part in parent['path'].split('.')}
+                for earlier in thread:
+                    if earlier['id'] in ancestors:
+                        earlier['reply_count'] += 1
+            thread.append(row)
+            comment_id += 1
+        for row in thread:
+            writer.add(Comment, row)
+    writer.flush()
+
+    # -- Derived tables ---------------------------------------------------
+    if echo is not None:
+        echo('Rebuilding seat counters, user stats and leaderboards...')
+    Project.recount_active_registrations()
+    UserStats.rebuild()
+    leaderboard.rebuild()
+    db.session.commit()
+    catalog_version.bump()
+    return {
+        model.__tablename__: writer.written.get(model.__tablename__, 0)
+        for model in (User, Project, Registration, VolunteerRecord, Comment)
+    }
@@ -0,0 +1,103 @@
+"""Per-process cache of session user snapshots for the Flask-Login user loader.
+
+Authenticated requests are served from an LRU of read-only UserSnapshot
+objects instead of querying the user table every time. Entries expire after
+a TTL, and the whole cache is dropped when the invalidation version changes.
+The version is bumped whenever a user is updated (ban/unban, profile edit)
+or deleted. It is a VersionStamp file, so every worker process sees a bump
+on its next request at the cost of one os.stat() and no database hit.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+from utils.version_stamp import VersionStamp
+
+
+class UserSnapshot(UserMixin):
+    """Immutable copy of the User columns that request handlers read from current_user."""
+
+    __slots__ = (
+        'id', 'username', 'email', 'user_type', 'display_name', 'description',
+        'is_active', 'ban_reason', 'ban_until', 'created_at',
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('UserSnapshot is read-only; load the User model to modify it')
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(**{name: getattr(user, name) for name in cls.__slots__})
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.id} {self.username}>'
+
+
+_MISSING = object()
+
+
+class UserCache:
+    """Thread-safe TTL + LRU map of user id -> UserSnapshot (or None for no session)."""
+
+    def __init__(self, maxsize=1024, ttl=60, version_file=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, snapshot)
+        self._generation = 0  # incremented on every invalidation
+        self.version = VersionStamp()
+        self.configure(maxsize, ttl, version_file)
+
+    def configure(self, maxsize, ttl, version_file=None):
+        """(Re)configure limits and the shared version file; clears the cache."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self.version.configure(version_file)
+            self._seen_version = self.version.current()
+            self._invalidate()
+
+    def _invalidate(self):
+        self._entries.clear()
+        self._generation += 1
+
+    def bump(self):
+        """Invalidate every cached snapshot in this and all other processes."""
+        with self._lock:
+            self._invalidate()
+            self.version.bump()
+            self._seen_version = self.version.current()
+
+    def get(self, user_id, loader):
+        """Return the cached snapshot for user_id, calling loader(user_id) on a miss."""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return loader(user_id)
+
+        now = time.monotonic()
+        with self._lock:
+            version = self.version.current()
+            if version != self._seen_version:
+                self._invalidate()
+                self._seen_version = version
+            entry = self._entries.get(user_id, _MISSING)
+            if entry is not _MISSING and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+            generation = self._generation
+
+        snapshot = loader(user_id)
+        with self._lock:
+            # Skip caching if an invalidation happened while the loader ran
+            if generation == self._generation and self.version.current() == self._seen_version:
+                self._entries[user_id] = (now + self.ttl, snapshot)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+
+user_cache = UserCache()
@@ -0,0 +1,38 @@
+"""Cross-process version counters backed by stamp files.
+
+A VersionStamp is bumped after a write that invalidates some cache. Its
+current() value is derived from os.stat() of the stamp file, which is
+atomically replaced on every bump. Any worker process can therefore detect
+a bump made by another one without touching the database. Without a file
+(e.g. before the app is configured) it falls back to an in-process counter.
+"""
+import os
+import uuid
+
+
+class VersionStamp:
+    def __init__(self, path=None):
+        self.path = path
+        self._local = 0
+
+    def configure(self, path):
+        self.path = path
+
+    def current(self):
+        """Opaque version string; changes whenever bump() runs in any process."""
+        if not self.path:
+            return str(self._local)
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return '0'
+        return f'{stat.st_ino:x}-{stat.st_mtime_ns:x}'
+
+    def bump(self):
+        self._local += 1
+        if self.path:
+            # Atomic replace gives the stamp a new inode, which other processes notice
+            tmp_path = f'{self.path}.{uuid.uuid4().hex}.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(uuid.uuid4().hex)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,9 @@
+"""WSGI entry point: builds the application (gunicorn wsgi:app; `flask` finds it on its own).
+
+app.py only defines create_app(), so importing it builds nothing: job
+process workers re-import the launching script and must not start a
+second copy of the app.
+"""
+from app import create_app
+
+app = create_app()